@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import StudentProfile, UserAccount, StudentProgress, EarnedBadge, Badge
+from .models import StudentProfile, UserAccount, StudentProgress, EarnedBadge, Badge, StudentStreak
 
 
 @admin.register(Badge)
@@ -13,3 +13,4 @@ admin.site.register(StudentProfile)
 admin.site.register(UserAccount)
 admin.site.register(StudentProgress)
 admin.site.register(EarnedBadge)
+admin.site.register(StudentStreak)
@@ -0,0 +1,293 @@
+"""
+Leaderboards backed by Redis sorted sets.
+
+Members are StudentProfile ids. There is one all-time set scored by
+StudentProgress.total_points, plus one pre-aggregated bucket per calendar
+day, ISO week and month scored by the points earned in that window
+(the same points recorded in DailyActivity.points_earned). Top-N,
+rank-of-student and the neighbourhood around a student are O(log n) for
+every period.
+
+StudentProgress.add_points keeps the all-time set current and
+student.utils.add_points increments the period buckets;
+`manage.py rebuild_leaderboard` reloads everything from the database.
+
+Bucket dates are taken in settings.TIME_ZONE, not the timezone of the
+request, so every student writes to and reads from the same buckets. A
+student who is already past midnight locally still scores in the
+current bucket. DailyActivity rows use the student's local date, so a
+rebuilt bucket and the database fallback can place points earned near
+midnight one bucket apart.
+
+A set is only read once rebuild() has loaded it and set its "built"
+marker, so a set that was evicted and then partially refilled by a few
+increments is never taken as complete: the first reader that finds the
+marker missing queues account.tasks.rebuild_leaderboard_task, and every
+reader uses the database until the marker is back.
+
+Whenever Redis is unavailable (or a set is being rebuilt) reads fall back
+to indexed queries: StudentProgress.total_points for all-time, and a
+DailyActivity aggregate over the period window only for the others.
+
+Equal scores are ordered by student id, descending, in both places
+(that is how ZREVRANGE orders members with the same score), so ranks and
+pages agree whichever side answers.
+"""
+import logging
+from datetime import timedelta
+
+import redis
+
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from core.redis_client import get_redis
+
+from .models import DailyActivity, StudentProgress
+
+logger = logging.getLogger(__name__)
+
+ALL_TIME = "all_time"
+DAILY = "daily"
+WEEKLY = "weekly"
+MONTHLY = "monthly"
+PERIODS = (ALL_TIME, DAILY, WEEKLY, MONTHLY)
+
+ALL_TIME_KEY = "leaderboard:all_time"
+
+# Buckets outlive their window a little so late reads still hit Redis
+BUCKET_TTL = {
+    DAILY: 2 * 86400,
+    WEEKLY: 8 * 86400,
+    MONTHLY: 32 * 86400,
+}
+
+
+def bucket_date():
+    """Today in settings.TIME_ZONE, whatever timezone the request activated."""
+    return timezone.localdate(timezone=timezone.get_default_timezone())
+
+
+def period_window(period, day=None):
+    """First and last date of the `period` bucket containing `day`."""
+    day = day or bucket_date()
+    if period == DAILY:
+        return day, day
+    if period == WEEKLY:
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    if period == MONTHLY:
+        start = day.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return start, next_month - timedelta(days=1)
+    raise ValueError(period)
+
+
+REBUILD_LOCK_TTL = 60
+
+
+def _key(period, day=None):
+    if period == ALL_TIME:
+        return ALL_TIME_KEY
+    start, _ = period_window(period, day)
+    return f"leaderboard:{period}:{start.isoformat()}"
+
+
+def _built_key(key):
+    return f"{key}:built"
+
+
+def rebuild_lock_key(period):
+    return f"{_key(period)}:rebuilding"
+
+
+def record_score(student_id, total_points):
+    try:
+        get_redis().zadd(ALL_TIME_KEY, {str(student_id): total_points})
+    except redis.RedisError as e:
+        logger.warning(f"Leaderboard update failed for {student_id}: {e}")
+
+
+def record_activity(student_id, points, day=None):
+    """
+    Add `points` earned on `day` (default: now) to the daily, weekly and
+    monthly buckets. Negative values take points back; like the DailyActivity
+    fallback, a bucket only lists students with a positive score.
+    """
+    if not points:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        for period in (DAILY, WEEKLY, MONTHLY):
+            key = _key(period, day)
+            pipe.zincrby(key, points, str(student_id))
+            pipe.zremrangebyscore(key, "-inf", 0)
+            pipe.expire(key, BUCKET_TTL[period])
+            pipe.expire(_built_key(key), BUCKET_TTL[period])
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Period leaderboard update failed for {student_id}: {e}")
+
+
+def _period_scores(period, day=None):
+    start, end = period_window(period, day)
+    return (
+        DailyActivity.objects
+        .filter(date__gte=start, date__lte=end)
+        .values("student_id")
+        .annotate(points=Sum("points_earned"))
+        .filter(points__gt=0)
+    )
+
+
+def rebuild(periods=PERIODS):
+    """Reload the sorted sets from the database. Returns {period: members}."""
+    client = get_redis()
+    result = {}
+    for period in periods:
+        if period == ALL_TIME:
+            rows = StudentProgress.objects.values_list("student_id", "total_points")
+        else:
+            rows = _period_scores(period).values_list("student_id", "points")
+        scores = {str(student_id): points for student_id, points in rows.iterator()}
+
+        key = _key(period)
+        ttl = BUCKET_TTL.get(period)
+        pipe = client.pipeline()
+        pipe.delete(key)
+        if scores:
+            pipe.zadd(key, scores)
+            if ttl:
+                pipe.expire(key, ttl)
+        pipe.set(_built_key(key), 1, ex=ttl)
+        pipe.execute()
+        result[period] = len(scores)
+    return result
+
+
+def _ready(client, period):
+    """
+    True if the set of `period` can be read. For a set without its built
+    marker the first caller queues a rebuild (at most one per
+    REBUILD_LOCK_TTL); until it is done every caller gets False and reads
+    the database.
+    """
+    if client.exists(_built_key(_key(period))):
+        return True
+    lock = rebuild_lock_key(period)
+    if client.set(lock, 1, nx=True, ex=REBUILD_LOCK_TTL):
+        from .tasks import rebuild_leaderboard_task
+
+        try:
+            rebuild_leaderboard_task.delay(period)
+        except Exception as e:
+            client.delete(lock)
+            logger.warning(f"Could not queue the {period} leaderboard rebuild: {e}")
+    return False
+
+
+def count(period=ALL_TIME):
+    try:
+        client = get_redis()
+        if _ready(client, period):
+            return client.zcard(_key(period))
+    except redis.RedisError as e:
+        logger.warning(f"Leaderboard count falling back to database: {e}")
+    if period == ALL_TIME:
+        return StudentProgress.objects.count()
+    return _period_scores(period).count()
+
+
+def page(offset, limit, period=ALL_TIME):
+    """
+    Return [(student_id, points, rank)] for ranks offset+1 .. offset+limit.
+    """
+    key = _key(period)
+    try:
+        client = get_redis()
+        if _ready(client, period):
+            entries = client.zrevrange(key, offset, offset + limit - 1, withscores=True)
+            return [
+                (student_id, int(score), offset + i + 1)
+                for i, (student_id, score) in enumerate(entries)
+            ]
+    except redis.RedisError as e:
+        logger.warning(f"Leaderboard page falling back to database: {e}")
+
+    if period == ALL_TIME:
+        rows = (
+            StudentProgress.objects
+            .order_by("-total_points", "-student_id")
+            .values_list("student_id", "total_points")
+        )
+    else:
+        rows = _period_scores(period).order_by("-points", "-student_id").values_list("student_id", "points")
+    return [
+        (str(student_id), points, offset + i + 1)
+        for i, (student_id, points) in enumerate(rows[offset:offset + limit])
+    ]
+
+
+def top(n, period=ALL_TIME):
+    return page(0, n, period)
+
+
+def rank_of(student_id, period=ALL_TIME):
+    """1-based rank of the student, or None if they have no points in the period."""
+    key = _key(period)
+    try:
+        client = get_redis()
+        if _ready(client, period):
+            rank = client.zrevrank(key, str(student_id))
+            if rank is not None:
+                return rank + 1
+            if period != ALL_TIME:
+                return None
+    except redis.RedisError as e:
+        logger.warning(f"Leaderboard rank falling back to database: {e}")
+
+    if period == ALL_TIME:
+        points = (
+            StudentProgress.objects
+            .filter(student_id=student_id)
+            .values_list("total_points", flat=True)
+            .first()
+        )
+        if points is None:
+            return None
+        ahead = Q(total_points__gt=points) | Q(total_points=points, student_id__gt=student_id)
+        return StudentProgress.objects.filter(ahead).count() + 1
+
+    scores = _period_scores(period)
+    points = scores.filter(student_id=student_id).values_list("points", flat=True).first()
+    if points is None:
+        return None
+    ahead = Q(points__gt=points) | Q(points=points, student_id__gt=student_id)
+    return scores.filter(ahead).count() + 1
+
+
+def around(student_id, radius=2, period=ALL_TIME):
+    """The student's entry with up to `radius` neighbours on each side."""
+    rank = rank_of(student_id, period)
+    if rank is None:
+        return []
+    offset = max(rank - 1 - radius, 0)
+    return page(offset, rank - offset + radius, period)
+
+
+def hydrate(entries):
+    """
+    Attach StudentProgress (with user) to [(student_id, points, rank)] entries,
+    keeping their order. Returns [(progress, points, rank)].
+    """
+    progress_by_student = {
+        str(p.student_id): p
+        for p in StudentProgress.objects
+        .filter(student_id__in=[student_id for student_id, _, _ in entries])
+        .select_related("student__account__user")
+    }
+    return [
+        (progress_by_student[student_id], points, rank)
+        for student_id, points, rank in entries
+        if student_id in progress_by_student
+    ]
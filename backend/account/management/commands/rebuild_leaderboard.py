@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from account import leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the Redis leaderboards (all-time and daily/weekly/monthly buckets)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--period',
+            choices=leaderboard.PERIODS,
+            help='Only rebuild this leaderboard',
+        )
+
+    def handle(self, *args, **options):
+        periods = [options['period']] if options['period'] else leaderboard.PERIODS
+        counts = leaderboard.rebuild(periods)
+        for period, total in counts.items():
+            self.stdout.write(self.style.SUCCESS(f'{period} leaderboard rebuilt with {total} students'))
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0006_earnedbadge_is_seen'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentprogress',
+            name='total_points',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
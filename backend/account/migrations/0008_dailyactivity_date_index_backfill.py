@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_challenge_points(apps, schema_editor):
+    """
+    Challenge points used to go straight to StudentProgress; the period
+    leaderboards and the dashboard calendar now read them from DailyActivity.
+    """
+    ChallengeAttempt = apps.get_model('challenge', 'ChallengeAttempt')
+    DailyActivity = apps.get_model('account', 'DailyActivity')
+
+    per_day = (
+        ChallengeAttempt.objects
+        .filter(score__gt=0)
+        .annotate(day=TruncDate('created_at'))
+        .values('student_id', 'day')
+        .annotate(points=Sum('score'))
+    )
+    for row in per_day.iterator():
+        activity, _ = DailyActivity.objects.get_or_create(
+            student_id=row['student_id'],
+            date=row['day'],
+        )
+        activity.points_earned += row['points']
+        activity.save(update_fields=['points_earned'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0007_studentprogress_total_points_index'),
+        ('challenge', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyactivity',
+            index=models.Index(fields=['date'], name='account_dailyactivity_date_idx'),
+        ),
+        migrations.RunPython(backfill_challenge_points, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+def mark_existing_days(apps, schema_editor):
+    """Existing rows were created by the login middleware or already had their chance at the point."""
+    DailyActivity = apps.get_model('account', 'DailyActivity')
+    DailyActivity.objects.update(login_awarded=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_studentstreak'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyactivity',
+            name='login_awarded',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_existing_days, migrations.RunPython.noop),
+    ]
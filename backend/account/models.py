@@ -51,7 +51,7 @@ class StudentProgress(models.Model):
         related_name="progress"
     )
 
-    total_points = models.PositiveIntegerField(default=0)
+    total_points = models.PositiveIntegerField(default=0, db_index=True)
     level = models.PositiveIntegerField(default=1)
 
     BASE_POINTS = 100  # tuning knob
@@ -73,6 +73,11 @@ class StudentProgress(models.Model):
         self.recalculate_level()
         self.save(update_fields=["total_points", "level", "updated_at"])
 
+        from django.db import transaction
+        from account.leaderboard import record_score
+        student_id, total_points = self.student_id, self.total_points
+        transaction.on_commit(lambda: record_score(student_id, total_points))
+
 
 class DailyActivity(models.Model):
     student = models.ForeignKey(
@@ -82,10 +87,16 @@ class DailyActivity(models.Model):
     )
     date = models.DateField()
     points_earned = models.PositiveIntegerField(default=0)
+    # The daily login point is in points_earned; the row may exist earlier
+    # (points from a challenge submitted before the login task ran)
+    login_awarded = models.BooleanField(default=False)
 
     class Meta:
         unique_together = ("student", "date")
         ordering = ["-date"]
+        indexes = [
+            models.Index(fields=["date"], name="account_dailyactivity_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student} | {self.date}"
@@ -128,3 +139,36 @@ class EarnedBadge(models.Model):
     class Meta:
         unique_together = ("student", "badge")
 
+
+
+class StudentStreak(models.Model):
+    """
+    Streak state of a student, kept current by student.streaks.
+
+    `current` is the run of consecutive active days ending at
+    `last_active_date`; it only counts as the ongoing streak while
+    `last_active_date` is today or yesterday.
+    """
+    LOGIN = "login"
+    CHALLENGE = "challenge"
+    KIND_CHOICES = [
+        (LOGIN, "Login"),
+        (CHALLENGE, "Challenge"),
+    ]
+
+    student = models.ForeignKey(
+        StudentProfile,
+        on_delete=models.CASCADE,
+        related_name="streaks"
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    current = models.PositiveIntegerField(default=0)
+    longest = models.PositiveIntegerField(default=0)
+    last_active_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("student", "kind")
+
+    def __str__(self):
+        return f"{self.student_id} {self.kind}: {self.current} (longest {self.longest})"
@@ -28,7 +28,10 @@ def create_account_related_models(sender, instance, created, **kwargs):
                 account=account
             )
 
-            StudentProgress.objects.create(
+            progress = StudentProgress.objects.create(
                 student=student_profile
             )
 
+            from account.leaderboard import record_score
+            transaction.on_commit(lambda: record_score(progress.student_id, 0))
+
@@ -0,0 +1,22 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rebuild_leaderboard_task(period):
+    """
+    Reload the sorted set of `period` whose built marker was missing,
+    queued by account.leaderboard on first read; the readers use the
+    database until it is done.
+    """
+    from core.redis_client import get_redis
+
+    from . import leaderboard
+
+    try:
+        members = leaderboard.rebuild([period])[period]
+    finally:
+        get_redis().delete(leaderboard.rebuild_lock_key(period))
+    return {"status": "rebuilt", "period": period, "members": members}
@@ -1,3 +1,70 @@
+"""
+Tests for the database fallback of the leaderboards (account.leaderboard).
+"""
+from unittest import mock
+
+import redis
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from . import leaderboard
+from .models import StudentProfile, StudentProgress, UserAccount
+
+User = get_user_model()
+
+
+def _make_student(username, points):
+    user = User.objects.create_user(username=username, password="test1234", email=f"{username}@test.com")
+    student = StudentProfile.objects.create(account=UserAccount.objects.get(user=user))
+    StudentProgress.objects.create(student=student, total_points=points)
+    return student
+
+
+class LeaderboardFallbackTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(leaderboard, "get_redis", side_effect=redis.ConnectionError)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.students = [_make_student(f"student{i}", points) for i, points in enumerate([30, 20, 20, 20, 10])]
+
+    def test_ranks_match_page_order_with_ties(self):
+        entries = leaderboard.page(0, 10)
+        self.assertEqual([rank for _, _, rank in entries], [1, 2, 3, 4, 5])
+        # Ties are ordered by student id, descending, like ZREVRANGE
+        tied = [student_id for student_id, points, _ in entries if points == 20]
+        self.assertEqual(tied, sorted(tied, reverse=True))
+
+        for student_id, _, rank in entries:
+            self.assertEqual(leaderboard.rank_of(student_id), rank)
+
+    def test_around_contains_the_student(self):
+        for student in self.students:
+            window = leaderboard.around(student.id, radius=1)
+            self.assertIn(str(student.id), [student_id for student_id, _, _ in window])
+
+
+class LeaderboardColdStartTests(TestCase):
+    def setUp(self):
+        self.students = [_make_student(f"student{i}", points) for i, points in enumerate([30, 20])]
+
+    def test_missing_marker_queues_a_rebuild_and_reads_the_database(self):
+        from .tasks import rebuild_leaderboard_task
+
+        client = mock.Mock()
+        client.exists.return_value = 0
+        client.set.side_effect = [True, False]
+
+        with mock.patch.object(leaderboard, "get_redis", return_value=client), \
+                mock.patch.object(leaderboard, "rebuild") as rebuild, \
+                mock.patch.object(rebuild_leaderboard_task, "delay") as delay:
+            first = leaderboard.top(2)
+            second = leaderboard.top(2)
+
+        # Queued once; the request never rebuilds the set itself
+        delay.assert_called_once_with(leaderboard.ALL_TIME)
+        rebuild.assert_not_called()
+        client.zrevrange.assert_not_called()
+        expected = [(str(s.id), points, rank) for rank, (s, points) in enumerate(zip(self.students, [30, 20]), 1)]
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
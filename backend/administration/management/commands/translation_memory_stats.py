@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from administration.models import TranslationMemory
+from core import translation_memory
+from core.redis_client import get_redis
+
+class Command(BaseCommand):
+    help = 'Shows translation memory size and hit rate across workers'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write(f'Stored translations: {TranslationMemory.objects.count()}')
+
+        try:
+            counters = {k: int(v) for k, v in get_redis().hgetall(translation_memory.STATS_KEY).items()}
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f'Could not read stats from Redis: {e}'))
+            return
+
+        lookups = sum(counters.get(k, 0) for k in ('lru_hits', 'db_hits', 'misses'))
+        hits = counters.get('lru_hits', 0) + counters.get('db_hits', 0)
+        for name in ('lru_hits', 'db_hits', 'misses', 'stores'):
+            self.stdout.write(f'{name}: {counters.get(name, 0)}')
+        rate = hits / lookups if lookups else 0.0
+        self.stdout.write(self.style.SUCCESS(f'Hit rate: {rate:.1%} of {lookups} lookups'))
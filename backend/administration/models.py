@@ -9,7 +9,26 @@ class LevelType(models.TextChoices):
     GENERAL = "general", "General Math Level"
     MEP = "mep", "MEP Math Level"
 
-class MathLevels(models.Model):
+class TranslatedFieldsMixin:
+    """
+    get_translated_* support for models with a `translations` relation.
+    `translation_fields` maps each translated field to its column on the
+    translation model; lookups go through administration.translations.
+    """
+    translation_fields = {}
+
+    def get_translated_field(self, field, language):
+        if not language or language == 'en':
+            return getattr(self, field)
+        from administration.translations import translation_for
+
+        values = translation_for(self, language)
+        return values[field] if field in values else getattr(self, field)
+
+
+class MathLevels(TranslatedFieldsMixin, models.Model):
+    translation_fields = {"name": "translated_name"}
+
     id = models.UUIDField(
         primary_key=True,
         default=uuid.uuid4,
@@ -39,10 +58,7 @@ class MathLevels(models.Model):
         super().save(*args, **kwargs)
 
     def get_translated_name(self, language):
-        if not language or language == 'en':
-            return self.name
-        translation = self.translations.filter(language=language).first()
-        return translation.translated_name if translation else self.name
+        return self.get_translated_field("name", language)
 
 
 class MathLevelTranslation(models.Model):
@@ -116,7 +132,9 @@ class PointAdjustment(models.Model):
     daily_challenge_point = models.PositiveIntegerField(default=0)
 
 
-class DailyChallenge(models.Model):
+class DailyChallenge(TranslatedFieldsMixin, models.Model):
+    translation_fields = {"name": "translated_name", "description": "translated_description"}
+
     id = models.UUIDField(
         primary_key=True, 
         default=uuid.uuid4, 
@@ -146,16 +164,10 @@ class DailyChallenge(models.Model):
         return self.name
 
     def get_translated_name(self, language):
-        if not language or language == 'en':
-            return self.name
-        translation = self.translations.filter(language=language).first()
-        return translation.translated_name if translation else self.name
+        return self.get_translated_field("name", language)
 
     def get_translated_description(self, language):
-        if not language or language == 'en':
-            return self.description
-        translation = self.translations.filter(language=language).first()
-        return translation.translated_description if translation else self.description
+        return self.get_translated_field("description", language)
 
 class DailyChallengeTranslation(models.Model):
     challenge = models.ForeignKey(DailyChallenge, related_name='translations', on_delete=models.CASCADE)
@@ -169,7 +181,9 @@ class DailyChallengeTranslation(models.Model):
     def __str__(self):
         return f"{self.challenge.name} - {self.language}"
 
-class ChallengeQuestion(models.Model):
+class ChallengeQuestion(TranslatedFieldsMixin, models.Model):
+    translation_fields = {"question_text": "translated_question_text", "answer": "translated_answer"}
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
     challenge = models.ForeignKey(
@@ -187,16 +201,10 @@ class ChallengeQuestion(models.Model):
         return f"Q{self.order}"
 
     def get_translated_question_text(self, language):
-        if not language or language == 'en':
-            return self.question_text
-        translation = self.translations.filter(language=language).first()
-        return translation.translated_question_text if translation else self.question_text
+        return self.get_translated_field("question_text", language)
 
     def get_translated_answer(self, language):
-        if not language or language == 'en':
-            return self.answer
-        translation = self.translations.filter(language=language).first()
-        return translation.translated_answer if translation else self.answer
+        return self.get_translated_field("answer", language)
 
 class ChallengeQuestionTranslation(models.Model):
     question = models.ForeignKey(ChallengeQuestion, related_name='translations', on_delete=models.CASCADE)
@@ -252,3 +260,19 @@ class ActivityLog(models.Model):
         return self.title
 
 
+
+
+class TranslationMemory(models.Model):
+    """
+    Content-addressed store of every LibreTranslate result, shared by posts,
+    comments, challenges and math levels (see core.translation_memory).
+    """
+    digest = models.CharField(max_length=64, unique=True)
+    source_language = models.CharField(max_length=10)
+    target_language = models.CharField(max_length=10)
+    source_text = models.TextField()
+    translated_text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.source_language}->{self.target_language} {self.digest[:12]}"
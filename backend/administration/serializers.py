@@ -141,7 +141,7 @@ class PostAdminSerializer(serializers.ModelSerializer):
         fields = ("id", "author", "text", "image", "video", "classroom_name", "created_at", "comment_count", "is_verified")
 
     def get_comment_count(self, obj):
-        return obj.comments.count()
+        return obj.comment_count
 
     def get_classroom_name(self, obj):
         return obj.classroom.name if obj.classroom else None
@@ -0,0 +1,34 @@
+"""
+Drops translations from the process-wide cache of
+administration.translations when they are saved or deleted.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import (
+    ChallengeQuestion,
+    ChallengeQuestionTranslation,
+    DailyChallenge,
+    DailyChallengeTranslation,
+    MathLevels,
+    MathLevelTranslation,
+)
+from .translations import invalidate
+
+
+@receiver(post_save, sender=MathLevelTranslation)
+@receiver(post_delete, sender=MathLevelTranslation)
+def invalidate_level_translation(sender, instance, **kwargs):
+    invalidate(MathLevels, instance.math_level_id, instance.language)
+
+
+@receiver(post_save, sender=DailyChallengeTranslation)
+@receiver(post_delete, sender=DailyChallengeTranslation)
+def invalidate_challenge_translation(sender, instance, **kwargs):
+    invalidate(DailyChallenge, instance.challenge_id, instance.language)
+
+
+@receiver(post_save, sender=ChallengeQuestionTranslation)
+@receiver(post_delete, sender=ChallengeQuestionTranslation)
+def invalidate_question_translation(sender, instance, **kwargs):
+    invalidate(ChallengeQuestion, instance.question_id, instance.language)
@@ -1,5 +1,5 @@
 from celery import shared_task
-from core.utils import translate_text, translate_texts_batch
+from core.utils import TRANSLATION_LANGUAGES, translate_texts_concurrently
 from administration.models import DailyChallenge, DailyChallengeTranslation, ChallengeQuestionTranslation
 
 import logging
@@ -11,21 +11,20 @@ def translate_challenge_task(challenge_id):
     try:
         challenge = DailyChallenge.objects.get(id=challenge_id)
         source_lang = 'en' # challenges are generated in English
-        target_languages = ['en', 'es', 'fr', 'de', 'zh', 'ja', 'he']
-        
-        for lang in target_languages:
-            if lang == source_lang:
-                continue
-                
-            # Gather all texts to translate
-            questions = list(challenge.questions.all())
-            texts_to_translate = [challenge.name, challenge.description]
-            for q in questions:
-                texts_to_translate.append(q.question_text)
-                texts_to_translate.append(q.answer)
-                
-            translated_texts = translate_texts_batch(texts_to_translate, target_lang=lang, source_lang=source_lang)
-            
+
+        # Gather all texts to translate; repeated strings are served by the
+        # translation memory instead of LibreTranslate
+        questions = list(challenge.questions.all())
+        texts_to_translate = [challenge.name, challenge.description]
+        for q in questions:
+            texts_to_translate.append(q.question_text)
+            texts_to_translate.append(q.answer)
+
+        translations = translate_texts_concurrently(
+            texts_to_translate, target_langs=TRANSLATION_LANGUAGES, source_lang=source_lang
+        )
+
+        for lang, translated_texts in translations.items():
             translated_name = translated_texts[0]
             translated_desc = translated_texts[1]
             
@@ -65,14 +64,12 @@ def translate_math_level_task(math_level_id):
     try:
         math_level = MathLevels.objects.get(id=math_level_id)
         source_lang = 'en'
-        target_languages = ['en', 'es', 'fr', 'de', 'zh', 'ja', 'he']
-        
-        for lang in target_languages:
-            if lang == source_lang:
-                continue
-                
-            translated_name = translate_text(math_level.name, target_lang=lang, source_lang=source_lang)
-            
+
+        translations = translate_texts_concurrently(
+            [math_level.name], target_langs=TRANSLATION_LANGUAGES, source_lang=source_lang
+        )
+
+        for lang, (translated_name,) in translations.items():
             MathLevelTranslation.objects.update_or_create(
                 math_level=math_level,
                 language=lang,
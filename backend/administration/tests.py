@@ -1,3 +1,37 @@
+"""
+Tests for the translation resolver behind the get_translated_* methods.
+"""
+
 from django.test import TestCase
 
-# Create your tests here.
+from .models import MathLevels, MathLevelTranslation
+from .translations import _cache, prefetch
+
+
+class TranslationResolverTests(TestCase):
+    def setUp(self):
+        _cache.clear()
+        self.levels = [MathLevels.objects.create(name=f"Level {i}") for i in range(3)]
+        for level in self.levels[:2]:
+            MathLevelTranslation.objects.create(math_level=level, language="es", translated_name=f"Nivel {level.name[-1]}")
+
+    def test_one_query_per_model(self):
+        levels = list(MathLevels.objects.order_by("name"))
+        with self.assertNumQueries(1):
+            prefetch(levels, "es")
+        with self.assertNumQueries(0):
+            names = [level.get_translated_name("es") for level in levels]
+            self.assertEqual(levels[0].get_translated_name("en"), "Level 0")
+        self.assertEqual(names, ["Nivel 0", "Nivel 1", "Level 2"])
+
+    def test_process_cache_and_invalidation(self):
+        prefetch(list(MathLevels.objects.all()), "es")
+
+        # Fresh instances: cached translations cost nothing, the missing one is looked up again
+        levels = list(MathLevels.objects.order_by("name"))
+        with self.assertNumQueries(1):
+            prefetch(levels, "es")
+
+        MathLevelTranslation.objects.filter(math_level=self.levels[0]).get().delete()
+        level = MathLevels.objects.get(pk=self.levels[0].pk)
+        self.assertEqual(level.get_translated_name("es"), "Level 0")
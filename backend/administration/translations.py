@@ -0,0 +1,90 @@
+"""
+Translation resolver for MathLevels, DailyChallenge and ChallengeQuestion.
+
+Their get_translated_* methods used to run one `translations.filter(...)`
+query per call. They now read from:
+
+  1. a memo on the instance itself, so an object fetched for a request
+     resolves each language at most once
+  2. a process-wide LRU of translations that exist (they rarely change;
+     saving or deleting one drops it in this process, other processes
+     pick the change up within CACHE_TTL)
+  3. the database, one query per model for a whole list of objects
+
+Views that loop over objects call `prefetch(objects, language)` first:
+
+    prefetch(page, user_lang)
+    prefetch([c.subject for c in page], user_lang)
+    [c.get_translated_name(user_lang) for c in page]   # no further queries
+"""
+from collections import defaultdict
+
+from utils.verdict_cache import VerdictCache
+
+CACHE_TTL = 600
+
+_cache = VerdictCache("translations:v1", max_size=20000, ttl=CACHE_TTL, use_redis=False)
+
+MEMO_ATTR = "_translation_memo"
+
+
+def _key(model, pk, language):
+    return f"{model._meta.label}:{pk}:{language}"
+
+
+def _memo(obj):
+    return obj.__dict__.setdefault(MEMO_ATTR, {})
+
+
+def _relation(model):
+    """(translation model, name of its foreign key to `model`)."""
+    relation = model._meta.get_field("translations")
+    return relation.related_model, relation.field.name
+
+
+def prefetch(objects, language):
+    """Resolve `language` for every object, with one query per model for those not cached."""
+    if not language or language == 'en':
+        return objects
+
+    missing = defaultdict(list)
+    for obj in objects:
+        if obj is None:
+            continue
+        memo = _memo(obj)
+        if language in memo:
+            continue
+        cached = _cache.get(_key(type(obj), obj.pk, language))
+        if cached is not None:
+            memo[language] = cached
+        else:
+            missing[type(obj)].append(obj)
+
+    for model, objs in missing.items():
+        translation_model, fk = _relation(model)
+        found = {
+            getattr(t, f"{fk}_id"): t
+            for t in translation_model.objects.filter(**{f"{fk}__in": objs, "language": language})
+        }
+        for obj in objs:
+            translation = found.get(obj.pk)
+            if translation is None:
+                # Not cached process-wide: the translation task may add it any moment
+                _memo(obj)[language] = {}
+                continue
+            values = {field: getattr(translation, source) for field, source in model.translation_fields.items()}
+            _memo(obj)[language] = values
+            _cache.set(_key(model, obj.pk, language), values)
+    return objects
+
+
+def translation_for(obj, language):
+    """{field: translated value} of `obj` in `language`; empty if there is none."""
+    memo = _memo(obj)
+    if language not in memo:
+        prefetch([obj], language)
+    return memo[language]
+
+
+def invalidate(model, pk, language):
+    _cache.delete(_key(model, pk, language))
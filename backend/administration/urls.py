@@ -7,6 +7,9 @@ from .views import (
     UnbanUserView,
     LeaderboardAPIView,
     TopPartView,
+    UpstreamMetricsView,
+    ModerationCacheMetricsView,
+    AppCacheMetricsView,
 
     # profile views
     AdminProfileAPIView,
@@ -53,6 +56,9 @@ urlpatterns = [
     path('analytics/', AnalyticsReportAPIView.as_view(), name='Analytics'),
     path('leaderboard/', LeaderboardAPIView.as_view(), name='Leaderboard'),
     path('top/', TopPartView.as_view(), name='Top'),
+    path('upstream-metrics/', UpstreamMetricsView.as_view(), name='Upstream Metrics'),
+    path('moderation-cache-metrics/', ModerationCacheMetricsView.as_view(), name='Moderation Cache Metrics'),
+    path('app-cache-metrics/', AppCacheMetricsView.as_view(), name='App Cache Metrics'),
 
     # profile urls
     path('profile/', AdminProfileAPIView.as_view(), name='Profile'),
@@ -22,9 +22,10 @@ from django.db import transaction
 
 from datetime import datetime
 
+from account import leaderboard
+from core import outbound
 from account.models import (
     StudentProfile,
-    StudentProgress,
 )
 from administration.models import DailyChallenge, ActivityLog
 from post.models import PostModel, CommentModel
@@ -84,6 +85,24 @@ class OverView(AdminBaseView, APIView):
         serializer = OverViewSerializer({}, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+class UpstreamMetricsView(AdminBaseView, APIView):
+    """Circuit breaker state and latency histograms of the outbound AI/translation clients (this process)."""
+    def get(self, request):
+        return Response(outbound.metrics(), status=status.HTTP_200_OK)
+
+class ModerationCacheMetricsView(AdminBaseView, APIView):
+    """Hit/miss/eviction counters of the slang verdict caches (this process), plus image moderation stage timings."""
+    def get(self, request):
+        from utils.nudity_detector import stage_timings
+        from utils.slang_detector import cache_stats
+        return Response({**cache_stats(), "nudity_stages": stage_timings()}, status=status.HTTP_200_OK)
+
+class AppCacheMetricsView(AdminBaseView, APIView):
+    """Hit/miss/wait/error counters of the shared cache namespaces (this process)."""
+    def get(self, request):
+        from core.shared_cache import stats
+        return Response(stats(), status=status.HTTP_200_OK)
+
 class UserManagementView(AdminBaseView, generics.ListAPIView):
     serializer_class = UserManagementSerializer
     queryset = User.objects.all()
@@ -251,7 +270,7 @@ class PostAdminListView(generics.ListAPIView):
     search_fields = ['text', 'user__first_name', 'user__last_name', 'user__username']
 
     def get_queryset(self):
-        return PostModel.objects.exclude(user__isnull=True).select_related('user', 'classroom').prefetch_related('comments').order_by('-created_at')
+        return PostModel.objects.exclude(user__isnull=True).select_related('user', 'classroom').order_by('-created_at')
 
 class PostAdminDeleteView(generics.DestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
@@ -309,7 +328,8 @@ class ChallengeGenerationView(APIView):
         }
 
         try:
-            ai_response = requests.post(
+            ai_response = outbound.post(
+                "ai",
                 f"{ai_base_url}/generate-question",
                 data=payload,          # 👈 THIS is form-data / x-www-form-urlencoded
                 timeout=20
@@ -662,26 +682,31 @@ class LeaderboardAPIView(APIView):
 
     def get(self, request):
         """
-        Returns ranked users with profile image and progress data
-        """
+        Returns ranked users with profile image and progress data.
 
-        queryset = (
-            StudentProgress.objects
-            .select_related(
-                "student__account__user"
+        Paginated with ?page= / ?page_size= (default 20, max 100) on top of
+        the Redis leaderboard instead of serialising the whole table.
+        """
+        try:
+            page = max(int(request.query_params.get("page", 1)), 1)
+            page_size = min(max(int(request.query_params.get("page_size", 20)), 1), 100)
+        except ValueError:
+            return Response(
+                {"error": "page and page_size must be integers"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            .order_by("-total_points", "student__id")
-        )
+
+        entries = leaderboard.page((page - 1) * page_size, page_size)
 
         data = []
-        for idx, progress in enumerate(queryset, start=1):
+        for progress, points, idx in leaderboard.hydrate(entries):
             user = progress.student.account.user
 
             # Status logic (customizable)
             if progress.level < 10:
-                status = "need_to_level_up"
+                level_status = "need_to_level_up"
             else:
-                status = "normal"
+                level_status = "normal"
 
             data.append({
                 "rank": idx,
@@ -693,12 +718,14 @@ class LeaderboardAPIView(APIView):
                     else None
                 ),
                 "level": progress.level,
-                "total_points": progress.total_points,
-                "status": status,
+                "total_points": points,
+                "status": level_status,
             })
 
         return Response({
-            "count": len(data),
+            "count": leaderboard.count(),
+            "page": page,
+            "page_size": page_size,
             "results": data
         })
 
@@ -1,5 +1,6 @@
 import os
-import requests
+
+from core import outbound
 
 AI_BASE_URL = os.getenv("AI_BASE_URL")
 
@@ -24,7 +25,8 @@ def check_solution_with_ai(
     if solution_url:
         payload["solution_url"] = solution_url
 
-    response = requests.post(
+    response = outbound.post(
+        "ai",
         f"{AI_BASE_URL}/check-solution",
         data=payload,  # form-data / x-www-form-urlencoded
         timeout=45
@@ -0,0 +1,126 @@
+"""
+Data for the student dashboard (challenge.views.DashboardView).
+
+Every part is a fixed number of queries however many challenges or
+answers a student has:
+
+  - leaderboard top 3 and the student's rank come from account.leaderboard
+  - accuracy and answer counts are one conditional aggregate
+  - daily challenge status is one query: each challenge is annotated with
+    the student's attempt (LEFT JOIN via subquery) instead of one attempt
+    lookup per challenge; at most MAX_CHALLENGES are listed
+
+The assembled payload is cached per student for CACHE_TTL seconds;
+challenge.signals drops it whenever the student joins, answers or
+completes a challenge.
+"""
+from django.db.models import Count, OuterRef, Q, Subquery
+
+from account import leaderboard as ranking
+from administration.models import DailyChallenge
+from administration.translations import prefetch as prefetch_translations
+from core.shared_cache import Namespace
+from core.utils import get_translated_level_name
+
+from .models import ChallengeAttempt, QuestionAttempt
+
+CACHE_TTL = 30
+
+dashboards = Namespace("dashboard", timeout=CACHE_TTL)
+
+MAX_CHALLENGES = 20
+
+
+def invalidate(student_id):
+    dashboards.delete(student_id)
+
+
+def leaderboard_top():
+    return [
+        {
+            "name": p.student.account.user.get_full_name(),
+            "points": points,
+            "country": p.student.account.user.country,
+            "profile_pic": p.student.account.user.profile_pic.url if p.student.account.user.profile_pic else None
+        }
+        for p, points, _ in ranking.hydrate(ranking.top(3))
+    ]
+
+
+def answer_stats(student):
+    """(questions attempted, correct answers) in one aggregate."""
+    stats = QuestionAttempt.objects.filter(attempt__student=student).aggregate(
+        total=Count("id"),
+        correct=Count("id", filter=Q(is_correct=True)),
+    )
+    return stats["total"], stats["correct"]
+
+
+def open_challenges(user, student, limit=MAX_CHALLENGES):
+    """The user's not yet completed challenges, newest first, with "new" / "in_progress" status."""
+    attempt = ChallengeAttempt.objects.filter(student=student, challenge=OuterRef("pk"))
+    challenges = list(
+        DailyChallenge.objects
+        .filter(subject__in=user.math_levels.all())
+        .annotate(attempt_completed=Subquery(attempt.values("completed")[:1]))
+        # No attempt annotates NULL, which .exclude(attempt_completed=True)
+        # would drop too
+        .filter(Q(attempt_completed__isnull=True) | Q(attempt_completed=False))
+        .select_related("subject")
+        .order_by("-publishing_date")[:limit]
+    )
+    for c in challenges:
+        c.status = "new" if c.attempt_completed is None else "in_progress"
+    return challenges
+
+
+def build(user, student, progress):
+    user_lang = getattr(user, 'language', 'en')
+
+    total_questions, correct_answers = answer_stats(student)
+    accuracy = round(
+        (correct_answers / total_questions) * 100, 2
+    ) if total_questions > 0 else 0
+
+    challenges = open_challenges(user, student)
+    prefetch_translations(challenges, user_lang)
+
+    return {
+        "leaderboard": leaderboard_top(),
+        "user": {
+            "total_points": progress.total_points,
+            "level": progress.level,
+            "rank": ranking.rank_of(student.id),
+            "accuracy": accuracy,
+            "questions_attempted": total_questions,
+            "challenges_attended": ChallengeAttempt.objects.filter(student=student).count()
+        },
+        "daily_challenges": [
+            {
+                "id": str(c.id),
+                "name": c.get_translated_name(user_lang),
+                "subject": get_translated_level_name(c.subject.name, user_lang),
+                "grade": c.grade,
+                "points": c.points,
+                "status": c.status
+            }
+            for c in challenges
+        ]
+    }
+
+
+def get(user, student, progress):
+    """Cached dashboard payload of `student` in the user's language."""
+    user_lang = getattr(user, 'language', 'en')
+    cached = dashboards.get(student.id)
+    if cached and cached.get("language") == user_lang:
+        data = cached["data"]
+        # Points are awarded after the answer that invalidated the entry;
+        # the caller's progress row is always current
+        data["user"]["total_points"] = progress.total_points
+        data["user"]["level"] = progress.level
+        return data
+
+    data = build(user, student, progress)
+    dashboards.set(student.id, {"language": user_lang, "data": data})
+    return data
@@ -10,11 +10,28 @@ Triggers:
   - scholar            → student reaches level 10
   - grand_scholar      → student reaches level 25
   - streak_7/10/30/100 → checked on every completion
+
+Also drops the student's cached dashboard (challenge.dashboard) whenever
+they join, answer or complete a challenge.
 """
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
-from .models import ChallengeAttempt
+from . import dashboard
+from .models import ChallengeAttempt, QuestionAttempt
+
+
+@receiver(post_save, sender=ChallengeAttempt)
+def invalidate_dashboard_on_attempt(sender, instance, **kwargs):
+    student_id = instance.student_id
+    transaction.on_commit(lambda: dashboard.invalidate(student_id))
+
+
+@receiver(post_save, sender=QuestionAttempt)
+def invalidate_dashboard_on_answer(sender, instance, **kwargs):
+    student_id = instance.attempt.student_id
+    transaction.on_commit(lambda: dashboard.invalidate(student_id))
 
 
 @receiver(post_save, sender=ChallengeAttempt)
@@ -25,7 +42,8 @@ def check_challenge_badges(sender, instance, created, **kwargs):
 
     student = instance.student
 
-    from student.utils import award_badge_by_code, calculate_streaks
+    from student import streaks
+    from student.utils import award_badge_by_code
 
     # ---- Challenge count badges ----
     completed_count = ChallengeAttempt.objects.filter(
@@ -54,22 +72,8 @@ def check_challenge_badges(sender, instance, created, **kwargs):
 
     # ---- Streak badges ----
     from django.utils import timezone
-    challenge_dates = list(
-        ChallengeAttempt.objects
-        .filter(student=student, completed=True)
-        .values_list('created_at', flat=True)
-    )
-    challenge_dates = [timezone.localtime(dt).date() for dt in challenge_dates if dt]
-    current_streak, _ = calculate_streaks(challenge_dates)
-
-    if current_streak >= 7:
-        award_badge_by_code(student, 'streak_7')
-    if current_streak >= 10:
-        award_badge_by_code(student, 'streak_10')
-    if current_streak >= 30:
-        award_badge_by_code(student, 'streak_30')
-    if current_streak >= 100:
-        award_badge_by_code(student, 'streak_100')
+    streak = streaks.record(student.id, streaks.CHALLENGE, timezone.localtime(instance.created_at).date())
+    streaks.award_streak_badges(student, streaks.ongoing(streak))
 
     # ---- Level badges ----
     try:
@@ -1,3 +1,68 @@
-from django.test import TestCase
+"""
+Tests for the student dashboard (challenge.dashboard).
+"""
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from account.models import StudentProfile, UserAccount
+from administration.models import ChallengeQuestion, DailyChallenge, MathLevels
+
+from .models import ChallengeAttempt, QuestionAttempt
+
+User = get_user_model()
+
+DASHBOARD_URL = "/challenge/dashboard/"
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.level = MathLevels.objects.create(name="Algebra")
+        self.user = User.objects.create_user(username="student", password="test1234", email="student@test.com")
+        self.user.math_levels.add(self.level)
+        self.student = StudentProfile.objects.create(account=UserAccount.objects.get(user=self.user))
+
+        self.challenges = [
+            DailyChallenge.objects.create(
+                name=f"Challenge {i}", description="", subject=self.level, grade=5,
+                number_of_questions=2, points=20, publishing_date=date(2026, 1, i + 1),
+            )
+            for i in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _status(self):
+        resp = self.client.get(DASHBOARD_URL)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json(), {c["name"]: c["status"] for c in resp.json()["daily_challenges"]}
+
+    def test_status_accuracy_and_invalidation(self):
+        old, started, done = self.challenges
+        attempt = ChallengeAttempt.objects.create(student=self.student, challenge=started)
+        ChallengeAttempt.objects.create(student=self.student, challenge=done, completed=True)
+        question = ChallengeQuestion.objects.create(challenge=started, order=1, question_text="1+1", answer="2")
+        QuestionAttempt.objects.create(attempt=attempt, question=question, is_correct=True)
+        QuestionAttempt.objects.create(attempt=attempt, question=question, is_correct=False)
+
+        data, statuses = self._status()
+        self.assertEqual(statuses, {"Challenge 0": "new", "Challenge 1": "in_progress"})
+        self.assertEqual((data["user"]["accuracy"], data["user"]["questions_attempted"]), (50.0, 2))
+
+        # Served from the cache until the student answers or completes again
+        DailyChallenge.objects.create(
+            name="Challenge 3", description="", subject=self.level, grade=5,
+            number_of_questions=2, points=20, publishing_date=date(2026, 1, 4),
+        )
+        self.assertNotIn("Challenge 3", self._status()[1])
+
+        # The signal drops the entry once the completion commits
+        with self.captureOnCommitCallbacks(execute=True):
+            attempt.completed = True
+            attempt.save(update_fields=["completed"])
+        self.assertEqual(self._status()[1], {"Challenge 3": "new", "Challenge 0": "new"})
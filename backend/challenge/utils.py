@@ -1,5 +1,6 @@
 import os
-import requests
+
+from core import outbound
 
 AI_BASE_URL = os.getenv("AI_BASE_URL")
 
@@ -12,7 +13,8 @@ def _check_ai():
 def process_math_problem(prompt: str) -> str:
     _check_ai()
 
-    res = requests.post(
+    res = outbound.post(
+        "ai",
         f"{AI_BASE_URL}/generate",
         json={"prompt": prompt},
         timeout=30
@@ -37,11 +39,14 @@ def process_math_problem_from_url(image_url: str, prompt: str) -> str:
         data["image_url"] = image_url
 
     try:
-        res = requests.post(
+        res = outbound.post(
+            "ai",
             f"{AI_BASE_URL}/generate-from-image",
             data=data,
             files=files,
-            timeout=45
+            timeout=45,
+            # an uploaded file cannot be re-sent
+            retries=0 if files else None,
         )
     finally:
         if files:
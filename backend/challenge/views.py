@@ -9,11 +9,15 @@ from django.core.paginator import Paginator, EmptyPage
 from django.db.models import Q, Exists, OuterRef
 from django.conf import settings
 
+from account import leaderboard as ranking
 from account.models import StudentProfile, UserAccount, StudentProgress
 from administration.models import DailyChallenge, ChallengeQuestion
 from challenge.models import QuestionAttempt, ChallengeAttempt
 from core.utils import get_translated_level_name
+from administration.translations import prefetch as prefetch_translations
+from student.utils import add_points
 
+from . import dashboard
 from .ai_client import check_solution_with_ai
 from .pagination import StandardResultsPagination, LeaderboardPagination
 
@@ -31,108 +35,8 @@ class DashboardView(APIView):
         student = get_object_or_404(StudentProfile, account=account)
         progress, _ = StudentProgress.objects.get_or_create(student=student)
 
-        # -----------------------------
-        # Leaderboard (Top 3)
-        # -----------------------------
-        leaderboard_qs = (
-            StudentProgress.objects
-            .select_related("student__account__user")
-            .order_by("-total_points")[:3]
-        )
-
-        leaderboard = [
-            {
-                "name": p.student.account.user.get_full_name(),
-                "points": p.total_points,
-                "country": p.student.account.user.country,
-                "profile_pic": p.student.account.user.profile_pic.url if p.student.account.user.profile_pic else None
-            }
-            for p in leaderboard_qs
-        ]
-
-        # -----------------------------
-        # User Rank
-        # -----------------------------
-        ranked_ids = list(
-            StudentProgress.objects
-            .order_by("-total_points")
-            .values_list("student_id", flat=True)
-        )
-
-        user_rank = (
-            ranked_ids.index(student.id) + 1
-            if student.id in ranked_ids else None
-        )
-
-        # -----------------------------
-        # Accuracy
-        # -----------------------------
-        total_questions = QuestionAttempt.objects.filter(
-            attempt__student=student
-        ).count()
-
-        correct_answers = QuestionAttempt.objects.filter(
-            attempt__student=student,
-            is_correct=True
-        ).count()
-
-        accuracy = round(
-            (correct_answers / total_questions) * 100, 2
-        ) if total_questions > 0 else 0
-
-        # -----------------------------
-        # Challenges Attended
-        # -----------------------------
-        challenges_attended = ChallengeAttempt.objects.filter(
-            student=student
-        ).count()
-
-        # -----------------------------
-        # Daily Challenges Status
-        # -----------------------------
-        user_math_levels = account.user.math_levels.all()
-        challenges = DailyChallenge.objects.filter(subject__in=user_math_levels).select_related("subject").order_by("-publishing_date")
-
-        challenge_data = []
-        for c in challenges:
-            attempt = ChallengeAttempt.objects.filter(
-                student=student,
-                challenge=c
-            ).first()
-
-            if not attempt:
-                status = "new"
-            elif attempt.completed:
-                continue
-            else:
-                status = "in_progress"
-
-            user_lang = getattr(request.user, 'language', 'en')
-
-            challenge_data.append({
-                "id": str(c.id),
-                "name": c.get_translated_name(user_lang),
-                "subject": get_translated_level_name(c.subject.name, user_lang),
-                "grade": c.grade,
-                "points": c.points,
-                "status": status
-            })
-
-        # -----------------------------
-        # Final response
-        # -----------------------------
-        return Response({
-            "leaderboard": leaderboard,
-            "user": {
-                "total_points": progress.total_points,
-                "level": progress.level,
-                "rank": user_rank,
-                "accuracy": accuracy,
-                "questions_attempted": total_questions,
-                "challenges_attended": challenges_attended
-            },
-            "daily_challenges": challenge_data
-        })
+        # Leaderboard, rank, accuracy and open challenges (see challenge.dashboard)
+        return Response(dashboard.get(request.user, student, progress))
 
 
 class ChallengeListView(APIView):
@@ -171,6 +75,7 @@ class ChallengeListView(APIView):
         page = paginator.paginate_queryset(queryset, request)
 
         user_lang = getattr(request.user, 'language', 'en')
+        prefetch_translations(page, user_lang)
 
         results = [
             {
@@ -359,32 +264,41 @@ class LeaderboardView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        period = request.query_params.get("period", "all_time")
-
-        queryset = (
-            StudentProgress.objects
-            .select_related("student__account__user")
-            .order_by("-total_points", "student_id")[:50]
-        )
-
-        ranked = []
-        for idx, p in enumerate(queryset, start=1):
-            user = p.student.account.user
+        period = request.query_params.get("period", ranking.ALL_TIME)
+        if period not in ranking.PERIODS:
+            return Response(
+                {"detail": f"period must be one of: {', '.join(ranking.PERIODS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-            ranked.append({
-                "rank": idx,
-                "name": user.get_full_name(),
-                "country": user.country,
-                "points": p.total_points,
-                "profile_pic": (
-                    user.profile_pic.url if user.profile_pic else None
-                ),
-            })
+        def serialize(entries):
+            ranked = []
+            for p, points, rank in ranking.hydrate(entries):
+                user = p.student.account.user
+
+                ranked.append({
+                    "rank": rank,
+                    "name": user.get_full_name(),
+                    "country": user.country,
+                    "points": points,
+                    "profile_pic": (
+                        user.profile_pic.url if user.profile_pic else None
+                    ),
+                })
+            return ranked
+
+        ranked = serialize(ranking.top(50, period))
+
+        around_me = []
+        student = StudentProfile.objects.filter(account__user=request.user).first()
+        if student:
+            around_me = serialize(ranking.around(student.id, period=period))
 
         return Response({
             "period": period,
             "top_champions": ranked[:3],
             "global_rankings": ranked[3:],
+            "around_me": around_me,
             "total_returned": len(ranked)
         })
 
@@ -630,7 +544,8 @@ class SubmitSolutionView(APIView):
                 attempt.score += points_per_question
                 attempt.save(update_fields=["score"])
 
-                progress.add_points(points_per_question)
+                add_points(student, points_per_question)
+                progress.refresh_from_db(fields=["total_points", "level"])
                 points_awarded = points_per_question
 
             # -----------------------------
@@ -1,8 +1,16 @@
 import datetime
+import logging
+from django.conf import settings
 from django.utils import timezone
-from django.core.cache import cache
-from account.models import DailyActivity
+from core.shared_cache import Namespace
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from student.tasks import record_daily_activity
+
+logger = logging.getLogger(__name__)
+
+daily_activity_seen = Namespace("daily-activity", timeout=86400)
 
 class TimezoneMiddleware:
     """
@@ -27,64 +35,49 @@ class TimezoneMiddleware:
 
 class DailyActivityMiddleware:
     """
-    Middleware to ensure the user gets a daily activity logged (and awarded points) 
-    the first time they make a request on any given day.
+    Marks the first request of each day per user, without touching the database.
+
+    The user id is read from the access token (signature and expiry are
+    checked, the user is not loaded) and the check is a single atomic add()
+    on the shared cache. Only the request that wins it queues
+    student.tasks.record_daily_activity, which awards the daily point and
+    the login streak badges in the background.
     """
     def __init__(self, get_response):
         self.get_response = get_response
+        self.jwt_auth = JWTAuthentication()
 
-    def __call__(self, request):
-        user = request.user
-
-        if not user.is_authenticated:
+    def _user_id(self, request):
+        header = self.jwt_auth.get_header(request)
+        if header is not None:
+            raw_token = self.jwt_auth.get_raw_token(header)
+            if raw_token is None:
+                return None
             try:
-                jwt_auth = JWTAuthentication()
-                auth_result = jwt_auth.authenticate(request)
-                if auth_result:
-                    user, token = auth_result
-            except Exception:
-                pass
+                token = self.jwt_auth.get_validated_token(raw_token)
+            except InvalidToken:
+                return None
+            return token.get(jwt_settings.USER_ID_CLAIM)
 
-        if user and user.is_authenticated and hasattr(user, 'account'):
-            try:
-                student = user.account.student
-                today = timezone.localdate()
-                cache_key = f"daily_activity_{student.id}_{today.isoformat()}"
-                
-                # Check cache to avoid hitting the database for get_or_create on every request
-                if not cache.get(cache_key):
-                    # Try to get or create daily activity
-                    # This Awards 1 point for login (the first action of the day)
-                    activity, created = DailyActivity.objects.get_or_create(
-                        student=student,
-                        date=today,
-                        defaults={"points_earned": 1} 
-                    )
-                    
-                    if created:
-                        # Update the student's total points since it's a new day
-                        progress = student.progress
-                        progress.add_points(1)
+        # Session users (Django admin); only loaded when a session cookie is sent
+        if settings.SESSION_COOKIE_NAME in request.COOKIES and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+    def __call__(self, request):
+        user_id = self._user_id(request)
+
+        if user_id is not None:
+            today = timezone.localdate().isoformat()
+            seen_key = (user_id, today)
 
-                        # Calculate app usage streaks and award badges
-                        from student.utils import calculate_streaks, award_badge_by_code
-                        login_dates = list(DailyActivity.objects.filter(student=student).values_list("date", flat=True))
-                        current_streak, _ = calculate_streaks(login_dates)
-                        
-                        if current_streak >= 7:
-                            award_badge_by_code(student, 'streak_7')
-                        if current_streak >= 10:
-                            award_badge_by_code(student, 'streak_10')
-                        if current_streak >= 30:
-                            award_badge_by_code(student, 'streak_30')
-                        if current_streak >= 100:
-                            award_badge_by_code(student, 'streak_100')
-                    
-                    # Set cache to expire at the end of the day (timeout=86400 is 24 hours)
-                    cache.set(cache_key, True, timeout=86400)
-            except Exception:
-                # If the user is not a student (e.g. Teacher, Admin) or an error occurs, ignore
-                pass
+            if daily_activity_seen.add(seen_key):
+                try:
+                    record_daily_activity.delay(str(user_id), today)
+                except Exception as e:
+                    # Let the next request retry
+                    logger.warning(f"Could not queue daily activity of user {user_id}: {e}")
+                    daily_activity_seen.delete(seen_key)
 
         response = self.get_response(request)
         return response
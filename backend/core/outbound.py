@@ -0,0 +1,322 @@
+"""
+Shared client for outbound HTTP calls to the AI, translation and media services.
+
+Every upstream gets:
+
+  - a requests.Session with a keep-alive connection pool, so calls reuse
+    TCP/TLS connections instead of opening a new one each time
+  - a concurrency limit; callers that cannot get a slot within
+    `acquire_timeout` fail with UpstreamBusy instead of queueing forever
+  - retries with full jitter on connection errors and 502/503/504 (not on
+    read timeouts)
+  - a circuit breaker: after `failure_threshold` consecutive failures the
+    upstream is considered down and calls fail immediately with
+    CircuitOpenError for `reset_timeout` seconds, then one trial call is
+    let through to probe it. A probe that never reports back (the caller
+    died or was cancelled) is replaced after `probe_timeout` seconds
+  - a latency histogram (see `metrics()`)
+
+Both errors subclass requests.RequestException, so existing
+`except requests.RequestException` handlers keep working.
+
+    from core import outbound
+    res = outbound.post("ai", f"{AI_BASE_URL}/generate", json=..., timeout=30)
+
+Async code goes through `apost` / `Upstream.arequest` with its own
+httpx.AsyncClient; it shares the slots, breaker, retries and histogram of
+the blocking calls, so a fan-out cannot exceed the upstream's limit:
+
+    async with httpx.AsyncClient() as client:
+        res = await outbound.apost("translate", client, LIBRETRANSLATE_URL, json=..., timeout=20)
+"""
+import asyncio
+import bisect
+import logging
+import random
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+RETRY_STATUSES = (502, 503, 504)
+
+# httpx errors retried like requests.ConnectionError (connect timeouts
+# included, read timeouts not)
+ASYNC_RETRY_ERRORS = (httpx.NetworkError, httpx.ConnectTimeout)
+
+# Seconds between checks for a free slot in async callers
+SLOT_POLL_INTERVAL = 0.01
+
+UPSTREAMS = {
+    # LibreTranslate
+    "translate": {"max_concurrency": 16, "retries": 2},
+    # AI_BASE_URL: solution checking, problem solving, question generation
+    "ai": {"max_concurrency": 8, "retries": 1},
+    # AI_CHAT_BASE_URL: tutor chat
+    "ai_chat": {"max_concurrency": 8, "retries": 1},
+    # Cloudinary: post images fetched for moderation
+    "media": {"max_concurrency": 16, "retries": 1},
+}
+
+DEFAULTS = {
+    "max_concurrency": 8,
+    "acquire_timeout": 2.0,
+    "retries": 1,
+    "backoff": 0.2,
+    "failure_threshold": 5,
+    "reset_timeout": 30.0,
+    # Longer than any request timeout used with the upstreams
+    "probe_timeout": 60.0,
+}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """The upstream failed repeatedly; the call was not attempted."""
+
+
+class UpstreamBusy(requests.ConnectionError):
+    """All connection slots for the upstream are in use."""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout, probe_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+                # Let exactly one probe through
+                self.state = self.HALF_OPEN
+                self.probe_started_at = now
+                return True
+            if self.state == self.HALF_OPEN and now - self.probe_started_at >= self.probe_timeout:
+                # The probe never reported back; let another one through
+                self.probe_started_at = now
+                return True
+            return False
+
+    def abandon(self):
+        """The call let through never reached the upstream; the next call probes instead."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic() - self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.total += seconds
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            labels = [f"le_{b}" for b in self.buckets] + ["le_inf"]
+            return {
+                "buckets": dict(zip(labels, self.counts)),
+                "count": self.count,
+                "sum": round(self.total, 3),
+            }
+
+
+class Upstream:
+    def __init__(self, name, max_concurrency, acquire_timeout, retries, backoff,
+                 failure_threshold, reset_timeout, probe_timeout):
+        self.name = name
+        self.acquire_timeout = acquire_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, probe_timeout)
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _retry_delay(self, attempt):
+        # Full jitter: spread retries of concurrent callers apart
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def _should_retry(self, response, attempt, retries):
+        """Record the outcome of `response`; True if it should be retried."""
+        if response.status_code >= 500:
+            self.errors += 1
+            self.breaker.record_failure()
+            return response.status_code in RETRY_STATUSES and attempt < retries
+        self.breaker.record_success()
+        return False
+
+    async def _acquire_slot_async(self):
+        # The slots are shared with threads, so they are polled instead of
+        # blocking the event loop
+        deadline = time.monotonic() + self.acquire_timeout
+        while not self._slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(SLOT_POLL_INTERVAL)
+        return True
+
+    def request(self, method, url, retries=None, **kwargs):
+        retries = self.retries if retries is None else retries
+
+        for attempt in range(retries + 1):
+            # The slot is taken first: a probe let through by the breaker
+            # must always get to report its outcome
+            if not self._slots.acquire(timeout=self.acquire_timeout):
+                self.rejected += 1
+                raise UpstreamBusy(f"{self.name} upstream is busy")
+
+            if not self.breaker.allow():
+                self._slots.release()
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} upstream is unavailable (circuit open)")
+
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                self.errors += 1
+                self.breaker.record_failure()
+                # Read timeouts are not retried: the caller already waited the full timeout
+                if attempt >= retries or not isinstance(e, requests.ConnectionError):
+                    raise
+                time.sleep(self._retry_delay(attempt))
+                continue
+            except BaseException:
+                # Not an upstream failure (bad arguments, interrupted worker)
+                self.breaker.abandon()
+                raise
+            finally:
+                self.latency.observe(time.monotonic() - started)
+                self._slots.release()
+
+            if self._should_retry(response, attempt, retries):
+                response.close()
+                time.sleep(self._retry_delay(attempt))
+                continue
+            return response
+
+    async def arequest(self, client, method, url, retries=None, **kwargs):
+        """`request` for async code, sent with the caller's httpx.AsyncClient."""
+        retries = self.retries if retries is None else retries
+
+        for attempt in range(retries + 1):
+            if not await self._acquire_slot_async():
+                self.rejected += 1
+                raise UpstreamBusy(f"{self.name} upstream is busy")
+
+            if not self.breaker.allow():
+                self._slots.release()
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} upstream is unavailable (circuit open)")
+
+            started = time.monotonic()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                self.errors += 1
+                self.breaker.record_failure()
+                if attempt >= retries or not isinstance(e, ASYNC_RETRY_ERRORS):
+                    raise
+                await asyncio.sleep(self._retry_delay(attempt))
+                continue
+            except BaseException:
+                # Cancelled, or not an upstream failure
+                self.breaker.abandon()
+                raise
+            finally:
+                self.latency.observe(time.monotonic() - started)
+                self._slots.release()
+
+            if self._should_retry(response, attempt, retries):
+                await asyncio.sleep(self._retry_delay(attempt))
+                continue
+            return response
+
+    def snapshot(self):
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "latency": self.latency.snapshot(),
+        }
+
+
+_upstreams = {}
+_registry_lock = threading.Lock()
+
+
+def get_upstream(name):
+    with _registry_lock:
+        if name not in _upstreams:
+            _upstreams[name] = Upstream(name, **{**DEFAULTS, **UPSTREAMS.get(name, {})})
+        return _upstreams[name]
+
+
+def request(upstream, method, url, **kwargs):
+    return get_upstream(upstream).request(method, url, **kwargs)
+
+
+def post(upstream, url, **kwargs):
+    return request(upstream, "POST", url, **kwargs)
+
+
+async def arequest(upstream, client, method, url, **kwargs):
+    return await get_upstream(upstream).arequest(client, method, url, **kwargs)
+
+
+async def apost(upstream, client, url, **kwargs):
+    return await arequest(upstream, client, "POST", url, **kwargs)
+
+
+def metrics():
+    """Breaker state, error counts and latency histogram of every upstream used so far."""
+    with _registry_lock:
+        upstreams = dict(_upstreams)
+    return {name: upstream.snapshot() for name, upstream in upstreams.items()}
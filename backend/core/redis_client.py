@@ -0,0 +1,69 @@
+import redis
+
+from django.conf import settings
+
+_client = None
+
+
+def get_redis():
+    """
+    Shared Redis connection pool for app-level data structures.
+
+    Timeouts are short on purpose: callers are expected to catch
+    redis.RedisError and fall back to the database.
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+            decode_responses=True,
+        )
+    return _client
+
+
+_blocking_client = None
+
+
+def get_blocking_redis():
+    """
+    Client for blocking commands (BLPOP) that wait longer than get_redis()'s
+    socket timeout.
+
+    The command's own timeout bounds the wait, so there is no socket timeout
+    and no retry: with either, a BLPOP that simply has nothing to return
+    would fail or be re-sent instead of returning None on time.
+    """
+    global _blocking_client
+    if _blocking_client is None:
+        from redis.backoff import NoBackoff
+        from redis.retry import Retry
+
+        _blocking_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=None,
+            socket_connect_timeout=0.5,
+            socket_keepalive=True,
+            retry=Retry(NoBackoff(), 0),
+            decode_responses=True,
+        )
+    return _blocking_client
+
+
+_async_client = None
+
+
+def get_async_redis():
+    """asyncio counterpart of get_redis() for the Socket.IO server."""
+    global _async_client
+    if _async_client is None:
+        import redis.asyncio
+
+        _async_client = redis.asyncio.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+            decode_responses=True,
+        )
+    return _async_client
@@ -139,16 +139,43 @@ DATABASES = {
     }
 }
 
+REDIS_HOST = env('REDIS_HOST', default='127.0.0.1')
+
 # Redis channel layer
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
         "CONFIG": {
-            "hosts": [(env('REDIS_HOST', default='127.0.0.1'), 6379)],
+            "hosts": [(REDIS_HOST, 6379)],
         },
     },
 }
 
+# Redis used directly by the app (leaderboards, presence, ...)
+REDIS_URL = env('REDIS_URL', default=f'redis://{REDIS_HOST}:6379/1')
+
+# Message queue shared by every Socket.IO worker, so emits reach sockets on any node
+SOCKETIO_REDIS_URL = env('SOCKETIO_REDIS_URL', default=f'redis://{REDIS_HOST}:6379/2')
+
+# Shared cache (core.shared_cache); every worker sees the same entries.
+# Bump CACHE_VERSION to drop the whole cache on deploy.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env('CACHE_REDIS_URL', default=f'redis://{REDIS_HOST}:6379/3'),
+        "KEY_PREFIX": "mathos",
+        "VERSION": env.int('CACHE_VERSION', default=1),
+        "TIMEOUT": 300,
+        "OPTIONS": {
+            "socket_timeout": 0.5,
+            "socket_connect_timeout": 0.5,
+        },
+    }
+}
+
+# Batch chat message INSERTs from the socket server into group commits
+CHAT_WRITE_BEHIND = env.bool('CHAT_WRITE_BEHIND', default=False)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -247,6 +274,14 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Dhaka'  
 
+# Image moderation runs on its own workers so only they load the NudeDetector model:
+#   NUDITY_WARM_DETECTOR=True celery -A core worker -Q moderation
+CELERY_TASK_ROUTES = {
+    'post.tasks.run_nudity_check': {'queue': 'moderation'},
+    'post.tasks.run_nudity_check_batch': {'queue': 'moderation'},
+}
+NUDITY_WARM_DETECTOR = env.bool('NUDITY_WARM_DETECTOR', default=False)
+
 # email setup
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.hostinger.com'
@@ -0,0 +1,156 @@
+"""
+Application cache on the shared Redis (settings.CACHES["default"]).
+
+Every worker and every node sees the same entries, so one-per-day and
+one-per-30-minutes guards really are global. Entries live in namespaces:
+
+    level_names = Namespace("level-names", timeout=86400, versioned=True)
+    level_names.get_or_set(("Algebra", "es"), lambda: translate(...))
+    level_names.bump()      # drop every entry of the namespace at once
+
+  - keys are "<namespace>:<part>:<part>..." (plus Django's KEY_PREFIX and
+    version), so namespaces never collide
+  - versioned namespaces keep a version number in the cache; bump()
+    increments it and the old keys are never read again (they expire on
+    their own), so bulk invalidation needs no key scan. Workers re-read
+    the version at most every VERSION_CHECK_INTERVAL seconds
+  - get_or_set() lets one caller recompute a missing entry while the others
+    wait up to LOCK_WAIT seconds for it instead of all recomputing it
+    (cache stampede)
+  - when Redis fails, reads count as misses and writes are dropped, so
+    callers fall through to their uncached path
+
+Hits, misses, stampede waits and errors are counted per namespace
+(`stats()`, this process).
+"""
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2.0
+LOCK_POLL = 0.05
+
+VERSION_CHECK_INTERVAL = 5
+
+_MISSING = object()
+
+_namespaces = {}
+
+
+class Namespace:
+    def __init__(self, name, timeout=300, versioned=False):
+        self.name = name
+        self.timeout = timeout
+        self.versioned = versioned
+        self._version = None
+        self._version_checked_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "waits": 0, "errors": 0}
+        _namespaces[name] = self
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _call(self, op, *args, fallback=None, **kwargs):
+        try:
+            return getattr(cache, op)(*args, **kwargs)
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"Cache {op} failed in {self.name}: {e}")
+            return fallback
+
+    def _version_key(self):
+        return f"{self.name}:version"
+
+    def version(self):
+        if not self.versioned:
+            return None
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked_at >= VERSION_CHECK_INTERVAL:
+            self._version = self._call("get", self._version_key(), fallback=1) or 1
+            self._version_checked_at = now
+        return self._version
+
+    def key(self, ident):
+        parts = ident if isinstance(ident, (tuple, list)) else (ident,)
+        key = ":".join([self.name, *(str(part) for part in parts)]).replace(" ", "_")
+        version = self.version()
+        return key if version is None else f"{key}:v{version}"
+
+    def get(self, ident, default=None):
+        value = self._call("get", self.key(ident), _MISSING, fallback=_MISSING)
+        if value is _MISSING:
+            self._count("misses")
+            return default
+        self._count("hits")
+        return value
+
+    def set(self, ident, value, timeout=None):
+        self._call("set", self.key(ident), value, timeout=timeout or self.timeout)
+
+    def add(self, ident, value=True, timeout=None):
+        """Store only if absent; True if this call stored it (or the cache is down)."""
+        return self._call("add", self.key(ident), value, timeout=timeout or self.timeout, fallback=True)
+
+    def delete(self, ident):
+        self._call("delete", self.key(ident))
+
+    def get_or_set(self, ident, compute, timeout=None):
+        key = self.key(ident)
+        value = self._call("get", key, _MISSING, fallback=_MISSING)
+        if value is not _MISSING:
+            self._count("hits")
+            return value
+        self._count("misses")
+
+        lock_key = f"{key}:lock"
+        if not self._call("add", lock_key, 1, timeout=LOCK_TIMEOUT, fallback=True):
+            # Someone else is computing it
+            self._count("waits")
+            deadline = time.monotonic() + LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL)
+                value = self._call("get", key, _MISSING, fallback=_MISSING)
+                if value is not _MISSING:
+                    return value
+            return compute()
+
+        try:
+            value = compute()
+            self._call("set", key, value, timeout=timeout or self.timeout)
+        finally:
+            self._call("delete", lock_key)
+        return value
+
+    def bump(self):
+        """Invalidate every entry of a versioned namespace."""
+        if not self.versioned:
+            raise ValueError(f"Namespace {self.name} is not versioned")
+        version_key = self._version_key()
+        # A missing version is 1, so the first bump stores 2
+        if self._call("add", version_key, 2, timeout=None, fallback=False):
+            version = 2
+        else:
+            version = self._call("incr", version_key, fallback=None)
+        if version is not None:
+            self._version = version
+            self._version_checked_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+        lookups = data["hits"] + data["misses"]
+        data["hit_rate"] = data["hits"] / lookups if lookups else 0.0
+        if self.versioned:
+            data["version"] = self._version
+        return data
+
+
+def stats():
+    return {name: namespace.stats() for name, namespace in _namespaces.items()}
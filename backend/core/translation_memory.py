@@ -0,0 +1,169 @@
+"""
+Translation memory in front of LibreTranslate.
+
+Every translation is stored under sha256(source lang, target lang,
+normalised source text) in administration.TranslationMemory, so a string
+that was translated once (a short comment, a repeated challenge question,
+a math level name) is never sent upstream again, whatever object it
+belongs to. A per-process LRU keeps the hottest entries out of the
+database as well.
+
+Lookups are counted per tier (lru / db / miss) both in this process and,
+best effort and in batches, in the `translation_memory:stats` Redis hash so the hit rate
+can be watched across workers (`translation_memory_stats` command).
+"""
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+LRU_SIZE = 10000
+STATS_KEY = "translation_memory:stats"
+STATS_FLUSH_EVERY = 100
+
+_WHITESPACE = re.compile(r"[ \t\u00a0]+")
+
+_lru = OrderedDict()
+_lock = threading.Lock()
+_stats = {"lru_hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+_pending = {}
+
+
+def normalise(text):
+    """Canonical form used for the key: NFC, trimmed, runs of spaces collapsed."""
+    text = unicodedata.normalize("NFC", text).strip()
+    return _WHITESPACE.sub(" ", text)
+
+
+def digest(text, source_lang, target_lang):
+    key = f"{source_lang}\x00{target_lang}\x00{normalise(text)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _lru_get(key):
+    with _lock:
+        value = _lru.get(key)
+        if value is not None:
+            _lru.move_to_end(key)
+        return value
+
+
+def _lru_put(key, value):
+    with _lock:
+        _lru[key] = value
+        _lru.move_to_end(key)
+        while len(_lru) > LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def _count(**deltas):
+    """Bump the local counters; ship them to Redis every STATS_FLUSH_EVERY events."""
+    with _lock:
+        for name, delta in deltas.items():
+            _stats[name] += delta
+            _pending[name] = _pending.get(name, 0) + delta
+        if sum(_pending.values()) < STATS_FLUSH_EVERY:
+            return
+        pending = dict(_pending)
+        _pending.clear()
+
+    try:
+        from core.redis_client import get_redis
+
+        pipe = get_redis().pipeline()
+        for name, delta in pending.items():
+            if delta:
+                pipe.hincrby(STATS_KEY, name, delta)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Translation memory stats not recorded: {e}")
+
+
+def lookup_many(texts, source_lang, target_lang):
+    """Return {index: translation} for every text of `texts` already in memory."""
+    from administration.models import TranslationMemory
+
+    found = {}
+    missing = {}
+    lru_hits = 0
+    for i, text in enumerate(texts):
+        if not text:
+            continue
+        key = digest(text, source_lang, target_lang)
+        cached = _lru_get(key)
+        if cached is not None:
+            found[i] = cached
+            lru_hits += 1
+        else:
+            missing.setdefault(key, []).append(i)
+
+    db_hits = 0
+    if missing:
+        try:
+            rows = TranslationMemory.objects.filter(digest__in=list(missing)).values_list(
+                "digest", "translated_text"
+            )
+            for key, translated in rows:
+                _lru_put(key, translated)
+                for i in missing.pop(key):
+                    found[i] = translated
+                    db_hits += 1
+        except Exception as e:
+            logger.warning(f"Translation memory lookup failed: {e}")
+
+    _count(lru_hits=lru_hits, db_hits=db_hits, misses=sum(len(v) for v in missing.values()))
+    return found
+
+
+def lookup(text, source_lang, target_lang):
+    return lookup_many([text], source_lang, target_lang).get(0)
+
+
+def store_many(pairs, source_lang, target_lang):
+    """Remember [(source text, translated text)] for the language pair."""
+    from administration.models import TranslationMemory
+
+    entries = {}
+    for text, translated in pairs:
+        if not text or not translated:
+            continue
+        key = digest(text, source_lang, target_lang)
+        entries[key] = TranslationMemory(
+            digest=key,
+            source_language=source_lang,
+            target_language=target_lang,
+            source_text=text,
+            translated_text=translated,
+        )
+        _lru_put(key, translated)
+
+    if not entries:
+        return
+    try:
+        TranslationMemory.objects.bulk_create(entries.values(), ignore_conflicts=True)
+    except Exception as e:
+        logger.warning(f"Translation memory store failed: {e}")
+    _count(stores=len(entries))
+
+
+def store(text, translated, source_lang, target_lang):
+    store_many([(text, translated)], source_lang, target_lang)
+
+
+def stats():
+    """Hit/miss counters of this process with the overall hit rate."""
+    with _lock:
+        data = dict(_stats)
+        data["lru_size"] = len(_lru)
+    lookups = data["lru_hits"] + data["db_hits"] + data["misses"]
+    data["hit_rate"] = (data["lru_hits"] + data["db_hits"]) / lookups if lookups else 0.0
+    return data
+
+
+def clear_lru():
+    with _lock:
+        _lru.clear()
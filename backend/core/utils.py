@@ -1,22 +1,56 @@
-import requests
+import asyncio
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from core import outbound, translation_memory
+from core.shared_cache import Namespace
+
+logger = logging.getLogger(__name__)
 
 LIBRETRANSLATE_URL = "https://host.mathos.cloud/translate"  # Or public API
 
-import re
+# Languages every post, comment and challenge is translated into
+TRANSLATION_LANGUAGES = ['en', 'es', 'fr', 'de', 'zh', 'ja', 'he']
 
-def translate_text(text, target_lang, source_lang='en'):
-    if not text or target_lang == source_lang:
-        return text
+# Concurrent LibreTranslate requests per fan-out (within the "translate"
+# upstream's limit in core.outbound) and texts per request
+TRANSLATION_MAX_CONNECTIONS = 8
+TRANSLATION_BATCH_SIZE = 50
 
-    # Extract math blocks to prevent them from being translated or broken
-    math_pattern = re.compile(r'(```math.*?```|\\\(.*?\\\)|\\\[.*?\\\]|\$\$.*?\$\$|\$.*?\$)', re.DOTALL)
+MATH_PATTERN = re.compile(r'(```math.*?```|\\\(.*?\\\)|\\\[.*?\\\]|\$\$.*?\$\$|\$.*?\$)', re.DOTALL)
+
+
+def protect_math(text):
+    """Swap math blocks for MTHBLK placeholders so they survive translation."""
     math_blocks = []
-    
+
     def replacer(match):
         math_blocks.append(match.group(0))
         return f" MTHBLK{len(math_blocks)-1} "
-        
-    text_to_translate = math_pattern.sub(replacer, text)
+
+    return MATH_PATTERN.sub(replacer, text), math_blocks
+
+
+def restore_math(translated_text, math_blocks):
+    for i, block in enumerate(math_blocks):
+        placeholder_pattern = re.compile(r'mthblk\s*' + str(i) + r'\b', re.IGNORECASE)
+        translated_text = placeholder_pattern.sub(lambda m: block, translated_text)
+    return translated_text
+
+
+def translate_text(text, target_lang, source_lang='en'):
+    if not text or target_lang == source_lang:
+        return text
+
+    remembered = translation_memory.lookup(text, source_lang, target_lang)
+    if remembered is not None:
+        return remembered
+
+    # Extract math blocks to prevent them from being translated or broken
+    text_to_translate, math_blocks = protect_math(text)
 
     payload = {
         "q": text_to_translate,
@@ -27,39 +61,34 @@ def translate_text(text, target_lang, source_lang='en'):
 
     try:
         # Send as form data instead of JSON
-        response = requests.post(LIBRETRANSLATE_URL, data=payload, timeout=10)
+        response = outbound.post("translate", LIBRETRANSLATE_URL, data=payload, timeout=10)
         response.raise_for_status()
         translated_text = response.json().get('translatedText', text_to_translate)
-        
-        # Restore math blocks
-        for i, block in enumerate(math_blocks):
-            placeholder_pattern = re.compile(r'mthblk\s*' + str(i) + r'\b', re.IGNORECASE)
-            translated_text = placeholder_pattern.sub(lambda m: block, translated_text)
-            
+        translated_text = restore_math(translated_text, math_blocks)
+        translation_memory.store(text, translated_text, source_lang, target_lang)
         return translated_text
     except Exception as e:
         print("Translation error:", e)
         return text
 
-from django.core.cache import cache
+level_names = Namespace("level-names", timeout=86400, versioned=True)
+push_debounce = Namespace("push-debounce", timeout=1800)
+
 
 def get_translated_level_name(level_name, target_lang):
     if not target_lang or target_lang == 'en':
         return level_name
-    
-    cache_key = f"translated_level_{level_name}_{target_lang}".replace(" ", "_")
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
-    
-    translated = translate_text(level_name, target_lang, 'en')
-    cache.set(cache_key, translated, timeout=86400) # cache for 1 day
-    return translated
+
+    # One worker translates a missing name, concurrent requests wait for it
+    return level_names.get_or_set(
+        (level_name, target_lang),
+        lambda: translate_text(level_name, target_lang, 'en'),
+    )
 
 def send_push_notification(user, title, body, data=None):
     """
     Sends a push notification to all devices registered by the user.
-    Uses rate-limiting via Django's cache to prevent spamming notifications.
+    Uses rate-limiting via the shared cache to prevent spamming notifications.
     """
     try:
         if not data:
@@ -72,19 +101,16 @@ def send_push_notification(user, title, body, data=None):
         # Messages: no rate limit — every message must push
         if notif_type in ["like", "comment", "reply"]:
             post_id = data.get("post_id", "unknown_post")
-            cache_key = f"push_ratelimit_{user.id}_{notif_type}_{post_id}"
-            timeout = 1800  # 30 minutes
+            debounce_key = (user.id, notif_type, post_id)
         else:
             # No rate limit for messages and other types
-            cache_key = None
-            timeout = 0
+            debounce_key = None
 
-        # If cache key exists, skip sending push (debounce)
-        if cache_key:
-            if cache.get(cache_key):
-                print(f"Push skipped due to rate limit: {cache_key}")
+        # add() is atomic, so only the first push in the window across all workers is sent (debounce)
+        if debounce_key:
+            if not push_debounce.add(debounce_key):
+                print(f"Push skipped due to rate limit: {debounce_key}")
                 return
-            cache.set(cache_key, True, timeout=timeout)
 
         # Send push
         from post.models import FCMDevice
@@ -128,23 +154,19 @@ def translate_texts_batch(texts, target_lang, source_lang='en'):
     if target_lang == source_lang:
         return texts
 
-    math_pattern = re.compile(r'(```math.*?```|\\\(.*?\\\)|\\\[.*?\\\]|\$\$.*?\$\$|\$.*?\$)', re.DOTALL)
-    
+    # Only strings the translation memory does not know go upstream, once each
+    known = translation_memory.lookup_many(texts, source_lang, target_lang)
+    pending = list(dict.fromkeys(
+        text for i, text in enumerate(texts) if text and i not in known
+    ))
+    if not pending:
+        return [known.get(i, text) for i, text in enumerate(texts)]
+
     texts_to_translate = []
     all_math_blocks = []
-    
-    for text in texts:
-        if not text:
-            texts_to_translate.append(text)
-            all_math_blocks.append([])
-            continue
-            
-        math_blocks = []
-        def replacer(match):
-            math_blocks.append(match.group(0))
-            return f" MTHBLK{len(math_blocks)-1} "
-            
-        text_to_translate = math_pattern.sub(replacer, text)
+
+    for text in pending:
+        text_to_translate, math_blocks = protect_math(text)
         texts_to_translate.append(text_to_translate)
         all_math_blocks.append(math_blocks)
 
@@ -156,26 +178,136 @@ def translate_texts_batch(texts, target_lang, source_lang='en'):
     }
 
     try:
-        response = requests.post(LIBRETRANSLATE_URL, json=payload, timeout=20)
+        response = outbound.post("translate", LIBRETRANSLATE_URL, json=payload, timeout=20)
         response.raise_for_status()
         translated_texts = response.json().get('translatedText', texts_to_translate)
-        
-        if not isinstance(translated_texts, list):
+
+        if not isinstance(translated_texts, list) or len(translated_texts) != len(pending):
             return texts
-            
-        final_translated = []
+
+        fresh = {}
         for i, translated_text in enumerate(translated_texts):
-            if not translated_text:
-                final_translated.append(translated_text)
-                continue
-                
-            math_blocks = all_math_blocks[i]
-            for j, block in enumerate(math_blocks):
-                placeholder_pattern = re.compile(r'mthblk\s*' + str(j) + r'\b', re.IGNORECASE)
-                translated_text = placeholder_pattern.sub(lambda m: block, translated_text)
-            final_translated.append(translated_text)
-            
-        return final_translated
+            if translated_text:
+                fresh[pending[i]] = restore_math(translated_text, all_math_blocks[i])
+        translation_memory.store_many(fresh.items(), source_lang, target_lang)
+
+        return [
+            known[i] if i in known else fresh.get(text, text)
+            for i, text in enumerate(texts)
+        ]
     except Exception as e:
         print("Batch translation error:", e)
         return texts
+
+
+async def _translate_chunk(client, limit, texts, target_lang, source_lang):
+    protected = [protect_math(text) for text in texts]
+    # Same slots, breaker, retries and latency histogram as the blocking calls
+    async with limit:
+        response = await outbound.apost("translate", client, LIBRETRANSLATE_URL, json={
+            "q": [text for text, _ in protected],
+            "source": source_lang,
+            "target": target_lang,
+            "format": "text"
+        }, timeout=20)
+    response.raise_for_status()
+    translated_texts = response.json().get('translatedText')
+
+    if not isinstance(translated_texts, list) or len(translated_texts) != len(texts):
+        raise ValueError(f"Unexpected LibreTranslate response for {target_lang}")
+
+    return [
+        restore_math(translated, blocks) if translated else translated
+        for translated, (_, blocks) in zip(translated_texts, protected)
+    ]
+
+
+async def _translate_fan_out(pending_by_lang, source_lang):
+    limits = httpx.Limits(
+        max_connections=TRANSLATION_MAX_CONNECTIONS,
+        max_keepalive_connections=TRANSLATION_MAX_CONNECTIONS,
+    )
+    # Chunks beyond this wait here rather than for an upstream slot, where
+    # they would fail with UpstreamBusy after its acquire timeout
+    limit = asyncio.Semaphore(TRANSLATION_MAX_CONNECTIONS)
+
+    async with httpx.AsyncClient(limits=limits) as client:
+        async def translate_lang(lang, texts):
+            results = await asyncio.gather(*(
+                _translate_chunk(client, limit, texts[i:i + TRANSLATION_BATCH_SIZE], lang, source_lang)
+                for i in range(0, len(texts), TRANSLATION_BATCH_SIZE)
+            ))
+            return dict(zip(texts, (text for chunk in results for text in chunk)))
+
+        langs = list(pending_by_lang)
+        results = await asyncio.gather(
+            *(translate_lang(lang, pending_by_lang[lang]) for lang in langs),
+            return_exceptions=True,
+        )
+
+    translations = {}
+    for lang, result in zip(langs, results):
+        if isinstance(result, Exception):
+            logger.error(f"Translation to {lang} failed: {result}")
+            continue
+        translations[lang] = result
+    return translations
+
+
+def _run_fan_out(pending_by_lang, source_lang):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_translate_fan_out(pending_by_lang, source_lang))
+    # Called from async code (ASGI views, socket handlers): asyncio.run()
+    # cannot nest, so the fan-out gets its own loop in a worker thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, _translate_fan_out(pending_by_lang, source_lang)).result()
+
+
+def translate_texts_concurrently(texts, target_langs=None, source_lang='en'):
+    """
+    Translate `texts` into every language of `target_langs` at once.
+
+    Strings already in the translation memory are answered from it; the
+    rest are sent for all languages (in chunks of TRANSLATION_BATCH_SIZE)
+    concurrently over one pooled async client instead of one blocking
+    round-trip per language. Returns {lang: [translated texts]} in the order
+    of `texts`; languages whose request failed are left out so the caller
+    can retry them later instead of storing the untranslated text.
+    """
+    if target_langs is None:
+        target_langs = TRANSLATION_LANGUAGES
+    target_langs = [lang for lang in target_langs if lang != source_lang]
+    texts = list(texts)
+    if not texts or not target_langs:
+        return {}
+
+    known_by_lang = {}
+    pending_by_lang = {}
+    for lang in target_langs:
+        known = translation_memory.lookup_many(texts, source_lang, lang)
+        known_by_lang[lang] = known
+        pending = list(dict.fromkeys(
+            text for i, text in enumerate(texts) if text and i not in known
+        ))
+        if pending:
+            pending_by_lang[lang] = pending
+
+    fresh_by_lang = {}
+    if pending_by_lang:
+        fresh_by_lang = _run_fan_out(pending_by_lang, source_lang)
+        for lang, fresh in fresh_by_lang.items():
+            translation_memory.store_many(fresh.items(), source_lang, lang)
+
+    translations = {}
+    for lang in target_langs:
+        if lang in pending_by_lang and lang not in fresh_by_lang:
+            continue
+        known = known_by_lang[lang]
+        fresh = fresh_by_lang.get(lang, {})
+        translations[lang] = [
+            known[i] if i in known else fresh.get(text, text)
+            for i, text in enumerate(texts)
+        ]
+    return translations
@@ -8,6 +8,8 @@ from .models import ChatSession, ChatMessage, MessageRole
 from .serializers import ChatSessionSerializer, ChatMessageSerializer
 from .pagination import ChatMessagePagination
 
+from core import outbound
+
 import requests
 import os
 
@@ -29,7 +31,8 @@ class CreateChatSessionView(APIView):
         # 2. Create new AI session
         ai_chat_base = os.getenv('AI_CHAT_BASE_URL')
         try:
-            res = requests.post(
+            res = outbound.post(
+                "ai_chat",
                 f"{ai_chat_base}/api/set_email/",
                 json={"email": user.email},
                 timeout=10
@@ -120,7 +123,8 @@ class SendChatMessageView(APIView):
         # Send to AI
         ai_chat_base = os.getenv('AI_CHAT_BASE_URL')
         try:
-            res = requests.post(
+            res = outbound.post(
+                "ai_chat",
                 f"{ai_chat_base}/api/chat/",
                 json={
                     "message": message_with_lang,
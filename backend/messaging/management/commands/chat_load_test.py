@@ -0,0 +1,101 @@
+import asyncio
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'chat_load_'
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the Socket.IO server with synthetic clients sending send_message '
+        'to each other, and report acked messages per second and ack latency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000', help='Socket.IO server URL')
+        parser.add_argument('--clients', type=int, default=50, help='Concurrent clients (paired up)')
+        parser.add_argument('--messages', type=int, default=100, help='Messages sent by each client')
+        parser.add_argument('--rate', type=float, default=0,
+                            help='Messages per second per client (0 = as fast as acks return)')
+        parser.add_argument('--cleanup', action='store_true',
+                            help='Delete the synthetic users (and their messages) afterwards')
+
+    def _users(self, count):
+        users = []
+        for i in range(count):
+            user, created = User.objects.get_or_create(
+                email=f'{USERNAME_PREFIX}{i}@example.invalid',
+                defaults={'username': f'{USERNAME_PREFIX}{i}'},
+            )
+            if created:
+                user.set_unusable_password()
+                user.save(update_fields=['password'])
+            users.append(user)
+        return users
+
+    def handle(self, *args, **options):
+        import socketio  # noqa: F401  (fail early if the client extra is missing)
+
+        clients = max(2, options['clients'] - options['clients'] % 2)
+        users = self._users(clients)
+        tokens = [str(AccessToken.for_user(user)) for user in users]
+        user_ids = [str(user.id) for user in users]
+
+        latencies, errors, elapsed = asyncio.run(self._run(options, tokens, user_ids))
+
+        sent = len(latencies) + errors
+        self.stdout.write(f'Clients: {clients}, messages sent: {sent}, errors: {errors}')
+        if latencies:
+            latencies.sort()
+            pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(latencies) / elapsed:.1f} acked msg/s over {elapsed:.2f}s; '
+                f'ack latency p50 {pct(0.5):.1f}ms, p95 {pct(0.95):.1f}ms, p99 {pct(0.99):.1f}ms, '
+                f'mean {statistics.mean(latencies) * 1000:.1f}ms'
+            ))
+
+        if options['cleanup']:
+            deleted, _ = User.objects.filter(email__startswith=USERNAME_PREFIX).delete()
+            self.stdout.write(f'Deleted {deleted} rows created by the load test')
+
+    async def _run(self, options, tokens, user_ids):
+        import socketio
+
+        latencies = []
+        errors = 0
+        sockets = []
+        for token in tokens:
+            client = socketio.AsyncClient(reconnection=False)
+            await client.connect(options['url'], auth={'token': token}, transports=['websocket'])
+            sockets.append(client)
+
+        async def drive(index, client):
+            nonlocal errors
+            # Pair clients 0<->1, 2<->3, ...
+            peer = user_ids[index ^ 1]
+            interval = 1 / options['rate'] if options['rate'] else 0
+            for n in range(options['messages']):
+                started = time.perf_counter()
+                try:
+                    ack = await client.call('send_message', {'to_user': peer, 'message': f'load test {index}/{n}'}, timeout=30)
+                except Exception:
+                    ack = None
+                if ack and ack.get('status') == 'ok':
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+                if interval:
+                    await asyncio.sleep(max(0, interval - (time.perf_counter() - started)))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(drive(i, client) for i, client in enumerate(sockets)))
+        elapsed = time.perf_counter() - started
+
+        await asyncio.gather(*(client.disconnect() for client in sockets))
+        return latencies, errors, elapsed
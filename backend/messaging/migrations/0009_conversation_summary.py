@@ -0,0 +1,102 @@
+from collections import defaultdict
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+PREVIEW_LENGTH = 200
+
+
+def backfill_summaries(apps, schema_editor):
+    """Fill the chat list summary of every existing participant row."""
+    Participant = apps.get_model('messaging', 'ConversationParticipant')
+    Message = apps.get_model('messaging', 'Message')
+
+    by_conversation = defaultdict(list)
+    for participant in Participant.objects.all().iterator():
+        by_conversation[participant.conversation_id].append(participant)
+
+    batch = []
+    for conversation_id, participants in by_conversation.items():
+        messages = Message.objects.filter(conversation_id=conversation_id)
+        last = messages.order_by('-created_at').first()
+        for participant in participants:
+            others = [p.user_id for p in participants if p.user_id != participant.user_id]
+            participant.peer_id = others[0] if len(others) == 1 else None
+
+            unread = messages.filter(is_read=False).exclude(sender_id=participant.user_id)
+            if participant.cleared_at:
+                unread = unread.filter(created_at__gt=participant.cleared_at)
+            participant.unread_count = unread.count()
+
+            if last:
+                participant.last_message_id = last.id
+                participant.last_message_sender_id = last.sender_id
+                participant.last_message_preview = last.content[:PREVIEW_LENGTH]
+                participant.last_message_at = last.created_at
+            participant.activity_at = last.created_at if last else participant.joined_at
+            batch.append(participant)
+
+        if len(batch) >= 500:
+            Participant.objects.bulk_update(batch, [
+                'peer', 'unread_count', 'last_message', 'last_message_sender',
+                'last_message_preview', 'last_message_at', 'activity_at',
+            ])
+            batch = []
+
+    Participant.objects.bulk_update(batch, [
+        'peer', 'unread_count', 'last_message', 'last_message_sender',
+        'last_message_preview', 'last_message_at', 'activity_at',
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0008_remove_chatsession_post_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='peer',
+            field=models.ForeignKey(blank=True, help_text='The other user of a one-on-one conversation', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_message_sender',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_message_preview',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='conversationparticipant',
+            index=models.Index(fields=['user', '-activity_at', '-id'], name='chat_summary_list_idx'),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
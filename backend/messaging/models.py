@@ -1,6 +1,7 @@
 import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 from messaging.ai_chat.models import *
 
@@ -26,8 +27,29 @@ class ConversationParticipant(models.Model):
     is_pinned = models.BooleanField(default=False)
     cleared_at = models.DateTimeField(null=True, blank=True)
 
+    # Chat list summary, maintained by messaging.summaries so the list is
+    # one indexed scan of the user's participant rows
+    peer = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+",
+        help_text="The other user of a one-on-one conversation"
+    )
+    last_message = models.ForeignKey(
+        "Message", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    last_message_sender = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    last_message_preview = models.CharField(max_length=200, blank=True, default="")
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0)
+    # Last message time, or when the conversation started; chat list order
+    activity_at = models.DateTimeField(default=timezone.now)
+
     class Meta:
         unique_together = ("user", "conversation")
+        indexes = [
+            models.Index(fields=["user", "-activity_at", "-id"], name="chat_summary_list_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} in {self.conversation}"
@@ -48,10 +70,17 @@ class Message(models.Model):
         User, on_delete=models.CASCADE, related_name="sent_messages"
     )
     content = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add, which would overwrite the strictly increasing
+    # times messaging.write_behind assigns at submit
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     is_read = models.BooleanField(default=False)  
     is_edited = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["conversation", "created_at", "id"], name="message_history_idx"),
+        ]
+
     def __str__(self):
         return f"{self.sender}: {self.content[:20]}"
 
@@ -1,4 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import uuid
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 class ChatPagination(PageNumberPagination):
     page_size = 20
@@ -9,3 +17,105 @@ class ChatDetailPagination(PageNumberPagination):
     page_size = 10
     page_query_param = "page"
     max_page_size = 100
+
+class ChatListPagination(CursorPagination):
+    """Keyset pagination over the user's chat list summaries (chat_summary_list_idx)."""
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+    ordering = ("-activity_at", "-id")
+
+
+class MessageHistoryPagination:
+    """
+    Keyset pagination of a conversation's messages on (created_at, id)
+    (message_history_idx), so deep scroll-back costs the same as the first page.
+
+      ?before=<cursor>   older messages (default: the latest page)
+      ?since=<cursor>    messages after the cursor, for catching up after a
+                         reconnect; a message id is accepted as well
+
+    Results are always oldest first. `next` continues in the same direction;
+    `sync_cursor` is the position of the newest message returned.
+    """
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    invalid_cursor_message = "Invalid cursor"
+
+    def encode_cursor(self, message):
+        raw = f"{message.created_at.isoformat()}|{message.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, value, queryset):
+        try:
+            # A plain message id is a valid starting point too
+            message_id = uuid.UUID(value)
+        except ValueError:
+            pass
+        else:
+            position = queryset.filter(id=message_id).values_list("created_at", "id").first()
+            if position is None:
+                raise NotFound(self.invalid_cursor_message)
+            return position
+
+        try:
+            created_at, message_id = base64.urlsafe_b64decode(value.encode()).decode().split("|")
+            created_at = parse_datetime(created_at)
+            message_id = uuid.UUID(message_id)
+        except (ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, message_id
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        size = self.get_page_size(request)
+        since = request.query_params.get("since")
+        before = request.query_params.get("before")
+        self.mode = "since" if since else "before"
+
+        if since:
+            created_at, message_id = self.decode_cursor(since, queryset)
+            rows = list(
+                queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=message_id))
+                .order_by("created_at", "id")[:size + 1]
+            )
+            self.has_more = len(rows) > size
+            rows = rows[:size]
+        else:
+            if before:
+                created_at, message_id = self.decode_cursor(before, queryset)
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=message_id))
+            rows = list(queryset.order_by("-created_at", "-id")[:size + 1])
+            self.has_more = len(rows) > size
+            rows = rows[:size][::-1]
+
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_more or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.mode == "since":
+            return replace_query_param(url, "since", self.encode_cursor(self.page[-1]))
+        url = remove_query_param(url, "since")
+        return replace_query_param(url, "before", self.encode_cursor(self.page[0]))
+
+    def get_paginated_response(self, data, **extra):
+        return Response({
+            "next": self.get_next_link(),
+            "sync_cursor": self.encode_cursor(self.page[-1]) if self.page else None,
+            **extra,
+            "results": data,
+        })
@@ -0,0 +1,96 @@
+"""
+Cached lookups for one-on-one chats, keyed by the (unordered) user pair.
+
+send_message needs to know whether either user blocked the other and
+which conversation the two share. Both answers are cached together in Redis
+(`chat:pair:<lo>:<hi>` -> {"conversation": id or null, "blocked": bool}),
+so sending a message normally costs one Redis GET and one INSERT.
+
+Entries are rewritten when a conversation is created and dropped when a
+block is added or removed or the conversation is deleted (messaging.signals).
+When Redis is unavailable the pair is resolved from the database.
+"""
+import json
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from .models import BlockUser, Conversation, ConversationParticipant
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+KEY = "chat:pair:{}:{}"
+TTL = 86400
+
+
+def _key(user_a, user_b):
+    low, high = sorted([str(user_a), str(user_b)])
+    return KEY.format(low, high)
+
+
+def _store(user_a, user_b, entry):
+    from core.redis_client import get_redis
+
+    try:
+        get_redis().set(_key(user_a, user_b), json.dumps(entry), ex=TTL)
+    except Exception as e:
+        logger.warning(f"Could not cache chat pair {user_a}/{user_b}: {e}")
+
+
+def invalidate(user_a, user_b):
+    from core.redis_client import get_redis
+
+    try:
+        get_redis().delete(_key(user_a, user_b))
+    except Exception as e:
+        logger.warning(f"Could not invalidate chat pair {user_a}/{user_b}: {e}")
+
+
+def _load(sender_id, receiver_id):
+    if not User.objects.filter(id=receiver_id).exists():
+        return None
+    blocked = BlockUser.objects.filter(
+        Q(blocker_id=sender_id, blocked_user_id=receiver_id) |
+        Q(blocker_id=receiver_id, blocked_user_id=sender_id)
+    ).exists()
+    conversation_id = Conversation.objects.filter(
+        is_group=False,
+        participants__user_id=sender_id
+    ).filter(
+        participants__user_id=receiver_id
+    ).values_list("id", flat=True).first()
+    return {"conversation": str(conversation_id) if conversation_id else None, "blocked": blocked}
+
+
+def resolve(sender_id, receiver_id):
+    """{"conversation": id or None, "blocked": bool}, or None if the receiver does not exist."""
+    from core.redis_client import get_redis
+
+    try:
+        raw = get_redis().get(_key(sender_id, receiver_id))
+    except Exception as e:
+        logger.warning(f"Could not read chat pair {sender_id}/{receiver_id}: {e}")
+        raw = None
+    if raw is not None:
+        return json.loads(raw)
+
+    entry = _load(sender_id, receiver_id)
+    if entry is not None:
+        _store(sender_id, receiver_id, entry)
+    return entry
+
+
+def create_conversation(sender_id, receiver_id):
+    """Create the pair's 1-on-1 conversation and cache it; returns its id."""
+    with transaction.atomic():
+        conversation = Conversation.objects.create(is_group=False)
+        ConversationParticipant.objects.bulk_create([
+            ConversationParticipant(user_id=sender_id, peer_id=receiver_id, conversation=conversation),
+            ConversationParticipant(user_id=receiver_id, peer_id=sender_id, conversation=conversation)
+        ])
+    _store(sender_id, receiver_id, {"conversation": str(conversation.id), "blocked": False})
+    return str(conversation.id)
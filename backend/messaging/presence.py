@@ -0,0 +1,81 @@
+"""
+Cluster-wide socket presence.
+
+Every Socket.IO worker records the sockets it holds in Redis, one sorted
+set per user (`presence:user:<id>`, member = sid, score = last heartbeat),
+so any process can tell whether a user is online and on how many devices.
+messaging.socket reads it to push a chat message only to receivers
+without a live socket.
+Workers refresh their sockets every HEARTBEAT_INTERVAL seconds; entries
+older than PRESENCE_TTL belong to a worker that died and are ignored and
+pruned on read.
+
+Delivery itself does not go through this registry: each socket joins a
+room named after its user id and emits go through the Socket.IO Redis
+manager, which reaches every device on every node.
+"""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+KEY = "presence:user:{}"
+
+HEARTBEAT_INTERVAL = 30
+PRESENCE_TTL = 90
+
+
+def _key(user_id):
+    return KEY.format(user_id)
+
+
+async def register(user_id, sid):
+    from core.redis_client import get_async_redis
+
+    try:
+        pipe = get_async_redis().pipeline()
+        pipe.zadd(_key(user_id), {sid: time.time()})
+        pipe.expire(_key(user_id), PRESENCE_TTL)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not register presence of {user_id}: {e}")
+
+
+async def unregister(user_id, sid):
+    from core.redis_client import get_async_redis
+
+    try:
+        await get_async_redis().zrem(_key(user_id), sid)
+    except Exception as e:
+        logger.warning(f"Could not clear presence of {user_id}: {e}")
+
+
+async def heartbeat(sessions):
+    """Refresh every socket held by this worker; `sessions` maps sid -> user_id."""
+    from core.redis_client import get_async_redis
+
+    if not sessions:
+        return
+    now = time.time()
+    try:
+        pipe = get_async_redis().pipeline()
+        for sid, user_id in sessions.items():
+            pipe.zadd(_key(user_id), {sid: now})
+            pipe.expire(_key(user_id), PRESENCE_TTL)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Presence heartbeat failed: {e}")
+
+
+async def device_sids(user_id):
+    """Live socket ids of `user_id` across the cluster."""
+    from core.redis_client import get_async_redis
+
+    try:
+        pipe = get_async_redis().pipeline()
+        pipe.zremrangebyscore(_key(user_id), "-inf", time.time() - PRESENCE_TTL)
+        pipe.zrange(_key(user_id), 0, -1)
+        return (await pipe.execute())[1]
+    except Exception as e:
+        logger.warning(f"Could not read presence of {user_id}: {e}")
+        return []
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Conversation, Message, BlockUser, ReportUser
+from .models import Conversation, ConversationParticipant, Message, BlockUser, ReportUser
 from django.db.models import Q
 
 UserAccount = get_user_model()
@@ -107,6 +107,68 @@ class ConversationSerializer(serializers.ModelSerializer):
             Q(blocker=other_user, blocked_user=user)
         ).exists()
 
+class ConversationSummarySerializer(serializers.ModelSerializer):
+    """
+    Chat list row built from the requesting user's ConversationParticipant
+    summary; same fields as ConversationSerializer. Expects `blocked_user_ids`
+    (peers blocked either way) in the context.
+    """
+    id = serializers.UUIDField(source='conversation_id')
+    other_user_id = serializers.SerializerMethodField()
+    conversation_name = serializers.SerializerMethodField()
+    other_user_avatar = serializers.SerializerMethodField()
+    last_message = serializers.CharField(source='last_message_preview')
+    last_message_sender = serializers.SerializerMethodField()
+    last_message_is_me = serializers.SerializerMethodField()
+    last_message_time = serializers.DateTimeField(source='last_message_at')
+    is_blocked = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ConversationParticipant
+        fields = [
+            'id',
+            'other_user_id',
+            'conversation_name',
+            'other_user_avatar',
+            'last_message',
+            'last_message_sender',
+            'last_message_is_me',
+            'last_message_time',
+            'unread_count',
+            'is_blocked',
+            'is_pinned'
+        ]
+
+    def get_other_user_id(self, obj):
+        return str(obj.peer_id) if obj.peer_id else None
+
+    def get_conversation_name(self, obj):
+        if obj.peer:
+            full_name = f"{obj.peer.first_name} {obj.peer.last_name}".strip()
+            return full_name or obj.peer.username
+        return "Unknown"
+
+    def get_other_user_avatar(self, obj):
+        if obj.peer and getattr(obj.peer, "profile_pic", None):
+            avatar = obj.peer.profile_pic
+            if hasattr(avatar, 'url'):
+                return avatar.url
+        return None
+
+    def get_last_message_sender(self, obj):
+        sender = obj.last_message_sender
+        if not obj.last_message_at or not sender:
+            return ""
+        return "Me" if sender.id == obj.user_id else f"{sender.first_name} {sender.last_name}".strip() or sender.username
+
+    def get_last_message_is_me(self, obj):
+        if not obj.last_message_at:
+            return None
+        return obj.last_message_sender_id == obj.user_id
+
+    def get_is_blocked(self, obj):
+        return obj.peer_id in self.context.get('blocked_user_ids', ())
+
 class BlockUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = BlockUser
@@ -121,6 +183,7 @@ class ReportUserSerializer(serializers.ModelSerializer):
 
 class ConversationDetailSerializer(serializers.ModelSerializer):
     sender = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
     is_send_by_me = serializers.SerializerMethodField()
     sender_profile_pic = serializers.SerializerMethodField()
     my_profile_pic = serializers.SerializerMethodField()
@@ -142,6 +205,16 @@ class ConversationDetailSerializer(serializers.ModelSerializer):
     def get_sender(self, obj):
         return obj.sender.first_name
 
+    def get_is_read(self, obj):
+        # Read once another participant's last_read_at has passed the message
+        watermarks = self.context.get("read_watermarks")
+        if watermarks is None:
+            return obj.is_read
+        return any(
+            user_id != obj.sender_id and read_at is not None and read_at >= obj.created_at
+            for user_id, read_at in watermarks.items()
+        )
+
     def get_sender_profile_pic(self, obj):
         if obj.sender.profile_pic:
             return obj.sender.profile_pic.url
@@ -0,0 +1,45 @@
+"""
+Keeps the chat pair cache (messaging.pair_index) in sync with blocks and
+deleted one-on-one conversations, and the chat list summaries
+(messaging.summaries) in sync with messages saved or deleted.
+"""
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from . import pair_index, summaries
+from .models import BlockUser, Conversation, Message
+
+
+@receiver(post_save, sender=BlockUser)
+@receiver(post_delete, sender=BlockUser)
+def invalidate_blocked_pair(sender, instance, **kwargs):
+    pair_index.invalidate(instance.blocker_id, instance.blocked_user_id)
+
+
+@receiver(pre_delete, sender=Conversation)
+def invalidate_conversation_pair(sender, instance, **kwargs):
+    if instance.is_group:
+        return
+    user_ids = list(instance.participants.values_list("user_id", flat=True))
+    if len(user_ids) == 2:
+        pair_index.invalidate(*user_ids)
+
+
+@receiver(post_save, sender=Message)
+def update_summary_on_save(sender, instance, created, **kwargs):
+    if created:
+        summaries.record_messages([instance])
+    else:
+        summaries.message_edited(instance)
+
+
+@receiver(post_delete, sender=Message)
+def update_summary_on_delete(sender, instance, origin=None, **kwargs):
+    if origin is None or origin is instance:
+        summaries.message_deleted(instance)
+        return
+    # The conversation's participant rows are deleted with it
+    if isinstance(origin, Conversation) or getattr(origin, "model", None) is Conversation:
+        return
+    # Bulk or cascade delete: one recompute per conversation, not per message
+    summaries.deleted_with(origin, instance.conversation_id)
@@ -4,18 +4,13 @@ from rest_framework_simplejwt.tokens import UntypedToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 
 from django.db import transaction
-from django.db.models import Q
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.conf import settings
-from django.utils import timezone
 
-from .models import (
-    Conversation,
-    ConversationParticipant,
-    Message,
-    BlockUser,
-)
+from . import pair_index, presence
+from .models import Message
+from .write_behind import MessageBuffer, persist_message
 
 import socketio
 import logging
@@ -26,15 +21,51 @@ logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
-connected_users = {}  # sid -> user_id
-user_sid_map = {}     # user_id -> sid
-
+# Sockets held by this worker only (sid -> user_id), refreshed in Redis by
+# the presence heartbeat. Who is connected cluster-wide lives in
+# messaging.presence; every socket also joins a room named after its user.
+local_sessions = {}
 
+# Emits are relayed through Redis so they reach sockets on every worker
 sio = socketio.AsyncServer(
     async_mode="asgi",
-    cors_allowed_origins="*"
+    cors_allowed_origins="*",
+    client_manager=socketio.AsyncRedisManager(settings.SOCKETIO_REDIS_URL),
 )
 
+# Group-commits messages when CHAT_WRITE_BEHIND is on (messaging.write_behind)
+message_buffer = MessageBuffer() if getattr(settings, "CHAT_WRITE_BEHIND", False) else None
+
+_heartbeat_task = None
+_external_manager = None
+
+
+def emit_to_room(event, data, room):
+    """Emit from synchronous code (views, Celery tasks) to a room on any worker."""
+    global _external_manager
+    if _external_manager is None:
+        _external_manager = socketio.RedisManager(settings.SOCKETIO_REDIS_URL, write_only=True)
+    _external_manager.emit(event, data, room=room)
+
+
+def emit_to_user(user_id, event, data):
+    """Emit to every device of `user_id`."""
+    emit_to_room(event, data, room=str(user_id))
+
+
+async def presence_heartbeat():
+    while True:
+        await sio.sleep(presence.HEARTBEAT_INTERVAL)
+        await presence.heartbeat(dict(local_sessions))
+
+
+async def current_user_id(sid):
+    try:
+        session = await sio.get_session(sid)
+    except KeyError:
+        return None
+    return session.get("user_id")
+
 @sync_to_async
 def get_user_from_token(token: str):
     try:
@@ -47,59 +78,49 @@ def get_user_from_token(token: str):
         return None
 
 
-@sync_to_async
-def save_message_to_db(sender_id: str, receiver_id: str, content: str):
-    sender = User.objects.get(id=sender_id)
-    receiver = User.objects.get(id=receiver_id)
+def sender_profile(user):
+    """Name and avatar sent along with every message; kept in the socket session."""
+    return {
+        "name": f"{user.first_name} {user.last_name}".strip() or user.username,
+        "avatar": user.profile_pic.url if user.profile_pic else None,
+    }
 
-    is_blocked = BlockUser.objects.filter(
-        Q(blocker=sender, blocked_user=receiver) | 
-        Q(blocker=receiver, blocked_user=sender)
-    ).exists()
 
-    if is_blocked:
+@sync_to_async
+def resolve_conversation(sender_id: str, receiver_id: str):
+    # Block state and the pair's conversation come from the pair cache, so a
+    # message is normally a single INSERT
+    pair = pair_index.resolve(sender_id, receiver_id)
+    if pair is None:
+        return {"error": "Recipient not found."}
+
+    if pair["blocked"]:
         return {"error": "Cannot send message. User is blocked."}
 
     # Find or create 1-on-1 conversation
-    conversation = Conversation.objects.filter(
-        is_group=False,
-        participants__user=sender
-    ).filter(
-        participants__user=receiver
-    ).first()
-
-    if not conversation:
-        conversation = Conversation.objects.create(is_group=False)
-        ConversationParticipant.objects.bulk_create([
-            ConversationParticipant(user=sender, conversation=conversation),
-            ConversationParticipant(user=receiver, conversation=conversation)
-        ])
+    return pair["conversation"] or pair_index.create_conversation(sender_id, receiver_id)
+
+
+async def save_message_to_db(sender_id: str, receiver_id: str, content: str):
+    conversation_id = await resolve_conversation(sender_id, receiver_id)
+    if isinstance(conversation_id, dict):
+        return conversation_id
 
     # Save message
-    message = Message.objects.create(
-        conversation=conversation,
-        sender=sender,
-        content=content,
-        created_at=timezone.now()
-    )
+    if message_buffer is not None:
+        return await message_buffer.submit(sender_id, receiver_id, conversation_id, content)
+    message = Message(conversation_id=conversation_id, sender_id=sender_id, content=content)
+    return await sync_to_async(persist_message)(message, receiver_id)
+
+
+@sync_to_async
+def enqueue_message_push(message_id, sender_id, sender_name, receiver_id, content):
+    from .tasks import send_message_push_task
 
     try:
-        from core.utils import send_push_notification
-        sender_name = f"{sender.first_name} {sender.last_name}".strip() or sender.username
-        send_push_notification(
-            user=receiver,
-            title=f"New message from {sender_name}",
-            body=content,
-            data={
-                "type": "message",
-                "sender_id": str(sender.id),
-                "message_id": str(message.id)
-            }
-        )
+        send_message_push_task.delay(message_id, sender_id, sender_name, receiver_id, content)
     except Exception as e:
-        logger.error(f"Error sending push notification for message: {e}")
-
-    return message
+        logger.error(f"Error queueing push notification for message: {e}")
 
 @sio.event
 async def connect(sid, environ, auth):
@@ -117,11 +138,14 @@ async def connect(sid, environ, auth):
 
     user_id = str(user.id)
 
-    connected_users[sid] = user_id
-    user_sid_map[user_id] = sid
+    global _heartbeat_task
+    if _heartbeat_task is None:
+        _heartbeat_task = sio.start_background_task(presence_heartbeat)
 
-    await sio.save_session(sid, {"user_id": user_id})
+    local_sessions[sid] = user_id
+    await sio.save_session(sid, {"user_id": user_id, **sender_profile(user)})
     await sio.enter_room(sid, user_id)
+    await presence.register(user_id, sid)
 
     print(f"🔥 Connected: SID={sid}, USER={user.username}")
 
@@ -131,7 +155,7 @@ async def send_message(sid, data):
     if not isinstance(data, dict):
         return {"status": "error", "message": "Invalid payload"}
 
-    sender_id = connected_users.get(sid)
+    sender_id = await current_user_id(sid)
     if not sender_id:
         return {"status": "error", "message": "Unauthorized"}
 
@@ -147,26 +171,30 @@ async def send_message(sid, data):
     if isinstance(saved_message, dict) and "error" in saved_message:
         return {"status": "error", "message": saved_message["error"]}
 
-    # Get sender details
-    sender_name = f"{saved_message.sender.first_name} {saved_message.sender.last_name}".strip() or saved_message.sender.username
-    sender_avatar = saved_message.sender.profile_pic.url if saved_message.sender.profile_pic else None
+    # Sender details were stored in the session on connect
+    session = await sio.get_session(sid)
 
     # Prepare payload
     payload = {
         "id": str(saved_message.id),
-        "conversation": str(saved_message.conversation.id),
+        "conversation": str(saved_message.conversation_id),
         "sender": sender_id,
-        "sender_name": sender_name,
-        "sender_avatar": sender_avatar,
+        "sender_name": session.get("name"),
+        "sender_avatar": session.get("avatar"),
         "receiver": to_user,
         "message": saved_message.content,
         "timestamp": saved_message.created_at.isoformat()
     }
 
-    # Deliver if online
-    recipient_sid = user_sid_map.get(to_user)
-    if recipient_sid:
-        await sio.emit("receive_message", payload, to=recipient_sid)
+    # Deliver to every device the recipient has online, on any worker
+    await sio.emit("receive_message", payload, room=str(to_user))
+
+    # Receivers with a live socket already got it; the others get a push.
+    # Firebase is slow, so it goes through Celery without holding up the ack
+    if not await presence.device_sids(to_user):
+        sio.start_background_task(
+            enqueue_message_push, payload["id"], sender_id, payload["sender_name"], str(to_user), saved_message.content
+        )
 
     print(f"📨 Message saved and sent from {sender_id} to {to_user}")
     
@@ -188,7 +216,7 @@ async def delete_message(sid, data):
     if not isinstance(data, dict):
         return {"status": "error", "message": "Invalid payload"}
 
-    sender_id = connected_users.get(sid)
+    sender_id = await current_user_id(sid)
     if not sender_id:
         return {"status": "error", "message": "Unauthorized"}
 
@@ -202,9 +230,7 @@ async def delete_message(sid, data):
     if not deleted:
         return {"status": "error", "message": "Message not found or unauthorized"}
 
-    recipient_sid = user_sid_map.get(to_user)
-    if recipient_sid:
-        await sio.emit("message_deleted", {"message_id": message_id}, to=recipient_sid)
+    await sio.emit("message_deleted", {"message_id": message_id}, room=str(to_user))
 
     print(f"🗑️ Message {message_id} deleted by {sender_id}")
     return {"status": "ok", "message_id": message_id}
@@ -226,7 +252,7 @@ async def edit_message(sid, data):
     if not isinstance(data, dict):
         return {"status": "error", "message": "Invalid payload"}
 
-    sender_id = connected_users.get(sid)
+    sender_id = await current_user_id(sid)
     if not sender_id:
         return {"status": "error", "message": "Unauthorized"}
 
@@ -241,13 +267,55 @@ async def edit_message(sid, data):
     if not edited:
         return {"status": "error", "message": "Message not found or unauthorized"}
 
-    recipient_sid = user_sid_map.get(to_user)
-    if recipient_sid:
-        await sio.emit("message_edited", {"message_id": message_id, "new_content": new_content}, to=recipient_sid)
+    await sio.emit("message_edited", {"message_id": message_id, "new_content": new_content}, room=str(to_user))
 
     print(f"✏️ Message {message_id} edited by {sender_id}")
     return {"status": "ok", "message_id": message_id, "new_content": new_content}
 
+@sync_to_async
+def can_view_classroom(user_id: str, classroom_id: str):
+    from classroom.models import Classroom, ClassroomMemberList
+
+    return (
+        ClassroomMemberList.objects.filter(classroom_id=classroom_id, user_id=user_id).exists()
+        or Classroom.objects.filter(id=classroom_id, creator_id=user_id).exists()
+    )
+
+@sio.event
+async def subscribe_classroom_leaderboard(sid, data):
+    from student.classroom.leaderboard import room_name
+
+    if not isinstance(data, dict):
+        return {"status": "error", "message": "Invalid payload"}
+
+    user_id = await current_user_id(sid)
+    if not user_id:
+        return {"status": "error", "message": "Unauthorized"}
+
+    classroom_id = data.get("classroom_id")
+    if not classroom_id:
+        return {"status": "error", "message": "classroom_id is required"}
+
+    try:
+        allowed = await can_view_classroom(user_id, classroom_id)
+    except Exception:
+        allowed = False
+    if not allowed:
+        return {"status": "error", "message": "Not a member of this classroom"}
+
+    await sio.enter_room(sid, room_name(classroom_id))
+    return {"status": "ok", "classroom_id": classroom_id}
+
+@sio.event
+async def unsubscribe_classroom_leaderboard(sid, data):
+    from student.classroom.leaderboard import room_name
+
+    if not isinstance(data, dict) or not data.get("classroom_id"):
+        return {"status": "error", "message": "classroom_id is required"}
+
+    await sio.leave_room(sid, room_name(data["classroom_id"]))
+    return {"status": "ok", "classroom_id": data["classroom_id"]}
+
 @sio.event
 async def update_token(sid, data):
     if not isinstance(data, dict):
@@ -258,16 +326,22 @@ async def update_token(sid, data):
         user = await get_user_from_token(token)
         if user:
             user_id = str(user.id)
-            connected_users[sid] = user_id
-            user_sid_map[user_id] = sid
+            previous = await current_user_id(sid)
+            if previous and previous != user_id:
+                await sio.leave_room(sid, previous)
+                await presence.unregister(previous, sid)
+            local_sessions[sid] = user_id
+            await sio.save_session(sid, {"user_id": user_id, **sender_profile(user)})
+            await sio.enter_room(sid, user_id)
+            await presence.register(user_id, sid)
             print(f"🔄 Token updated for SID={sid}, USER={user.username}")
 
 @sio.event
 async def disconnect(sid):
-    user_id = connected_users.pop(sid, None)
+    user_id = local_sessions.pop(sid, None)
 
-    if user_id and user_sid_map.get(user_id) == sid:
-        user_sid_map.pop(user_id, None)
+    if user_id:
+        await presence.unregister(user_id, sid)
 
     print(f"❌ Disconnected: SID={sid}, USER={user_id}")
 
@@ -0,0 +1,155 @@
+"""
+Chat list summaries on ConversationParticipant.
+
+Each participant row carries the conversation's last message (id, sender,
+preview, time), the participant's unread count and `activity_at`, the
+chat list sort key. They are kept current here:
+
+  - new messages      record_messages() (Message post_save signal, and the
+                      write-behind buffer after bulk_create)
+  - edited messages   message_edited()  (post_save)
+  - deleted messages  message_deleted() (post_delete of one message);
+                      bulk and cascade deletes (a queryset, a deleted
+                      user) rebuild each affected conversation once with
+                      recompute(), and nothing is done for messages that
+                      go with their conversation
+  - read / cleared    mark_read(), mark_cleared() (ConversationDetailView,
+                      DeleteConversationAPIView)
+
+so ChatListAPIView never aggregates over messages.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Case, Count, DateTimeField, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import ConversationParticipant, Message
+
+PREVIEW_LENGTH = 200
+
+_EPOCH = Value(datetime(1970, 1, 1, tzinfo=dt_timezone.utc), output_field=DateTimeField())
+
+
+def preview(content):
+    return (content or "")[:PREVIEW_LENGTH]
+
+
+def _set_last_message(conversation_id, message, only_if_newer=True):
+    participants = ConversationParticipant.objects.filter(conversation_id=conversation_id)
+    if only_if_newer:
+        # A slower writer must not replace a newer last message
+        participants = participants.filter(
+            Q(last_message_at__isnull=True) | Q(last_message_at__lte=message.created_at)
+        )
+    participants.update(
+        last_message=message,
+        last_message_sender_id=message.sender_id,
+        last_message_preview=preview(message.content),
+        last_message_at=message.created_at,
+        activity_at=message.created_at,
+    )
+
+
+def record_messages(messages):
+    """Update the summaries after `messages` (in send order) were inserted."""
+    by_conversation = defaultdict(list)
+    for message in messages:
+        by_conversation[message.conversation_id].append(message)
+
+    for conversation_id, sent in by_conversation.items():
+        _set_last_message(conversation_id, sent[-1])
+
+        # Every participant gets the messages the others sent as unread
+        per_sender = Counter(message.sender_id for message in sent)
+        ConversationParticipant.objects.filter(conversation_id=conversation_id).update(
+            unread_count=F("unread_count") + Case(
+                *[When(user_id=sender_id, then=Value(len(sent) - count)) for sender_id, count in per_sender.items()],
+                default=Value(len(sent)),
+                output_field=IntegerField(),
+            )
+        )
+
+
+def message_edited(message):
+    ConversationParticipant.objects.filter(
+        conversation_id=message.conversation_id, last_message_id=message.id
+    ).update(last_message_preview=preview(message.content))
+
+
+def message_deleted(message):
+    # Still unread for everyone who has not opened the conversation since
+    ConversationParticipant.objects.filter(
+        conversation_id=message.conversation_id, unread_count__gt=0
+    ).exclude(user_id=message.sender_id).filter(
+        Q(last_read_at__isnull=True) | Q(last_read_at__lt=message.created_at),
+        Q(cleared_at__isnull=True) | Q(cleared_at__lt=message.created_at),
+    ).update(unread_count=Greatest(F("unread_count") - 1, 0))
+
+    # The last message is a SET_NULL foreign key, so after the delete the
+    # rows that pointed at it have none; point them at the new last one
+    stale = ConversationParticipant.objects.filter(
+        conversation_id=message.conversation_id, last_message__isnull=True, last_message_at__isnull=False
+    )
+    if not stale.exists():
+        return
+    last = Message.objects.filter(conversation_id=message.conversation_id).order_by("-created_at").first()
+    if last is None:
+        stale.update(last_message_sender=None, last_message_preview="", last_message_at=None)
+    else:
+        _set_last_message(message.conversation_id, last, only_if_newer=False)
+
+
+def deleted_with(origin, conversation_id):
+    """
+    A message of `conversation_id` went in the delete of `origin` (a
+    queryset or a cascading instance); its conversations are recomputed
+    once when the delete commits.
+    """
+    pending = getattr(origin, "_summary_conversations", None)
+    if pending is None:
+        pending = origin._summary_conversations = set()
+
+        def flush():
+            del origin._summary_conversations
+            recompute(pending)
+
+        transaction.on_commit(flush)
+    pending.add(conversation_id)
+
+
+def recompute(conversation_ids):
+    """Rebuild the last message and unread counts of `conversation_ids` from their messages."""
+    for conversation_id in conversation_ids:
+        participants = ConversationParticipant.objects.filter(conversation_id=conversation_id)
+        last = Message.objects.filter(conversation_id=conversation_id).order_by("-created_at", "-id").first()
+        if last is None:
+            participants.update(
+                last_message=None, last_message_sender=None, last_message_preview="", last_message_at=None
+            )
+        else:
+            _set_last_message(conversation_id, last, only_if_newer=False)
+
+        # Messages of the others since the participant last read or cleared
+        seen = Greatest(Coalesce(OuterRef("last_read_at"), _EPOCH), Coalesce(OuterRef("cleared_at"), _EPOCH))
+        unread = (
+            Message.objects.filter(conversation_id=conversation_id, created_at__gt=seen)
+            .exclude(sender_id=OuterRef("user_id"))
+            .values("conversation_id")
+            .annotate(n=Count("id"))
+            .values("n")
+        )
+        participants.update(unread_count=Coalesce(Subquery(unread), 0))
+
+
+def mark_read(participant, when):
+    participant.last_read_at = when
+    participant.unread_count = 0
+    participant.save(update_fields=["last_read_at", "unread_count"])
+
+
+def mark_cleared(participant, when):
+    participant.cleared_at = when
+    participant.unread_count = 0
+    participant.save(update_fields=["cleared_at", "unread_count"])
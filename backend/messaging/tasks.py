@@ -0,0 +1,31 @@
+from celery import shared_task
+from django.contrib.auth import get_user_model
+import logging
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+@shared_task
+def send_message_push_task(message_id, sender_id, sender_name, receiver_id, content):
+    """Push notification for a chat message, off the socket's request path."""
+    from core.utils import send_push_notification
+
+    try:
+        receiver = User.objects.get(id=receiver_id)
+    except User.DoesNotExist:
+        logger.warning(f"User {receiver_id} does not exist.")
+        return {"status": "not_found", "message_id": message_id}
+
+    send_push_notification(
+        user=receiver,
+        title=f"New message from {sender_name}",
+        body=content,
+        data={
+            "type": "message",
+            "sender_id": str(sender_id),
+            "message_id": str(message_id)
+        }
+    )
+    return {"status": "sent", "message_id": message_id}
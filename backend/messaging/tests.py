@@ -1,3 +1,183 @@
+"""
+Tests for the chat list summaries kept on ConversationParticipant and the
+keyset message history of ConversationDetailView.
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import BlockUser, Conversation, ConversationParticipant, Message
+
+User = get_user_model()
+
+CHAT_LIST_URL = "/message/conversation-list/"
+
+
+def _make_user(username):
+    return User.objects.create_user(username=username, password="test1234", email=f"{username}@test.com")
+
+
+def _make_conversation(user, other):
+    conversation = Conversation.objects.create(is_group=False)
+    ConversationParticipant.objects.create(user=user, peer=other, conversation=conversation)
+    ConversationParticipant.objects.create(user=other, peer=user, conversation=conversation)
+    return conversation
+
+
+class ChatListSummaryTests(TestCase):
+    def setUp(self):
+        self.me = _make_user("me")
+        self.alice = _make_user("alice")
+        self.bob = _make_user("bob")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.me)
+
+    def _row(self, conversation, user):
+        return ConversationParticipant.objects.get(conversation=conversation, user=user)
+
+    def test_summary_follows_messages(self):
+        conversation = _make_conversation(self.me, self.alice)
+        Message.objects.create(conversation=conversation, sender=self.alice, content="hi")
+        last = Message.objects.create(conversation=conversation, sender=self.alice, content="are you there?")
+
+        mine = self._row(conversation, self.me)
+        self.assertEqual((mine.unread_count, mine.last_message_id), (2, last.id))
+        self.assertEqual(self._row(conversation, self.alice).unread_count, 0)
+
+        last.content = "edited"
+        last.save(update_fields=["content"])
+        self.assertEqual(self._row(conversation, self.me).last_message_preview, "edited")
+
+        last.delete()
+        mine = self._row(conversation, self.me)
+        self.assertEqual((mine.unread_count, mine.last_message_preview), (1, "hi"))
+
+    def test_bulk_and_cascade_deletes_recompute_once_per_conversation(self):
+        from . import summaries
+
+        group = Conversation.objects.create(is_group=True)
+        for user in (self.me, self.alice, self.bob):
+            ConversationParticipant.objects.create(user=user, conversation=group)
+        Message.objects.create(conversation=group, sender=self.bob, content="from bob")
+        for i in range(3):
+            Message.objects.create(conversation=group, sender=self.alice, content=f"alice {i}")
+        private = _make_conversation(self.me, self.alice)
+        Message.objects.create(conversation=private, sender=self.alice, content="private")
+
+        with mock.patch.object(summaries, "message_deleted") as per_message, \
+                mock.patch.object(summaries, "recompute", wraps=summaries.recompute) as recompute, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.alice.delete()
+        per_message.assert_not_called()
+        recompute.assert_called_once()
+        self.assertEqual(set(recompute.call_args.args[0]), {group.id, private.id})
+
+        mine = self._row(group, self.me)
+        self.assertEqual((mine.unread_count, mine.last_message_preview), (1, "from bob"))
+        self.assertEqual(self._row(private, self.me).last_message_at, None)
+
+        # Messages deleted with their conversation need no summary work
+        with mock.patch.object(summaries, "recompute") as recompute, \
+                self.captureOnCommitCallbacks(execute=True):
+            group.delete()
+        recompute.assert_not_called()
+
+    def test_chat_list_is_keyset_paginated(self):
+        first = _make_conversation(self.me, self.alice)
+        second = _make_conversation(self.me, self.bob)
+        Message.objects.create(conversation=first, sender=self.alice, content="older")
+        Message.objects.create(conversation=second, sender=self.me, content="newer")
+        BlockUser.objects.create(blocker=self.bob, blocked_user=self.me)
+
+        resp = self.client.get(CHAT_LIST_URL, {"page_size": 1})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        row = resp.json()["results"][0]
+        self.assertEqual(row["id"], str(second.id))
+        self.assertEqual((row["last_message_sender"], row["is_blocked"]), ("Me", True))
+
+        resp = self.client.get(resp.json()["next"])
+        row = resp.json()["results"][0]
+        self.assertEqual(row["id"], str(first.id))
+        self.assertEqual((row["unread_count"], row["is_blocked"]), (1, False))
+        self.assertIsNone(resp.json()["next"])
+
+
+class MessageHistoryTests(TestCase):
+    def setUp(self):
+        self.me = _make_user("me")
+        self.alice = _make_user("alice")
+        self.conversation = _make_conversation(self.me, self.alice)
+        self.messages = [
+            Message.objects.create(conversation=self.conversation, sender=self.alice, content=f"m{i}")
+            for i in range(5)
+        ]
+        self.url = f"/message/conversation-detail/{self.conversation.id}/"
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.me)
+
+    def test_scroll_back_and_since(self):
+        resp = self.client.get(self.url, {"page_size": 2})
+        self.assertEqual([m["content"] for m in resp.json()["results"]], ["m3", "m4"])
+        sync_cursor = resp.json()["sync_cursor"]
+
+        resp = self.client.get(resp.json()["next"])
+        self.assertEqual([m["content"] for m in resp.json()["results"]], ["m1", "m2"])
+        resp = self.client.get(resp.json()["next"])
+        self.assertEqual([m["content"] for m in resp.json()["results"]], ["m0"])
+        self.assertIsNone(resp.json()["next"])
+
+        Message.objects.create(conversation=self.conversation, sender=self.alice, content="m5")
+        resp = self.client.get(self.url, {"since": sync_cursor})
+        self.assertEqual([m["content"] for m in resp.json()["results"]], ["m5"])
+        resp = self.client.get(self.url, {"since": str(self.messages[3].id)})
+        self.assertEqual([m["content"] for m in resp.json()["results"]], ["m4", "m5"])
+
+    def test_read_watermark(self):
+        self.assertEqual(ConversationParticipant.objects.get(conversation=self.conversation, user=self.me).unread_count, 5)
+
+        self.client.get(self.url)
+        mine = ConversationParticipant.objects.get(conversation=self.conversation, user=self.me)
+        self.assertEqual(mine.unread_count, 0)
+        self.assertIsNotNone(mine.last_read_at)
+        # No per-message updates
+        self.assertFalse(Message.objects.filter(is_read=True).exists())
+
+        reply = Message.objects.create(conversation=self.conversation, sender=self.me, content="reply")
+        resp = self.client.get(self.url, {"since": str(self.messages[-1].id)})
+        row = resp.json()["results"][0]
+        self.assertEqual((row["id"], row["is_read"]), (str(reply.id), False))
+
+    def test_outsider_gets_404(self):
+        self.client.force_authenticate(user=_make_user("mallory"))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class WriteBehindOrderTests(TestCase):
+    def test_one_batch_keeps_send_order_with_a_frozen_clock(self):
+        import asyncio
+        from datetime import datetime, timezone as dt_timezone
+
+        from asgiref.sync import async_to_sync
+
+        from . import write_behind
+
+        me, alice = _make_user("me"), _make_user("alice")
+        conversation = _make_conversation(me, alice)
+        buffer = write_behind.MessageBuffer(window=0.01)
+
+        async def send_all():
+            return await asyncio.gather(*(
+                buffer.submit(me.id, alice.id, conversation.id, f"m{i}") for i in range(5)
+            ))
+
+        frozen = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        with mock.patch.object(write_behind.timezone, "now", return_value=frozen):
+            async_to_sync(send_all)()
 
-# Create your tests here.
+        self.assertEqual(buffer.stats()["batches"], 1)
+        history = Message.objects.filter(conversation=conversation).order_by("created_at", "id")
+        self.assertEqual([m.content for m in history], [f"m{i}" for i in range(5)])
+        self.assertEqual(len({m.created_at for m in history}), 5)
@@ -1,25 +1,27 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
 from rest_framework import status
 
-from django.db.models import Max, Count, Q, Prefetch, OuterRef, Subquery, F
+from django.db.models import Q, F
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
-from .models import Conversation, ConversationParticipant, Message, BlockUser, ReportUser
+from .models import Conversation, ConversationParticipant, BlockUser, ReportUser
 from .serializers import (
     ConversationSerializer,
+    ConversationSummarySerializer,
     ConversationDetailSerializer,
     BlockUserSerializer,
     ReportUserSerializer,
 )
 from .pagination import (
     ChatPagination,
-    ChatDetailPagination,
+    ChatListPagination,
+    MessageHistoryPagination,
 )
+from . import pair_index, summaries
 
 
 User = get_user_model()
@@ -55,11 +57,11 @@ class CreateConversationAPIView(APIView):
         if existing_convo:
             # Inject unread_count for serializer
             existing_convo.unread_count = (
-                existing_convo.messages
-                .filter(is_read=False)
-                .exclude(sender=user)
-                .count()
-            )
+                existing_convo.participants
+                .filter(user=user)
+                .values_list('unread_count', flat=True)
+                .first()
+            ) or 0
 
             serializer = ConversationSerializer(existing_convo, context={'request': request})
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -67,8 +69,10 @@ class CreateConversationAPIView(APIView):
         # Create new conversation
         conversation = Conversation.objects.create(is_group=False)
 
-        ConversationParticipant.objects.create(user=user, conversation=conversation)
-        ConversationParticipant.objects.create(user=other_user, conversation=conversation)
+        ConversationParticipant.objects.create(user=user, peer=other_user, conversation=conversation)
+        ConversationParticipant.objects.create(user=other_user, peer=user, conversation=conversation)
+        # The socket path may have cached "no conversation yet" for this pair
+        pair_index.invalidate(user.id, other_user.id)
 
         # Manually inject unread_count since no messages yet
         conversation.unread_count = 0
@@ -80,53 +84,39 @@ class CreateConversationAPIView(APIView):
 
 class ChatListAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = ChatListPagination
 
     def get(self, request, *args, **kwargs):
         user = request.user
 
-        latest_messages_qs = Message.objects.order_by('-created_at')
-        
-        user_participant = ConversationParticipant.objects.filter(
-            conversation=OuterRef('pk'), user=user
+        # One scan of the user's summary rows, newest activity first
+        rows = (
+            ConversationParticipant.objects
+            .filter(user=user, conversation__is_group=False)
+            .filter(Q(cleared_at__isnull=True) | Q(last_message_at__gt=F('cleared_at')))
+            .select_related('peer', 'last_message_sender')
         )
 
-        conversations = (
-            Conversation.objects.filter(participants__user=user, is_group=False)
-            .annotate(
-                user_cleared_at=Subquery(user_participant.values('cleared_at')[:1])
-            )
-            .annotate(
-                last_message_time=Max('messages__created_at'),
-                unread_count=Count(
-                    'messages',
-                    filter=Q(messages__is_read=False) 
-                    & ~Q(messages__sender=user)
-                    & (Q(messages__created_at__gt=F('user_cleared_at')) | Q(user_cleared_at__isnull=True))
-                )
-            )
-            .filter(
-                Q(user_cleared_at__isnull=True) | Q(last_message_time__gt=F('user_cleared_at'))
-            )
-            .prefetch_related(
-                Prefetch(
-                    'messages',
-                    queryset=latest_messages_qs,
-                    to_attr='latest_messages'  
-                ),
-                'participants__user'  
-            )
-            .order_by('-last_message_time')
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(rows, request)
+
+        peer_ids = [row.peer_id for row in page if row.peer_id]
+        blocked_user_ids = set()
+        for blocker_id, blocked_id in BlockUser.objects.filter(
+            Q(blocker=user, blocked_user_id__in=peer_ids) |
+            Q(blocked_user=user, blocker_id__in=peer_ids)
+        ).values_list('blocker_id', 'blocked_user_id'):
+            blocked_user_ids.add(blocked_id if blocker_id == user.id else blocker_id)
+
+        serializer = ConversationSummarySerializer(
+            page, many=True, context={'request': request, 'blocked_user_ids': blocked_user_ids}
         )
-
-        paginator = PageNumberPagination()
-        page = paginator.paginate_queryset(conversations, request)
-        serializer = ConversationSerializer(page, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
 
 
 class ConversationDetailView(APIView):
     permission_classes = [IsAuthenticated]
-    pagination_class = ChatDetailPagination
+    pagination_class = MessageHistoryPagination
 
     def get(self, request, conv_id, *args, **kwargs):
         user = request.user
@@ -137,38 +127,36 @@ class ConversationDetailView(APIView):
 
         conv = get_object_or_404(Conversation, id=conv_id)
 
-
-        Message.objects.filter(
-            conversation=conv,
-            is_read=False
-        ).exclude(sender=request.user).update(is_read=True)
-
-        participant = ConversationParticipant.objects.filter(
-            conversation=conv,
-            user=user
-        ).first()
-
-        if participant:
-            participant.last_read_at = timezone.now()
-            participant.save()
+        participants = list(ConversationParticipant.objects.filter(conversation=conv))
+        participant = next((p for p in participants if p.user_id == user.id), None)
+        if participant is None:
+            return Response({"detail": "Conversation not found."}, status=status.HTTP_404_NOT_FOUND)
 
         paginator = self.pagination_class()
-        messages_qs = conv.messages.all()
-        if participant and participant.cleared_at:
+        messages_qs = conv.messages.select_related('sender')
+        if participant.cleared_at:
             messages_qs = messages_qs.filter(created_at__gt=participant.cleared_at)
 
-        messages_qs = messages_qs.order_by('-created_at')
+        page = paginator.paginate_queryset(messages_qs, request)
 
-        paginated_messages = paginator.paginate_queryset(messages_qs, request)
-        paginated_messages = list(paginated_messages)[::-1]
+        # Read receipts are a per-participant watermark; it only moves when
+        # the page reaches the newest message
+        reached_newest = not paginator.has_more if paginator.mode == "since" else "before" not in request.query_params
+        if reached_newest and page:
+            newest = page[-1].created_at
+            if participant.unread_count or not participant.last_read_at or participant.last_read_at < newest:
+                summaries.mark_read(participant, timezone.now())
+
+        read_watermarks = {p.user_id: p.last_read_at for p in participants}
+        peer_last_read_at = next((p.last_read_at for p in participants if p.user_id != user.id), None)
 
         serializer = ConversationDetailSerializer(
-            paginated_messages,
+            page,
             many=True,
-            context={"request": request}
+            context={"request": request, "read_watermarks": read_watermarks}
         )
 
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(serializer.data, peer_last_read_at=peer_last_read_at)
 
 
 class BlockUserAPIView(APIView):
@@ -284,7 +272,6 @@ class DeleteConversationAPIView(APIView):
         except ConversationParticipant.DoesNotExist:
             return Response({"detail": "Conversation not found or already deleted."}, status=status.HTTP_404_NOT_FOUND)
         
-        participant.cleared_at = timezone.now()
-        participant.save()
+        summaries.mark_cleared(participant, timezone.now())
         
         return Response({"detail": "Conversation deleted successfully."}, status=status.HTTP_200_OK)
@@ -0,0 +1,144 @@
+"""
+Write-behind buffer for chat messages (CHAT_WRITE_BEHIND).
+
+Without it every socket message is its own INSERT transaction, and since
+sync_to_async runs ORM calls on a single thread, a busy worker is bounded
+by one commit per message. The buffer collects the messages that arrive
+within WINDOW seconds (at most MAX_BATCH) and writes them with one
+bulk_create in one transaction ("group commit").
+
+  - ordering: created_at is assigned at submit, strictly increasing across
+    the worker's messages (so within every conversation it writes), and
+    batches commit one after another; the (created_at, id) history order is
+    send order even for messages of one batch, which would otherwise share
+    a timestamp
+  - durability: submit() only returns once the batch transaction has
+    committed, so the sender's ack still means "stored"
+  - failures: if the batch insert fails (e.g. a cached conversation was
+    deleted), its messages are retried one by one so one bad message does
+    not fail the others
+
+    buffer = MessageBuffer()
+    message = await buffer.submit(sender_id, receiver_id, conversation_id, content)
+"""
+import asyncio
+import logging
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import pair_index, summaries
+from .models import Message
+
+logger = logging.getLogger(__name__)
+
+WINDOW = 0.005
+MAX_BATCH = 100
+
+
+def _persist_batch(messages):
+    with transaction.atomic():
+        Message.objects.bulk_create(messages)
+        # bulk_create sends no post_save
+        summaries.record_messages(messages)
+
+
+def persist_message(message, receiver_id):
+    """INSERT one message; re-resolves the pair's conversation if the cached one is gone."""
+    try:
+        message.save(force_insert=True)
+    except IntegrityError:
+        # The cached conversation was deleted in the meantime
+        sender_id = message.sender_id
+        pair_index.invalidate(sender_id, receiver_id)
+        pair = pair_index.resolve(sender_id, receiver_id)
+        message.conversation_id = pair["conversation"] or pair_index.create_conversation(sender_id, receiver_id)
+        message.save(force_insert=True)
+    return message
+
+
+def _persist_individually(entries):
+    results = []
+    for message, receiver_id in entries:
+        try:
+            results.append(persist_message(message, receiver_id))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class MessageBuffer:
+    def __init__(self, window=WINDOW, max_batch=MAX_BATCH):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = []
+        self._timer = None
+        # Batches commit one at a time, in the order they were cut
+        self._commit_lock = asyncio.Lock()
+        self._last_created_at = None
+        self._stats = {"batches": 0, "messages": 0, "fallbacks": 0, "largest_batch": 0}
+
+    async def submit(self, sender_id, receiver_id, conversation_id, content):
+        """Queue a message; returns it once it is committed."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        message = Message(
+            conversation_id=conversation_id, sender_id=sender_id, content=content, created_at=self._next_created_at()
+        )
+        self._pending.append((message, str(receiver_id), future))
+
+        if len(self._pending) >= self.max_batch:
+            self._cut()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._cut)
+        return await future
+
+    def _next_created_at(self):
+        # Strictly increasing even when the clock does not move between
+        # messages (or steps back)
+        now = timezone.now()
+        if self._last_created_at is not None and now <= self._last_created_at:
+            now = self._last_created_at + timedelta(microseconds=1)
+        self._last_created_at = now
+        return now
+
+    def _cut(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._flush(batch))
+
+    async def _flush(self, batch):
+        async with self._commit_lock:
+            messages = [message for message, _, _ in batch]
+            try:
+                await sync_to_async(_persist_batch)(messages)
+                results = messages
+            except Exception as e:
+                logger.warning(f"Batch insert of {len(batch)} messages failed, retrying one by one: {e}")
+                self._stats["fallbacks"] += 1
+                results = await sync_to_async(_persist_individually)(
+                    [(message, receiver_id) for message, receiver_id, _ in batch]
+                )
+
+            self._stats["batches"] += 1
+            self._stats["messages"] += len(batch)
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        data = dict(self._stats)
+        data["pending"] = len(self._pending)
+        data["average_batch"] = data["messages"] / data["batches"] if data["batches"] else 0.0
+        return data
@@ -0,0 +1,91 @@
+"""
+Denormalised reaction / comment counters on PostModel and CommentModel.
+
+Every change is a single UPDATE with F() expressions, so concurrent
+reactions never lose increments. Call the `record_*` helpers inside the
+same transaction as the row they account for; `reconcile_counters` (and
+the `reconcile_counters` management command) repairs any drift.
+"""
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import CommentModel, CommentReaction, PostModel, PostReaction
+
+REACTION_FIELDS = {
+    "like": "like_count",
+    "dislike": "dislike_count",
+}
+
+
+def _apply(model, pk, deltas):
+    updates = {
+        field: Greatest(F(field) + delta, Value(0))
+        for field, delta in deltas.items()
+        if delta
+    }
+    if updates:
+        model.objects.filter(pk=pk).update(**updates)
+
+
+def _reaction_deltas(old_reaction, new_reaction):
+    deltas = {}
+    if old_reaction:
+        field = REACTION_FIELDS[old_reaction]
+        deltas[field] = deltas.get(field, 0) - 1
+    if new_reaction:
+        field = REACTION_FIELDS[new_reaction]
+        deltas[field] = deltas.get(field, 0) + 1
+    return deltas
+
+
+def record_post_reaction(post_id, old_reaction, new_reaction):
+    """A reaction on a post went from `old_reaction` to `new_reaction` (either may be None)."""
+    _apply(PostModel, post_id, _reaction_deltas(old_reaction, new_reaction))
+
+
+def record_comment_reaction(comment_id, old_reaction, new_reaction):
+    """A reaction on a comment went from `old_reaction` to `new_reaction` (either may be None)."""
+    _apply(CommentModel, comment_id, _reaction_deltas(old_reaction, new_reaction))
+
+
+def record_comment_count(post_id, delta):
+    _apply(PostModel, post_id, {"comment_count": delta})
+
+
+def _count(queryset, fk):
+    return Coalesce(
+        Subquery(
+            queryset
+            .filter(**{fk: OuterRef("pk")})
+            .values(fk)
+            .annotate(n=Count("pk"))
+            .values("n")[:1]
+        ),
+        Value(0),
+    )
+
+
+def _reconcile(model, expected):
+    """Rewrite the counters of every row whose stored values drifted."""
+    annotated = model.objects.annotate(**{f"expected_{f}": e for f, e in expected.items()})
+    drift = Q()
+    for field in expected:
+        drift |= ~Q(**{field: F(f"expected_{field}")})
+    drifted_ids = list(annotated.filter(drift).values_list("pk", flat=True))
+    if drifted_ids:
+        model.objects.filter(pk__in=drifted_ids).update(**expected)
+    return len(drifted_ids)
+
+
+def reconcile_counters():
+    """Recompute counters from the source tables. Returns (posts_fixed, comments_fixed)."""
+    posts_fixed = _reconcile(PostModel, {
+        "like_count": _count(PostReaction.objects.filter(reaction="like"), "post"),
+        "dislike_count": _count(PostReaction.objects.filter(reaction="dislike"), "post"),
+        "comment_count": _count(CommentModel.objects.all(), "post"),
+    })
+    comments_fixed = _reconcile(CommentModel, {
+        "like_count": _count(CommentReaction.objects.filter(reaction="like"), "comment"),
+        "dislike_count": _count(CommentReaction.objects.filter(reaction="dislike"), "comment"),
+    })
+    return posts_fixed, comments_fixed
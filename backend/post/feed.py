@@ -0,0 +1,252 @@
+"""
+Feed engine for PostFeedView.
+
+The whole ordering is computed inside the database so a page request only
+touches O(page_size) rows instead of materialising the feed in Python:
+
+  1. Unseen posts (no PostView before `session_start`), newest first.
+  2. Seen posts, least viewed first, ties broken by a jitter derived from
+     md5(post id + seed) so the shuffle is stable for the whole session.
+
+Pages are addressed by an opaque keyset cursor that records the position of
+the last (or, going back, the first) delivered post. Together with the frozen
+`session_start` and `seed` this guarantees that no post is delivered twice
+while scrolling and that going back serves the same pages, even though
+delivering a page mutates PostView rows: a seen post is bumped at most once
+per session (viewed_at moves past `session_start`, view_count + 1), and
+split_feed undoes that bump when it reads the row.
+"""
+import base64
+import json
+import random
+from collections import OrderedDict
+
+from django.db.models import Case, CharField, Exists, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Concat, MD5
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.pagination import PostFeedPagination
+
+from .models import PostView
+
+UNSEEN = "unseen"
+SEEN = "seen"
+
+
+def parse_feed_session(request):
+    """
+    Return (session_start, session_start_str, seed_str) for the request,
+    initialising fresh values when the client did not send valid ones.
+    """
+    session_start = None
+    session_start_str = request.query_params.get("session_start")
+    if session_start_str:
+        session_start = parse_datetime(session_start_str)
+    if not session_start:
+        session_start = timezone.now()
+        session_start_str = session_start.isoformat()
+
+    seed_str = request.query_params.get("seed")
+    try:
+        float(seed_str)
+    except (TypeError, ValueError):
+        seed_str = str(random.random())
+
+    return session_start, session_start_str, seed_str
+
+
+def split_feed(queryset, user, session_start, seed_str):
+    """
+    Split the candidate queryset into the ordered (unseen, seen) sections.
+
+    Posts created after `session_start` are left for the next refresh so the
+    session stays frozen.
+    """
+    # A row bumped during this session was viewed before it (view_count > 1)
+    seen_before_session = PostView.objects.filter(
+        Q(viewed_at__lt=session_start) | Q(view_count__gt=1),
+        user=user,
+        post=OuterRef("pk"),
+    )
+    view_count_at_start = Case(
+        When(viewed_at__gte=session_start, then=F("view_count") - 1),
+        default=F("view_count"),
+    )
+    queryset = queryset.filter(created_at__lte=session_start)
+
+    unseen = (
+        queryset
+        .filter(~Exists(seen_before_session))
+        .order_by("-created_at", "-id")
+    )
+    seen = (
+        queryset
+        .filter(Exists(seen_before_session))
+        .annotate(
+            seen_view_count=Subquery(
+                seen_before_session.annotate(at_start=view_count_at_start).values("at_start")[:1]
+            ),
+            jitter=MD5(Concat(Cast("id", CharField()), Value(seed_str))),
+        )
+        .order_by("seen_view_count", "jitter", "id")
+    )
+    return unseen, seen
+
+
+class SessionFeedPagination(PostFeedPagination):
+    """
+    Keyset pagination over the two feed sections.
+
+    The next and previous URLs carry `session_start`, `seed` and a `cursor`
+    pointing at the last (next) or first (previous) delivered post, so any
+    page is served with at most two LIMIT queries whatever the size of the
+    platform. The response keeps the PageNumberPagination shape (`count`,
+    `next`, `previous`, `results`); `count` is computed on the first page
+    and carried in the cursor.
+    """
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, session_start_str, seed_str):
+        super().__init__()
+        self.session_start_str = session_start_str
+        self.seed_str = seed_str
+        self.count = 0
+        self.next_position = None
+        self.previous_position = None
+
+    def paginate_feed(self, unseen, seen, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        if cursor is None:
+            self.count = unseen.count() + seen.count()
+        else:
+            self.count = cursor["count"]
+
+        if cursor is not None and cursor["before"]:
+            return self._page_before(unseen, seen, cursor, page_size)
+
+        page = []
+        if cursor is None or cursor["section"] == UNSEEN:
+            if cursor is not None:
+                unseen = unseen.filter(
+                    Q(created_at__lt=cursor["created_at"])
+                    | Q(created_at=cursor["created_at"], id__lt=cursor["id"])
+                )
+            page = [(UNSEEN, p) for p in unseen[:page_size + 1]]
+        else:
+            seen = seen.filter(
+                Q(seen_view_count__gt=cursor["view_count"])
+                | Q(seen_view_count=cursor["view_count"], jitter__gt=cursor["jitter"])
+                | Q(seen_view_count=cursor["view_count"], jitter=cursor["jitter"], id__gt=cursor["id"])
+            )
+
+        # Unseen section exhausted (or already behind us) — fill from seen.
+        if len(page) <= page_size:
+            page += [(SEEN, p) for p in seen[:page_size + 1 - len(page)]]
+
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_position = page[-1]
+        # The cursor's post comes before this page
+        if cursor is not None and page:
+            self.previous_position = page[0]
+
+        return [p for _, p in page]
+
+    def _page_before(self, unseen, seen, cursor, page_size):
+        """The page that ends right before the cursor's post, read in reverse feed order."""
+        page = []
+        if cursor["section"] == SEEN:
+            seen = seen.filter(
+                Q(seen_view_count__lt=cursor["view_count"])
+                | Q(seen_view_count=cursor["view_count"], jitter__lt=cursor["jitter"])
+                | Q(seen_view_count=cursor["view_count"], jitter=cursor["jitter"], id__lt=cursor["id"])
+            ).order_by("-seen_view_count", "-jitter", "-id")
+            page = [(SEEN, p) for p in seen[:page_size + 1]]
+        else:
+            unseen = unseen.filter(
+                Q(created_at__gt=cursor["created_at"])
+                | Q(created_at=cursor["created_at"], id__gt=cursor["id"])
+            )
+
+        # Back across the section boundary into the end of the unseen posts
+        if len(page) <= page_size:
+            unseen = unseen.order_by("created_at", "id")
+            page += [(UNSEEN, p) for p in unseen[:page_size + 1 - len(page)]]
+
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.previous_position = page[-1]
+        page.reverse()
+        if page:
+            self.next_position = page[-1]
+
+        return [p for _, p in page]
+
+    def encode_cursor(self, section, post, before=False):
+        if section == UNSEEN:
+            position = {"s": UNSEEN, "t": post.created_at.isoformat(), "i": str(post.id)}
+        else:
+            position = {"s": SEEN, "v": post.seen_view_count, "j": post.jitter, "i": str(post.id)}
+        position["n"] = self.count
+        if before:
+            position["b"] = 1
+        raw = json.dumps(position, separators=(",", ":")).encode("ascii")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            extra = {"count": int(position["n"]), "before": bool(position.get("b"))}
+            if position["s"] == UNSEEN:
+                created_at = parse_datetime(position["t"])
+                if created_at is None:
+                    raise ValueError(position["t"])
+                return {"section": UNSEEN, "created_at": created_at, "id": position["i"], **extra}
+            if position["s"] == SEEN:
+                return {
+                    "section": SEEN,
+                    "view_count": int(position["v"]),
+                    "jitter": str(position["j"]),
+                    "id": position["i"],
+                    **extra,
+                }
+        except (TypeError, ValueError, KeyError, UnicodeError, AttributeError):
+            pass
+        raise NotFound(self.invalid_cursor_message)
+
+    def _link(self, position, before=False):
+        if position is None:
+            return None
+        url = remove_query_param(self.base_url, self.page_query_param)
+        url = replace_query_param(url, self.cursor_query_param, self.encode_cursor(*position, before=before))
+        url = replace_query_param(url, "session_start", self.session_start_str)
+        url = replace_query_param(url, "seed", self.seed_str)
+        return url
+
+    def get_next_link(self):
+        return self._link(self.next_position)
+
+    def get_previous_link(self):
+        return self._link(self.previous_position, before=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("count", self.count),
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
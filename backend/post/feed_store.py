@@ -0,0 +1,127 @@
+"""
+Per-user feed candidate store (post.models.FeedEntry).
+
+A FeedEntry row means "this post may appear in this user's home feed". The
+rules are the same ones PostFeedView used to evaluate on every request:
+
+  - public post (no classroom) with a living author other than the reader
+  - post level is one of the reader's math levels, "Other", or unset
+  - no block between reader and author in either direction
+  - reader has not marked the post as not interested
+  - post is not hidden by text moderation
+
+Writes keep the store up to date incrementally; `rebuild_user_feed` and the
+`rebuild_feed_entries` management command recompute it from scratch.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from messaging.models import BlockUser
+
+from .models import FeedEntry, PostModel, PostNotInterested
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+def _is_open_level(post_level):
+    return post_level is None or post_level.name.lower() == "other"
+
+
+def _insert(pairs):
+    """Bulk insert (user_id, post_id) pairs, skipping ones already stored."""
+    batch = []
+    for user_id, post_id in pairs:
+        batch.append(FeedEntry(user_id=user_id, post_id=post_id))
+        if len(batch) >= BATCH_SIZE:
+            FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def eligible_users(post):
+    """Users whose feed should contain `post`."""
+    if post.classroom_id or not post.user_id or post.is_hidden:
+        return User.objects.none()
+
+    users = User.objects.exclude(id=post.user_id)
+    if not _is_open_level(post.post_level):
+        users = users.filter(math_levels=post.post_level_id)
+
+    return (
+        users
+        .exclude(id__in=BlockUser.objects.filter(blocker_id=post.user_id).values("blocked_user_id"))
+        .exclude(id__in=BlockUser.objects.filter(blocked_user_id=post.user_id).values("blocker_id"))
+        .exclude(id__in=PostNotInterested.objects.filter(post=post).values("user_id"))
+        .distinct()
+    )
+
+
+def candidate_posts(user, authors=None):
+    """Posts that belong in `user`'s feed, optionally limited to `authors`."""
+    posts = (
+        PostModel.objects
+        .filter(classroom__isnull=True, is_hidden=False)
+        .filter(
+            Q(post_level__in=user.math_levels.all())
+            | Q(post_level__name__iexact="Other")
+            | Q(post_level__isnull=True)
+        )
+        .exclude(user__isnull=True)
+        .exclude(user=user)
+        .exclude(user_id__in=BlockUser.objects.filter(blocker=user).values("blocked_user_id"))
+        .exclude(user_id__in=BlockUser.objects.filter(blocked_user=user).values("blocker_id"))
+        .exclude(id__in=PostNotInterested.objects.filter(user=user).values("post_id"))
+    )
+    if authors is not None:
+        posts = posts.filter(user__in=authors)
+    return posts
+
+
+def fan_out_post(post):
+    """
+    Push `post` into the feed of every eligible user.
+
+    Idempotent: re-running after the post level changed also drops the
+    entries of users who are no longer eligible.
+    """
+    user_ids = eligible_users(post).values_list("id", flat=True)
+    with transaction.atomic():
+        FeedEntry.objects.filter(post=post).exclude(user_id__in=user_ids).delete()
+        _insert((user_id, post.id) for user_id in user_ids.iterator(chunk_size=BATCH_SIZE))
+
+
+def rebuild_user_feed(user):
+    """Recompute the whole feed of `user` (math levels changed, backfill)."""
+    post_ids = candidate_posts(user).values_list("id", flat=True)
+    with transaction.atomic():
+        FeedEntry.objects.filter(user=user).delete()
+        _insert((user.id, post_id) for post_id in post_ids.iterator(chunk_size=BATCH_SIZE))
+
+
+def remove_post_for_user(user, post):
+    """`user` marked `post` as not interested."""
+    FeedEntry.objects.filter(user=user, post=post).delete()
+
+
+def prune_blocked_pair(blocker, blocked_user):
+    """Drop the posts of each user from the other's feed after a block."""
+    FeedEntry.objects.filter(
+        Q(user=blocker, post__user=blocked_user)
+        | Q(user=blocked_user, post__user=blocker)
+    ).delete()
+
+
+def restore_pair(user_a, user_b):
+    """Re-add the posts of each user to the other's feed after an unblock."""
+    _insert(
+        (user_a.id, post_id)
+        for post_id in candidate_posts(user_a, authors=[user_b]).values_list("id", flat=True)
+    )
+    _insert(
+        (user_b.id, post_id)
+        for post_id in candidate_posts(user_b, authors=[user_a]).values_list("id", flat=True)
+    )
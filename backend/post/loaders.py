@@ -0,0 +1,56 @@
+"""
+Batch loader for PostFeedSerializer.
+
+Fills everything the feed card needs that is not on the post row itself
+(the reader's reaction, the translation in the reader's language and the
+author's level) for a whole page of posts in a constant number of queries,
+instead of several queries per post. Like and comment counts are
+denormalised on PostModel (see post.counters).
+
+The values are stored on the post instances as `feed_*` attributes.
+"""
+from account.models import StudentProgress
+
+from .models import PostReaction, PostTranslation
+
+
+def load_post_feed_data(posts, user=None):
+    posts = [p for p in posts if not getattr(p, "feed_data_loaded", False)]
+    if not posts:
+        return
+
+    post_ids = [p.id for p in posts]
+    user_lang = (getattr(user, "language", None) or "en") if user else "en"
+
+    user_reactions = {}
+    if user is not None and user.is_authenticated:
+        user_reactions = dict(
+            PostReaction.objects
+            .filter(post_id__in=post_ids, user=user)
+            .values_list("post_id", "reaction")
+        )
+
+    # Only posts written in another language need a translation lookup
+    foreign_ids = [p.id for p in posts if p.language != user_lang]
+    translations = {}
+    if foreign_ids:
+        translations = dict(
+            PostTranslation.objects
+            .filter(post_id__in=foreign_ids, language=user_lang)
+            .values_list("post_id", "translated_text")
+        )
+
+    author_ids = {p.user_id for p in posts if p.user_id}
+    author_levels = {}
+    if author_ids:
+        author_levels = dict(
+            StudentProgress.objects
+            .filter(student__account__user_id__in=author_ids)
+            .values_list("student__account__user_id", "level")
+        )
+
+    for p in posts:
+        p.feed_user_reaction = user_reactions.get(p.id)
+        p.feed_translated_text = translations.get(p.id)
+        p.feed_user_level = author_levels.get(p.user_id, 1)
+        p.feed_data_loaded = True
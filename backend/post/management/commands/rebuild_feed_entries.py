@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from post.feed_store import rebuild_user_feed
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed feed candidates (FeedEntry) for all users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild the feed of this user id')
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(id=options['user'])
+
+        self.stdout.write(f"Rebuilding feed for {users.count()} users...")
+        for user in users.iterator():
+            rebuild_user_feed(user)
+        self.stdout.write(self.style.SUCCESS('Successfully rebuilt feed entries'))
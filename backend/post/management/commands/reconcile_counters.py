@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from post.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalised like/dislike/comment counters that drifted'
+
+    def handle(self, *args, **kwargs):
+        posts_fixed, comments_fixed = reconcile_counters()
+        self.stdout.write(f"Fixed counters on {posts_fixed} posts and {comments_fixed} comments.")
+        self.stdout.write(self.style.SUCCESS('Counters reconciled'))
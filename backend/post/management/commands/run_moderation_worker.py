@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from utils import moderation_service
+from utils.slang_detector import get_slang_model
+
+
+class Command(BaseCommand):
+    help = 'Run the Detoxify moderation worker (one model instance, micro-batched inference)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=float, default=moderation_service.BATCH_WINDOW,
+                            help='Seconds to collect texts into one batch')
+        parser.add_argument('--max-batch', type=int, default=moderation_service.MAX_BATCH_TEXTS,
+                            help='Maximum texts per batch')
+
+    def handle(self, *args, **options):
+        moderation_service.BATCH_WINDOW = options['window']
+        moderation_service.MAX_BATCH_TEXTS = options['max_batch']
+
+        self.stdout.write('Loading Detoxify model...')
+        model = get_slang_model()
+        self.stdout.write(self.style.SUCCESS('Moderation worker ready'))
+        moderation_service.serve(model)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+
+from core.utils import TRANSLATION_LANGUAGES
+from post.models import CommentModel, PostModel
+from post.tasks import translate_comments_task, translate_posts_task
+
+
+class Command(BaseCommand):
+    help = 'Queue micro-batched translation tasks for posts and comments missing translations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Objects per translation task')
+        parser.add_argument('--comments', action='store_true', help='Translate comments instead of posts')
+
+    def handle(self, *args, **options):
+        model, task = (CommentModel, translate_comments_task) if options['comments'] else (PostModel, translate_posts_task)
+        # Every language except the source one should have a row
+        expected = len(TRANSLATION_LANGUAGES) - 1
+
+        ids = list(
+            model.objects
+            .exclude(Q(text__isnull=True) | Q(text=''))
+            .annotate(translation_count=Count('translations'))
+            .filter(translation_count__lt=expected)
+            .values_list('id', flat=True)
+        )
+
+        batch_size = max(options['batch_size'], 1)
+        for i in range(0, len(ids), batch_size):
+            task.delay([str(pk) for pk in ids[i:i + batch_size]])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Queued {len(ids)} {model.__name__} objects in batches of {batch_size}'
+        ))
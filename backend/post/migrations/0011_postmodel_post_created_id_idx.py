@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0010_remove_postview_post_postview_user_post_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='postmodel',
+            index=models.Index(
+                fields=['-created_at', '-id'],
+                name='post_created_id_idx',
+            ),
+        ),
+    ]
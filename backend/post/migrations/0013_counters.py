@@ -0,0 +1,69 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, fk):
+    return Coalesce(
+        Subquery(
+            queryset
+            .filter(**{fk: OuterRef("pk")})
+            .values(fk)
+            .annotate(n=Count("pk"))
+            .values("n")[:1]
+        ),
+        Value(0),
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    PostModel = apps.get_model('post', 'PostModel')
+    PostReaction = apps.get_model('post', 'PostReaction')
+    CommentModel = apps.get_model('post', 'CommentModel')
+    CommentReaction = apps.get_model('post', 'CommentReaction')
+
+    PostModel.objects.update(
+        like_count=_count(PostReaction.objects.filter(reaction='like'), 'post'),
+        dislike_count=_count(PostReaction.objects.filter(reaction='dislike'), 'post'),
+        comment_count=_count(CommentModel.objects.all(), 'post'),
+    )
+    CommentModel.objects.update(
+        like_count=_count(CommentReaction.objects.filter(reaction='like'), 'comment'),
+        dislike_count=_count(CommentReaction.objects.filter(reaction='dislike'), 'comment'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0012_feedentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postmodel',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postmodel',
+            name='dislike_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postmodel',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='commentmodel',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='commentmodel',
+            name='dislike_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
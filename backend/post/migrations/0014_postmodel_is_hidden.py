@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0013_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postmodel',
+            name='is_hidden',
+            field=models.BooleanField(default=False, help_text='Hidden from other users by asynchronous text moderation'),
+        ),
+    ]
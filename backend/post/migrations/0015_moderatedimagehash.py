@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0014_postmodel_is_hidden'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModeratedImageHash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phash', models.BigIntegerField()),
+                ('dhash', models.BigIntegerField()),
+                ('verdict', models.CharField(choices=[('safe', 'Safe'), ('unsafe', 'Unsafe')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Moderated Image Hash',
+                'verbose_name_plural': 'Moderated Image Hashes',
+                'unique_together': {('phash', 'dhash')},
+            },
+        ),
+    ]
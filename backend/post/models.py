@@ -66,6 +66,14 @@ class PostModel(models.Model):
         default=False,
         help_text="Indicates if the post is verified by AI"
     )
+    is_hidden = models.BooleanField(
+        default=False,
+        help_text="Hidden from other users by asynchronous text moderation"
+    )
+    # Denormalised counters, maintained by post.counters
+    like_count = models.PositiveIntegerField(default=0)
+    dislike_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -73,6 +81,9 @@ class PostModel(models.Model):
         ordering = ['-created_at']
         verbose_name = "Post"
         verbose_name_plural = "Posts"
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="post_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"Post by {self.user} in {self.classroom} (Level {self.post_level})"
@@ -167,6 +178,9 @@ class CommentModel(models.Model):
         default='en',
         help_text="Original language of the comment"
     )
+    # Denormalised counters, maintained by post.counters
+    like_count = models.PositiveIntegerField(default=0)
+    dislike_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -270,6 +284,61 @@ class PostNotInterested(models.Model):
         return f"{self.user} not interested in {self.post.id}"
 
 
+class FeedEntry(models.Model):
+    """
+    Materialised feed candidate: `post` is eligible for `user`'s home feed.
+
+    Maintained incrementally by post.feed_store (fan-out on post creation,
+    pruning on block / not-interested) so PostFeedView does not have to
+    recompute level and exclusion filters on every scroll.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="feed_entries"
+    )
+    post = models.ForeignKey(
+        PostModel,
+        on_delete=models.CASCADE,
+        related_name="feed_entries"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("user", "post")
+        verbose_name = "Feed Entry"
+        verbose_name_plural = "Feed Entries"
+
+    def __str__(self):
+        return f"{self.post_id} in feed of {self.user_id}"
+
+
+class ModeratedImageHash(models.Model):
+    """
+    Perceptual hashes of an image NudeDetector has already judged.
+
+    Loaded into memory by utils.image_hash so reposts and near-duplicates
+    reuse the verdict instead of running inference again.
+    """
+    SAFE = "safe"
+    UNSAFE = "unsafe"
+    VERDICT_CHOICES = [(SAFE, "Safe"), (UNSAFE, "Unsafe")]
+
+    # 64-bit hashes stored signed (BigIntegerField)
+    phash = models.BigIntegerField()
+    dhash = models.BigIntegerField()
+    verdict = models.CharField(max_length=10, choices=VERDICT_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("phash", "dhash")
+        verbose_name = "Moderated Image Hash"
+        verbose_name_plural = "Moderated Image Hashes"
+
+    def __str__(self):
+        return f"{self.phash:016x} {self.verdict}"
+
+
 class Notification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     title = models.CharField(max_length=255)
@@ -1,14 +1,15 @@
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from utils.slang_detector import detect_slang
+from utils.slang_detector import PENDING, SLANG, detect_slang, slang_verdict
 
-from post.tasks import run_nudity_check, translate_post_task
+from post.tasks import schedule_nudity_check, translate_post_task, fan_out_post_task, moderate_post_text_task
 from core.utils import translate_text, get_translated_level_name
 
 from administration.models import MathLevels
 from student.utils import award_badge_by_code
 
+from .loaders import load_post_feed_data
 from .models import (
     PostModel,
     CommentModel
@@ -34,6 +35,17 @@ class PostSerializer(serializers.ModelSerializer):
             "created_at", "updated_at"
         )
 
+    def validate_image(self, value):
+        # Reject re-uploads of images moderation already removed
+        if value is not None and hasattr(value, "read"):
+            from utils.image_hash import known_unsafe
+
+            data = value.read()
+            value.seek(0)
+            if known_unsafe(data):
+                raise serializers.ValidationError("This image is not allowed.")
+        return value
+
     def validate(self, attrs):
         is_update = self.instance is not None
         
@@ -56,8 +68,8 @@ class PostSerializer(serializers.ModelSerializer):
         classroom = validated_data.pop('classroom', None)
 
         text = validated_data.get('text', '')
-        is_slang = detect_slang(text)
-        if is_slang:
+        verdict = slang_verdict(text)
+        if verdict == SLANG:
             raise serializers.ValidationError(
                 {"text": "Your post contains inappropriate language."}
             )
@@ -69,10 +81,16 @@ class PostSerializer(serializers.ModelSerializer):
             **validated_data
         )
 
-        run_nudity_check.delay(str(post.id))
+        schedule_nudity_check(post.id)
+
+        # The model did not answer in time: publish now, hide later if needed
+        if verdict == PENDING:
+            moderate_post_text_task.delay(str(post.id))
         
         translate_post_task.delay(str(post.id))
 
+        fan_out_post_task.delay(str(post.id))
+
         if is_first_post:
             try:
                 student = user.account.student
@@ -85,24 +103,43 @@ class PostSerializer(serializers.ModelSerializer):
         text_changed = 'text' in validated_data and validated_data['text'] != instance.text
         image_changed = 'image' in validated_data
         video_changed = 'video' in validated_data
+        level_changed = 'post_level' in validated_data and validated_data['post_level'] != instance.post_level
 
+        verdict = None
         if 'text' in validated_data:
             text = validated_data['text']
-            is_slang = detect_slang(text)
-            if is_slang:
+            verdict = slang_verdict(text)
+            if verdict == SLANG:
                 raise serializers.ValidationError({"text": "Your post contains inappropriate language."})
 
         instance = super().update(instance, validated_data)
 
+        # Re-check asynchronously if undecided, or to unhide an edited post
+        if verdict == PENDING or (text_changed and instance.is_hidden):
+            moderate_post_text_task.delay(str(instance.id))
+
         if image_changed or video_changed:
-            run_nudity_check.delay(str(instance.id))
+            schedule_nudity_check(instance.id)
         
         if text_changed:
             translate_post_task.delay(str(instance.id))
 
+        if level_changed:
+            fan_out_post_task.delay(str(instance.id))
+
         return instance
 
 
+class PostFeedListSerializer(serializers.ListSerializer):
+    """Batch-loads counters, reactions and translations for the whole page."""
+
+    def to_representation(self, data):
+        posts = list(data.all() if hasattr(data, "all") else data)
+        request = self.context.get('request')
+        load_post_feed_data(posts, getattr(request, 'user', None))
+        return super().to_representation(posts)
+
+
 class PostFeedSerializer(serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     profile_pic = serializers.SerializerMethodField()
@@ -123,6 +160,14 @@ class PostFeedSerializer(serializers.ModelSerializer):
             "likes", "user_reaction", "post_level",
             "post_level_name", "created_at", "comment_count", "user_level"
         )
+        list_serializer_class = PostFeedListSerializer
+
+    def to_representation(self, instance):
+        # Single-object use (e.g. PostDetailView) goes through the same loader
+        if not getattr(instance, 'feed_data_loaded', False):
+            request = self.context.get('request')
+            load_post_feed_data([instance], getattr(request, 'user', None))
+        return super().to_representation(instance)
 
     def get_full_name(self, obj):
         if obj.user:
@@ -130,10 +175,7 @@ class PostFeedSerializer(serializers.ModelSerializer):
         return None
 
     def get_user_level(self, obj):
-        try:
-            return obj.user.account.student.progress.level
-        except Exception:
-            return 1
+        return obj.feed_user_level
 
     def get_profile_pic(self, obj):
         if obj.user and obj.user.profile_pic:
@@ -153,8 +195,7 @@ class PostFeedSerializer(serializers.ModelSerializer):
         if user_lang == obj.language:
             return obj.text  # show original if same language
 
-        translation = obj.translations.filter(language=user_lang).first()
-        return translation.translated_text if translation else obj.text
+        return obj.feed_translated_text or obj.text
 
     def get_image(self, obj):
         if obj.image:
@@ -162,15 +203,13 @@ class PostFeedSerializer(serializers.ModelSerializer):
         return None
 
     def get_likes(self, obj):
-        return obj.reactions.filter(reaction='like').count()
+        return obj.like_count
 
     def get_user_reaction(self, obj):
-        user = self.context.get('request').user
-        reaction = obj.reactions.filter(user=user).first()
-        return reaction.reaction if reaction else None
+        return obj.feed_user_reaction
 
     def get_comment_count(self, obj):
-        return obj.comments.count()
+        return obj.comment_count
 
     def get_created_at(self, obj):
         from django.utils import timezone
@@ -256,10 +295,10 @@ class CommentSerializer(serializers.ModelSerializer):
         return None
 
     def get_like_count(self, obj):
-        return obj.reactions.filter(reaction="like").count()
+        return obj.like_count
 
     def get_dislike_count(self, obj):
-        return obj.reactions.filter(reaction="dislike").count()
+        return obj.dislike_count
 
     def get_user_reaction(self, obj):
         request = self.context.get("request")
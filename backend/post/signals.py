@@ -1,15 +1,26 @@
 """
 Post-related badge signals.
 
+Also keeps the feed candidate store (FeedEntry) in sync when a user signs
+up or their math levels change, a post is marked not interested, or a user
+is blocked / unblocked, and decrements the post's comment counter whenever a
+comment is deleted (own delete, admin delete, or reply cascade).
+
 Triggers:
   - first_question  → when a user creates their very first post
   - post_10         → when a user has created 10+ posts
   - post_50         → when a user has created 50+ posts
 """
-from django.db.models.signals import post_save
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 
-from .models import PostModel
+from messaging.models import BlockUser
+
+from .models import PostModel, PostNotInterested, CommentModel
+
+User = get_user_model()
 
 
 @receiver(post_save, sender=PostModel)
@@ -40,3 +51,66 @@ def check_post_badges(sender, instance, created, **kwargs):
 
     if post_count >= 50:
         award_badge_by_code(student, 'post_50')
+
+
+@receiver(post_save, sender=User)
+def build_feed_for_new_user(sender, instance, created, **kwargs):
+    """A new user's feed starts with the existing posts open to them."""
+    if not created:
+        return
+
+    from .tasks import rebuild_user_feed_task
+
+    user_id = str(instance.id)
+    transaction.on_commit(lambda: rebuild_user_feed_task.delay(user_id))
+
+
+@receiver(m2m_changed, sender=User.math_levels.through)
+def rebuild_feed_on_level_change(sender, instance, action, reverse, **kwargs):
+    """Keep the feed candidate store in sync with the user's math levels."""
+    if reverse or action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    from .tasks import rebuild_user_feed_task
+
+    user_id = str(instance.id)
+    transaction.on_commit(lambda: rebuild_user_feed_task.delay(user_id))
+
+
+@receiver(post_save, sender=PostNotInterested)
+def drop_not_interested_from_feed(sender, instance, created, **kwargs):
+    if not created:
+        return
+
+    from .feed_store import remove_post_for_user
+    remove_post_for_user(instance.user, instance.post)
+
+
+@receiver(post_save, sender=BlockUser)
+def prune_feed_on_block(sender, instance, created, **kwargs):
+    if not created:
+        return
+
+    from .feed_store import prune_blocked_pair
+    prune_blocked_pair(instance.blocker, instance.blocked_user)
+
+
+@receiver(post_delete, sender=BlockUser)
+def restore_feed_on_unblock(sender, instance, **kwargs):
+    from .feed_store import restore_pair
+
+    user_ids = [instance.blocker_id, instance.blocked_user_id]
+
+    def restore():
+        # The block may have been removed because one of the users was deleted.
+        users = list(User.objects.filter(id__in=user_ids))
+        if len(users) == 2:
+            restore_pair(*users)
+
+    transaction.on_commit(restore)
+
+
+@receiver(post_delete, sender=CommentModel)
+def decrement_comment_count(sender, instance, **kwargs):
+    from .counters import record_comment_count
+    record_comment_count(instance.post_id, -1)
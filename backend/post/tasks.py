@@ -1,30 +1,57 @@
-from django.core.exceptions import ObjectDoesNotExist
 from celery import shared_task
-from nudenet import NudeDetector
-import requests
-import tempfile
+from celery.signals import worker_process_init, worker_ready
+from django.conf import settings
 import logging
 
-from core.utils import translate_text
+from core.utils import TRANSLATION_LANGUAGES, translate_texts_concurrently
+from utils import nudity_detector
 from .models import PostModel, PostTranslation, CommentModel, CommentTranslation
 
 logger = logging.getLogger(__name__)
 
-# Initialize detector once
-detector = NudeDetector()
+# Seconds moderate_post_text_task waits for the moderation worker
+ASYNC_MODERATION_TIMEOUT = 30
 
-# Labels considered unsafe
-UNSAFE_LABELS = [
-    "FEMALE_BREAST_EXPOSED",
-    "MALE_BREAST_EXPOSED",
-    "FEMALE_GENITALIA_EXPOSED",
-    "MALE_GENITALIA_EXPOSED",
-    "ANUS_EXPOSED",
-    "BUTTOCKS_EXPOSED",
-]
 
-# Threshold above which a detection counts as NSFW
-NSFW_THRESHOLD = 0.3
+@worker_process_init.connect
+def warm_nudity_detector(**kwargs):
+    # Only workers consuming the moderation queue set this
+    if getattr(settings, "NUDITY_WARM_DETECTOR", False):
+        nudity_detector.get_detector()
+
+
+@worker_ready.connect
+def recover_nudity_queue(**kwargs):
+    # Ids drained by a moderation worker that died mid-batch
+    if getattr(settings, "NUDITY_WARM_DETECTOR", False) and nudity_detector.recover():
+        run_nudity_check_batch.delay()
+
+
+def schedule_nudity_check(post_id):
+    """Queue a post's image for the next moderation batch."""
+    if nudity_detector.schedule(post_id):
+        run_nudity_check_batch.delay()
+    else:
+        run_nudity_check.delay(str(post_id))
+
+
+@shared_task
+def run_nudity_check_batch():
+    """
+    Check up to nudity_detector.BATCH_SIZE queued post images in one batch.
+    Deletes the posts whose image is NSFW.
+    """
+    post_ids = nudity_detector.drain()
+    if not post_ids:
+        return {"status": "empty"}
+
+    result = _nudity_check(post_ids)
+    if result["status"] == "done":
+        nudity_detector.ack(post_ids)
+    else:
+        # Checked again with the batch of the next upload
+        nudity_detector.requeue(post_ids)
+    return result
 
 
 @shared_task
@@ -33,67 +60,143 @@ def run_nudity_check(post_id):
     Celery task to check if a post's image contains nudity.
     Deletes the post if NSFW content is detected.
     """
+    return _nudity_check([post_id])
+
+
+def _nudity_check(post_ids):
     try:
-        post = PostModel.objects.get(id=post_id)
+        result = nudity_detector.check_posts(post_ids)
+    except Exception as e:
+        logger.exception(f"Error processing posts {post_ids}: {str(e)}")
+        return {"status": "error", "post_ids": [str(i) for i in post_ids], "error": str(e)}
+    return {
+        "status": "done",
+        "verified": [str(i) for i in result["verified"]],
+        "deleted": [str(i) for i in result["deleted"]],
+        "failed": [str(i) for i in result["failed"]],
+        "deduplicated": [str(i) for i in result["deduplicated"]],
+        "timings": {stage: round(seconds, 3) for stage, seconds in result["timings"].items()},
+    }
 
-        if not post.image:
-            # No image, mark as verified
-            post.is_verified = True
-            post.save(update_fields=["is_verified"])
-            return {"status": "no_image", "post_id": post_id}
-
-        # Download image to temp file
-        image_url = post.image.url
-        with tempfile.NamedTemporaryFile(suffix=".jpg") as tmp:
-            r = requests.get(image_url, stream=True, timeout=10)
-            r.raise_for_status()
-            for chunk in r.iter_content(1024):
-                tmp.write(chunk)
-            tmp.flush()
-
-            # Run detection
-            detections = detector.detect(tmp.name)
-
-            # Check if any unsafe label exceeds threshold
-            is_nsfw = any(
-                d["class"] in UNSAFE_LABELS and d["score"] >= NSFW_THRESHOLD
-                for d in detections
-            )
-
-            if is_nsfw:
-                post.delete()
-                return {"status": "deleted", "post_id": post_id}
-            else:
-                post.is_verified = True
-                post.save(update_fields=["is_verified"])
-                return {"status": "safe", "post_id": post_id}
-
-    except ObjectDoesNotExist:
+
+@shared_task
+def fan_out_post_task(post_id):
+    """Push a new (or re-levelled) post into every eligible user's feed."""
+    from .feed_store import fan_out_post
+
+    try:
+        post = PostModel.objects.select_related("post_level").get(id=post_id)
+    except PostModel.DoesNotExist:
         logger.warning(f"Post {post_id} does not exist.")
         return {"status": "not_found", "post_id": post_id}
-    except requests.RequestException as e:
-        logger.error(f"Failed to download image for post {post_id}: {str(e)}")
-        return {"status": "download_error", "post_id": post_id, "error": str(e)}
-    except Exception as e:
-        logger.exception(f"Error processing post {post_id}: {str(e)}")
-        return {"status": "error", "post_id": post_id, "error": str(e)}
+
+    fan_out_post(post)
+    return {"status": "success", "post_id": post_id}
 
 
 @shared_task
-def translate_post_task(post_id):
-    post = PostModel.objects.get(id=post_id)
-    source_lang = post.language or 'en'
-    target_languages = ['en','es','fr','de','zh','ja','he']
-
-    for lang in target_languages:
-        if lang == source_lang:
-            continue
-        translated = translate_text(post.text, target_lang=lang, source_lang=source_lang)
-        PostTranslation.objects.update_or_create(
-            post=post,
-            language=lang,
-            defaults={'translated_text': translated}
+def rebuild_user_feed_task(user_id):
+    """Recompute a user's feed candidates, e.g. after their math levels changed."""
+    from django.contrib.auth import get_user_model
+    from .feed_store import rebuild_user_feed
+
+    User = get_user_model()
+    try:
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        logger.warning(f"User {user_id} does not exist.")
+        return {"status": "not_found", "user_id": user_id}
+
+    rebuild_user_feed(user)
+    return {"status": "success", "user_id": user_id}
+
+
+def _translate_objects(objects, translation_model, fk_field):
+    """
+    Translate the `text` of `objects` into every target language and upsert
+    all translation rows with a single bulk_create.
+
+    Objects are grouped by source language so each group costs one
+    concurrent fan-out (one LibreTranslate call per language and chunk)
+    however many objects it holds.
+    """
+    by_source = {}
+    for obj in objects:
+        if obj.text:
+            by_source.setdefault(obj.language or 'en', []).append(obj)
+
+    rows = []
+    for source_lang, group in by_source.items():
+        translations = translate_texts_concurrently(
+            [obj.text for obj in group],
+            target_langs=TRANSLATION_LANGUAGES,
+            source_lang=source_lang,
         )
+        for lang, texts in translations.items():
+            for obj, translated in zip(group, texts):
+                rows.append(translation_model(**{
+                    fk_field: obj,
+                    'language': lang,
+                    'translated_text': translated or obj.text,
+                }))
+
+    if rows:
+        translation_model.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=[fk_field, 'language'],
+            update_fields=['translated_text'],
+        )
+    return len(rows)
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=30)
+def moderate_post_text_task(self, post_id):
+    """
+    Asynchronous text moderation for posts published while the moderation
+    worker was too slow to answer: hides the post if its text is slang and
+    unhides it once it is clean again.
+    """
+    from utils.slang_detector import PENDING, SLANG, slang_verdict
+    from .feed_store import fan_out_post
+
+    try:
+        post = PostModel.objects.select_related("post_level").get(id=post_id)
+    except PostModel.DoesNotExist:
+        logger.warning(f"Post {post_id} does not exist.")
+        return {"status": "not_found", "post_id": post_id}
+
+    verdict = slang_verdict(post.text, timeout=ASYNC_MODERATION_TIMEOUT)
+    if verdict == PENDING:
+        raise self.retry()
+
+    hidden = verdict == SLANG
+    if post.is_hidden != hidden:
+        PostModel.objects.filter(pk=post.pk).update(is_hidden=hidden)
+        post.is_hidden = hidden
+        # Drops the post from every feed when hidden, restores it when not
+        fan_out_post(post)
+    return {"status": verdict, "post_id": post_id, "hidden": hidden}
+
+
+@shared_task
+def translate_post_task(post_id):
+    try:
+        post = PostModel.objects.get(id=post_id)
+    except PostModel.DoesNotExist:
+        logger.warning(f"Post {post_id} does not exist.")
+        return {"status": "not_found", "post_id": post_id}
+
+    written = _translate_objects([post], PostTranslation, 'post')
+    return {"status": "success", "post_id": post_id, "translations": written}
+
+
+@shared_task
+def translate_posts_task(post_ids):
+    """Micro-batched variant: translate many posts with one call per language."""
+    posts = list(PostModel.objects.filter(id__in=post_ids))
+    written = _translate_objects(posts, PostTranslation, 'post')
+    return {"status": "success", "posts": len(posts), "translations": written}
 
 
 @shared_task
@@ -104,23 +207,13 @@ def translate_comment_task(comment_id):
         logger.warning(f"Comment {comment_id} does not exist.")
         return {"status": "not_found", "comment_id": comment_id}
 
-    source_lang = comment.language or 'en'
-    target_languages = ['en', 'es', 'fr', 'de', 'zh', 'ja', 'he']
-
-    for lang in target_languages:
-        if lang == source_lang:
-            continue
-        if not comment.text:
-            continue
-        try:
-            translated = translate_text(comment.text, target_lang=lang, source_lang=source_lang)
-            CommentTranslation.objects.update_or_create(
-                comment=comment,
-                language=lang,
-                defaults={'translated_text': translated}
-            )
-        except Exception as e:
-            logger.error(f"Failed to translate comment {comment_id} to {lang}: {str(e)}")
-
-    return {"status": "success", "comment_id": comment_id}
+    written = _translate_objects([comment], CommentTranslation, 'comment')
+    return {"status": "success", "comment_id": comment_id, "translations": written}
+
 
+@shared_task
+def translate_comments_task(comment_ids):
+    """Micro-batched variant of translate_comment_task."""
+    comments = list(CommentModel.objects.filter(id__in=comment_ids))
+    written = _translate_objects(comments, CommentTranslation, 'comment')
+    return {"status": "success", "comments": len(comments), "translations": written}
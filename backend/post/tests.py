@@ -14,24 +14,41 @@ Covers the 12 required scenarios from the implementation spec:
   10. Excluded/deleted posts are not returned
   11. Two users have independent read histories
   12. Concurrent requests do not create duplicate PostView rows
+  13. Keyset cursor walks unseen then seen posts without duplicates
+  14. A tampered cursor is rejected
+  15. Blocking an author removes their posts from the feed store
+  16. Query count per feed page does not grow with the page size
+  17. Reaction and comment counters follow the API and reconcile drift
+  18. Translation fan-out upserts every language in one batch
+  19. Repeated strings are served from the translation memory
+  20. The compiled slang matcher agrees with the old per-pattern loop
+  21. The verdict cache evicts one entry at a time and expires by TTL
+  22. Asynchronous text moderation hides and unhides posts
+  23. Image moderation verifies and deletes a batch of posts at once
+  24. Reposted images reuse the verdict of the copy moderated before
+  25. Shared cache namespaces: version bumps, atomic add and stampede waits
 """
 
 import uuid
 import threading
 from datetime import timedelta
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 
 from post.models import PostModel, PostView, PostNotInterested
+from post.feed_store import fan_out_post
 from administration.models import MathLevels
 
 User = get_user_model()
 
-FEED_URL = "/api/post/feed/"
+FEED_URL = "/post/feed/"
 
 
 def _make_user(username, **kwargs):
@@ -47,10 +64,7 @@ def _make_user(username, **kwargs):
 
 def _make_level():
     """Return (or create) a shared MathLevels instance."""
-    level, _ = MathLevels.objects.get_or_create(
-        name="Algebra",
-        defaults={"description": "Algebra level"},
-    )
+    level, _ = MathLevels.objects.get_or_create(name="Algebra")
     return level
 
 
@@ -68,6 +82,8 @@ def _make_post(author, level, created_offset_days=0):
             created_at=timezone.now() - timedelta(days=created_offset_days)
         )
         post.refresh_from_db()
+    # PostSerializer.create hands this to a Celery task; run it inline here.
+    fan_out_post(post)
     return post
 
 
@@ -366,3 +382,545 @@ class Test12ConcurrentRequestsNoDuplicates(FeedBaseTestCase):
             .filter(cnt__gt=1)
         )
         self.assertEqual(list(dupes), [], f"Duplicate PostView rows found: {list(dupes)}")
+
+
+# ---------------------------------------------------------------------------
+# Test 13 — Keyset cursor crosses from unseen into seen without duplicates
+# ---------------------------------------------------------------------------
+class Test13CursorCrossesSections(FeedBaseTestCase):
+    def test_full_scroll_delivers_every_post_once(self):
+        seen_posts = [_make_post(self.author, self.level, created_offset_days=10 + i) for i in range(12)]
+        past_time = timezone.now() - timedelta(days=1)
+        for p in seen_posts:
+            pv = PostView.objects.create(user=self.viewer, post=p)
+            PostView.objects.filter(pk=pv.pk).update(viewed_at=past_time)
+
+        unseen_posts = [_make_post(self.author, self.level, created_offset_days=i) for i in range(13)]
+
+        all_ids = []
+        url = FEED_URL
+        while url:
+            data = self.client.get(url).json()
+            all_ids.extend(r["id"] for r in data["results"] if r.get("item_type") != "challenge")
+            url = data.get("next")
+            if url:
+                self.assertIn("cursor=", url)
+
+        self.assertEqual(len(all_ids), 25)
+        self.assertEqual(len(all_ids), len(set(all_ids)))
+        self.assertEqual(set(all_ids[:13]), {str(p.id) for p in unseen_posts})
+
+    def test_previous_links_walk_back_over_the_same_pages(self):
+        for p in [_make_post(self.author, self.level, created_offset_days=10 + i) for i in range(7)]:
+            pv = PostView.objects.create(user=self.viewer, post=p)
+            PostView.objects.filter(pk=pv.pk).update(viewed_at=timezone.now() - timedelta(days=1))
+        [_make_post(self.author, self.level, created_offset_days=i) for i in range(6)]
+
+        def ids(data):
+            return [r["id"] for r in data["results"] if r.get("item_type") != "challenge"]
+
+        pages = []
+        data = self.client.get(FEED_URL, {"page_size": 4}).json()
+        self.assertIsNone(data["previous"])
+        while True:
+            # Same keys as PageNumberPagination
+            self.assertEqual(list(data), ["count", "next", "previous", "results"])
+            self.assertEqual(data["count"], 13)
+            pages.append(ids(data))
+            if not data["next"]:
+                break
+            data = self.client.get(data["next"]).json()
+        self.assertEqual([len(page) for page in pages], [4, 4, 4, 1])
+
+        for expected in reversed(pages[:-1]):
+            data = self.client.get(data["previous"]).json()
+            self.assertEqual(ids(data), expected)
+        self.assertIsNone(data["previous"])
+        self.assertEqual(ids(self.client.get(data["next"]).json()), pages[1])
+
+
+# ---------------------------------------------------------------------------
+# Test 14 — Invalid cursor is rejected
+# ---------------------------------------------------------------------------
+class Test14InvalidCursorRejected(FeedBaseTestCase):
+    def test_invalid_cursor_returns_404(self):
+        _make_post(self.author, self.level)
+
+        resp = self.client.get(FEED_URL, {"cursor": "not-a-cursor"})
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# ---------------------------------------------------------------------------
+# Test 15 — Blocking prunes the precomputed feed
+# ---------------------------------------------------------------------------
+class Test15BlockPrunesFeedStore(FeedBaseTestCase):
+    def test_blocked_author_posts_not_returned(self):
+        from messaging.models import BlockUser
+        from post.models import FeedEntry
+
+        post = _make_post(self.author, self.level)
+        self.assertTrue(FeedEntry.objects.filter(user=self.viewer, post=post).exists())
+
+        BlockUser.objects.create(blocker=self.viewer, blocked_user=self.author)
+        self.assertFalse(FeedEntry.objects.filter(user=self.viewer, post=post).exists())
+
+        data = self.client.get(FEED_URL).json()
+        returned_ids = {r["id"] for r in data["results"] if r.get("item_type") != "challenge"}
+        self.assertNotIn(str(post.id), returned_ids)
+
+
+# ---------------------------------------------------------------------------
+# Test 16 — Feed page is serialised in a constant number of queries
+# ---------------------------------------------------------------------------
+class Test16ConstantQueriesPerPage(FeedBaseTestCase):
+    def _count_feed_queries(self, viewer):
+        client = APIClient()
+        client.force_authenticate(user=viewer)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(FEED_URL)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def test_query_count_independent_of_page_size(self):
+        from post.models import PostReaction
+
+        reactor = _make_user("reactor")
+        for i in range(10):
+            post = _make_post(self.author, self.level, created_offset_days=i)
+            PostReaction.objects.create(post=post, user=reactor, reaction="like")
+
+        small_viewer = _make_user("small_viewer")
+        small_viewer.math_levels.add(self.level)
+        from post.models import FeedEntry
+        FeedEntry.objects.filter(user=small_viewer).delete()
+        for post in PostModel.objects.all()[:3]:
+            FeedEntry.objects.create(user=small_viewer, post=post)
+
+        small_page = self._count_feed_queries(small_viewer)
+        full_page = self._count_feed_queries(self.viewer)
+
+        self.assertEqual(small_page, full_page)
+
+
+# ---------------------------------------------------------------------------
+# Test 17 — Denormalised counters
+# ---------------------------------------------------------------------------
+class Test17DenormalisedCounters(FeedBaseTestCase):
+    def test_reactions_update_counters(self):
+        post = _make_post(self.author, self.level)
+        url = f"/post/react/{post.id}/"
+
+        self.client.post(url, {"reaction": "like"})
+        post.refresh_from_db()
+        self.assertEqual((post.like_count, post.dislike_count), (1, 0))
+
+        self.client.post(url, {"reaction": "dislike"})
+        post.refresh_from_db()
+        self.assertEqual((post.like_count, post.dislike_count), (0, 1))
+
+        self.client.post(url, {"reaction": "dislike"})
+        post.refresh_from_db()
+        self.assertEqual((post.like_count, post.dislike_count), (0, 0))
+
+    def test_reconcile_fixes_drift(self):
+        from post.counters import reconcile_counters
+        from post.models import CommentModel, PostReaction
+
+        post = _make_post(self.author, self.level)
+        PostReaction.objects.create(post=post, user=self.viewer, reaction="like")
+        CommentModel.objects.create(post=post, user=self.viewer, text="hi")
+
+        self.assertEqual(reconcile_counters(), (1, 0))
+        post.refresh_from_db()
+        self.assertEqual((post.like_count, post.comment_count), (1, 1))
+        self.assertEqual(reconcile_counters(), (0, 0))
+
+
+class Test18TranslationFanOut(FeedBaseTestCase):
+    def _fake_translate(self, texts, target_langs, source_lang):
+        # Like the real fan-out the source language is skipped; one language
+        # fails and must be left out, not stored untranslated
+        return {
+            lang: [f"[{lang}] {t}" for t in texts]
+            for lang in target_langs if lang not in (source_lang, "ja")
+        }
+
+    def test_posts_are_upserted_per_language(self):
+        from post.models import PostTranslation
+        from post.tasks import translate_posts_task
+
+        posts = [_make_post(self.author, self.level) for _ in range(3)]
+        PostTranslation.objects.create(post=posts[0], language="es", translated_text="stale")
+
+        with mock.patch("post.tasks.translate_texts_concurrently", side_effect=self._fake_translate) as fan_out:
+            translate_posts_task([str(p.id) for p in posts])
+
+        # All three posts share a source language -> a single fan-out
+        self.assertEqual(fan_out.call_count, 1)
+        self.assertEqual(PostTranslation.objects.filter(post__in=posts).count(), 3 * 5)
+        self.assertFalse(PostTranslation.objects.filter(language__in=["en", "ja"]).exists())
+        self.assertEqual(
+            PostTranslation.objects.get(post=posts[0], language="es").translated_text,
+            f"[es] {posts[0].text}",
+        )
+
+
+class Test19TranslationMemory(TestCase):
+    def setUp(self):
+        from core import translation_memory
+        translation_memory.clear_lru()
+
+    def test_batch_only_sends_unknown_strings(self):
+        from core import translation_memory
+        from core.utils import translate_texts_batch
+
+        translation_memory.store("Hello  world ", "Hola mundo", "en", "es")
+        translation_memory.clear_lru()
+
+        response = mock.Mock()
+        response.json.return_value = {"translatedText": ["Adiós"]}
+        with mock.patch("core.utils.outbound.post", return_value=response) as post:
+            result = translate_texts_batch(["Hello world", "Bye", "Bye", ""], "es")
+
+        self.assertEqual(result, ["Hola mundo", "Adiós", "Adiós", ""])
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(post.call_args.kwargs["json"]["q"], ["Bye"])
+
+        with mock.patch("core.utils.outbound.post") as post:
+            self.assertEqual(translate_texts_batch(["Bye"], "es"), ["Adiós"])
+        post.assert_not_called()
+
+
+SLANG_PARITY_CORPUS = [
+    "",
+    "Nice explanation, thanks!",
+    "Assume the class of functions is closed; the mass of the glass is 2kg.",
+    "Let f(x) = x^2, find dx/dt and the tangent at x = 1",
+    "This is bullshit, stupid ass question",
+    "what the f*ck is this",
+    "pu$$y",
+    "f@gg0t",
+    "a**hole",
+    "Con este problema me vuelvo loco, qué mierda",
+    "Ferme ta gueule, va te faire voir",
+    "Scheiße, diese Aufgabe ist zu schwer",
+    "这道题太难了，我不会做。",
+    "他妈的这是什么",
+    "バカじゃないの",
+    "בן זונה",
+    "Shitake mushrooms and Scunthorpe",
+    "classic passage on compassion",
+    "BITCH in capitals",
+    "son of a bitch 2 + 2",
+]
+
+
+def _slang_parity_corpus():
+    from utils.slang_matcher import OFFENSIVE_KEYWORDS
+
+    corpus = list(SLANG_PARITY_CORPUS)
+    for keyword in OFFENSIVE_KEYWORDS:
+        term = keyword[2:-2].replace("\\", "") if keyword.startswith(r"\b") else keyword
+        corpus += [
+            term,
+            f"this is {term} really",
+            f"x{term}y",
+            f"{term.upper()}!",
+            f"solve x^2 = 4 {term}",
+        ]
+    return corpus
+
+
+class Test20SlangMatcherParity(TestCase):
+    def test_matches_legacy_loop(self):
+        import re
+        from utils.bench_slang_matcher import legacy_is_offensive
+        from utils.slang_matcher import MATCHER
+
+        legacy_math = (
+            r'[∫∑∏√∂∆∇≠≈≤≥±×÷∞π∈∉⊂⊃∪∩∧∨¬∀∃]|[\d]+|[xy][\d]+|d[xyztuv]/d[xyztuv]|[a-z]\^[\d]+|'
+            r'\b(sin|cos|tan|log|ln|exp|lim|integral|derivative|equation|solve|theorem|proof|formula|calculate)\b'
+        )
+        for text in _slang_parity_corpus():
+            text_lower = text.lower()
+            with self.subTest(text=text):
+                self.assertEqual(MATCHER.is_offensive(text_lower), legacy_is_offensive(text_lower))
+                self.assertEqual(
+                    MATCHER.has_math_context(text_lower),
+                    bool(re.search(legacy_math, text_lower)),
+                )
+
+
+class Test21VerdictCache(TestCase):
+    def test_lru_bounds_and_stats(self):
+        from utils.verdict_cache import VerdictCache
+
+        cache = VerdictCache("test", max_size=2, ttl=60, use_redis=False)
+        cache.set("a", True)
+        cache.set("b", False)
+        self.assertTrue(cache.get("a"))      # "a" is now most recently used
+        cache.set("c", True)                 # evicts "b" only
+
+        self.assertIsNone(cache.get("b"))
+        self.assertTrue(cache.get("c"))
+        stats = cache.stats()
+        self.assertEqual((stats["lru_hits"], stats["misses"], stats["evictions"]), (2, 1, 1))
+        self.assertEqual(stats["size"], 2)
+
+    def test_ttl_expiry(self):
+        from utils.verdict_cache import VerdictCache
+
+        cache = VerdictCache("test", max_size=10, ttl=60, use_redis=False)
+        with mock.patch("utils.verdict_cache.time.monotonic", return_value=1000.0):
+            cache.set("a", [False, True])
+        with mock.patch("utils.verdict_cache.time.monotonic", return_value=1061.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+
+class Test22AsyncTextModeration(FeedBaseTestCase):
+    def test_pending_when_worker_does_not_answer(self):
+        from utils import slang_detector
+        from utils.moderation_service import ModerationUnavailable
+
+        with mock.patch.object(slang_detector, "score_texts", side_effect=ModerationUnavailable):
+            self.assertEqual(slang_detector.slang_verdict("a perfectly normal sentence"), slang_detector.PENDING)
+        self.assertEqual(slang_detector.slang_verdict("what the fuck"), slang_detector.SLANG)
+
+    def test_hide_then_unhide(self):
+        from post.models import FeedEntry
+        from post.tasks import moderate_post_text_task
+
+        post = _make_post(self.author, self.level)
+        self.assertTrue(FeedEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.client.get(f"/post/detail/{post.id}/").status_code, status.HTTP_200_OK)
+
+        with mock.patch("utils.slang_detector.slang_verdict", return_value="slang"):
+            moderate_post_text_task(str(post.id))
+        post.refresh_from_db()
+        self.assertTrue(post.is_hidden)
+        self.assertFalse(FeedEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.client.get(f"/post/detail/{post.id}/").status_code, status.HTTP_404_NOT_FOUND)
+
+        with mock.patch("utils.slang_detector.slang_verdict", return_value="safe"):
+            moderate_post_text_task(str(post.id))
+        post.refresh_from_db()
+        self.assertFalse(post.is_hidden)
+        self.assertTrue(FeedEntry.objects.filter(user=self.viewer, post=post).exists())
+
+
+def _encoded_gradient(vertical, size=64):
+    import cv2
+    import numpy as np
+
+    # Vertical: bright top row fading down; horizontal: dark left column brightening right
+    if vertical:
+        image = np.repeat(np.linspace(255, 0, size)[:, None], size, axis=1)
+    else:
+        image = np.repeat(np.linspace(0, 255, size)[None, :], size, axis=0)
+    image = np.repeat(image.astype(np.uint8)[:, :, None], 3, axis=2)
+    return cv2.imencode(".png", image)[1].tobytes()
+
+
+def _fake_detector():
+    detector = mock.Mock()
+    # Images whose top-left pixel is bright count as NSFW
+    detector.detect_batch.side_effect = lambda images, batch_size: [
+        [{"class": "FEMALE_BREAST_EXPOSED", "score": 0.9}] if image[0, 0, 0] > 128 else []
+        for image in images
+    ]
+    return detector
+
+
+class ImageModerationTestCase(FeedBaseTestCase):
+    """Runs nudity_detector.check_posts with downloads and the detector faked."""
+
+    def setUp(self):
+        super().setUp()
+        from utils.image_hash import INDEX
+        INDEX.clear()
+
+    def _check(self, bodies, detector):
+        from utils import nudity_detector
+
+        def download(url):
+            return next(body for pk, body in bodies.items() if pk in url)
+
+        with mock.patch.object(nudity_detector, "_download", side_effect=download), \
+                mock.patch.object(nudity_detector, "get_detector", return_value=detector), \
+                mock.patch.object(nudity_detector, "record_timings"):
+            return nudity_detector.check_posts(list(bodies))
+
+    def _post_with_image(self):
+        post = _make_post(self.author, self.level)
+        PostModel.objects.filter(pk=post.pk).update(image=f"post_{post.pk}")
+        return post
+
+
+class Test23BatchedImageModeration(ImageModerationTestCase):
+    def test_batch_verdicts(self):
+        safe = self._post_with_image()
+        nsfw = self._post_with_image()
+        broken = self._post_with_image()
+        no_image = _make_post(self.author, self.level)
+
+        detector = _fake_detector()
+        result = self._check({
+            str(safe.pk): _encoded_gradient(vertical=False),
+            str(nsfw.pk): _encoded_gradient(vertical=True),
+            str(broken.pk): b"not an image",
+            str(no_image.pk): b"",
+        }, detector)
+
+        # One inference call for both decodable images
+        self.assertEqual(detector.detect_batch.call_count, 1)
+        self.assertEqual(len(detector.detect_batch.call_args[0][0]), 2)
+        self.assertTrue({"download", "decode", "infer"} <= set(result["timings"]))
+        self.assertEqual(result["failed"], [broken.pk])
+
+        self.assertFalse(PostModel.objects.filter(pk=nsfw.pk).exists())
+        verified = set(PostModel.objects.filter(is_verified=True).values_list("pk", flat=True))
+        self.assertEqual(verified, {safe.pk, no_image.pk})
+
+    def test_drained_ids_are_acked_or_requeued(self):
+        from post import tasks
+        from utils import nudity_detector
+
+        ids = [str(self._post_with_image().pk)]
+        with mock.patch.object(nudity_detector, "drain", return_value=ids), \
+                mock.patch.object(nudity_detector, "ack") as ack, \
+                mock.patch.object(nudity_detector, "requeue") as requeue:
+            with mock.patch.object(nudity_detector, "check_posts", side_effect=RuntimeError("model")):
+                self.assertEqual(tasks.run_nudity_check_batch()["status"], "error")
+            requeue.assert_called_once_with(ids)
+            ack.assert_not_called()
+
+            with mock.patch.object(nudity_detector, "_download", return_value=b"not an image"):
+                self.assertEqual(tasks.run_nudity_check_batch()["status"], "done")
+            ack.assert_called_once_with(ids)
+
+
+class Test24ImageHashDedupe(ImageModerationTestCase):
+    def test_reposts_reuse_verdicts(self):
+        from post.models import ModeratedImageHash
+        from utils.image_hash import INDEX, known_unsafe
+
+        first = self._post_with_image()
+        self._check({str(first.pk): _encoded_gradient(vertical=True)}, _fake_detector())
+        self.assertEqual(ModeratedImageHash.objects.filter(verdict="unsafe").count(), 1)
+
+        # A fresh process loads the verdict from the table
+        INDEX.clear()
+        self.assertTrue(known_unsafe(_encoded_gradient(vertical=True, size=48)))
+        self.assertFalse(known_unsafe(_encoded_gradient(vertical=False)))
+
+        repost = self._post_with_image()
+        detector = _fake_detector()
+        result = self._check({str(repost.pk): _encoded_gradient(vertical=True, size=80)}, detector)
+        detector.detect_batch.assert_not_called()
+        self.assertEqual(result["deduplicated"], [repost.pk])
+        self.assertFalse(PostModel.objects.filter(pk=repost.pk).exists())
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class Test25SharedCache(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_bump_and_add(self):
+        from core.shared_cache import Namespace
+
+        names = Namespace("test-names", timeout=60, versioned=True)
+        names.set(("Algebra", "es"), "Álgebra")
+        self.assertEqual(names.get(("Algebra", "es")), "Álgebra")
+        names.bump()
+        self.assertIsNone(names.get(("Algebra", "es")))
+        self.assertEqual((names.stats()["hits"], names.stats()["misses"]), (1, 1))
+
+        debounce = Namespace("test-debounce", timeout=60)
+        self.assertTrue(debounce.add((1, "like", "p1")))
+        self.assertFalse(debounce.add((1, "like", "p1")))
+
+    def test_stampede_waits_for_the_first_caller(self):
+        from django.core.cache import cache
+        from core import shared_cache
+
+        levels = shared_cache.Namespace("test-stampede", timeout=60)
+        key = levels.key("Algebra")
+        # Another worker holds the lock and stores the value while we wait
+        cache.add(f"{key}:lock", 1)
+        compute = mock.Mock(return_value="computed here")
+
+        def finish_elsewhere(_):
+            cache.set(key, "computed elsewhere")
+
+        with mock.patch.object(shared_cache.time, "sleep", side_effect=finish_elsewhere):
+            self.assertEqual(levels.get_or_set("Algebra", compute), "computed elsewhere")
+        compute.assert_not_called()
+        self.assertEqual(levels.stats()["waits"], 1)
+
+
+class Test26AsyncOutbound(TestCase):
+    def _client(self, handler):
+        import httpx
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    def test_async_calls_share_slots_breaker_and_retries(self):
+        import asyncio
+        import httpx
+        from core import outbound
+
+        upstream = outbound.Upstream(
+            "test-async", max_concurrency=1, acquire_timeout=0.05, retries=1, backoff=0,
+            failure_threshold=5, reset_timeout=30, probe_timeout=60,
+        )
+        statuses = iter([503, 200])
+
+        async def call():
+            async with self._client(lambda request: httpx.Response(next(statuses))) as client:
+                return await upstream.arequest(client, "POST", "http://translate.test/")
+
+        self.assertEqual(asyncio.run(call()).status_code, 200)
+        self.assertEqual((upstream.errors, upstream.breaker.state), (1, outbound.CircuitBreaker.CLOSED))
+
+        # A blocking caller holds the only slot
+        self.assertTrue(upstream._slots.acquire(blocking=False))
+        with self.assertRaises(outbound.UpstreamBusy):
+            asyncio.run(call())
+        upstream._slots.release()
+
+    def test_fan_out_runs_inside_an_event_loop(self):
+        import asyncio
+        import httpx
+        from core import outbound, utils
+
+        client = httpx.AsyncClient
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"translatedText": ["hola"]}))
+
+        async def from_async_code():
+            return utils._run_fan_out({"es": ["hello"]}, "en")
+
+        with mock.patch.dict(outbound._upstreams, clear=True), \
+                mock.patch.object(utils.httpx, "AsyncClient", side_effect=lambda **kw: client(transport=transport, **kw)):
+            self.assertEqual(asyncio.run(from_async_code()), {"es": {"hello": "hola"}})
+            self.assertEqual(outbound.metrics()["translate"]["latency"]["count"], 1)
+
+
+class Test27NewUserFeedIsBuilt(FeedBaseTestCase):
+    def test_signup_builds_the_feed_without_a_level_change(self):
+        from post.models import FeedEntry
+        from post.tasks import rebuild_user_feed_task
+
+        open_post = PostModel.objects.create(user=self.author, text="Open to everyone", language="en")
+        fan_out_post(open_post)
+        _make_post(self.author, self.level)
+
+        with mock.patch.object(rebuild_user_feed_task, "delay", side_effect=rebuild_user_feed_task), \
+                self.captureOnCommitCallbacks(execute=True):
+            newcomer = _make_user("newcomer")
+
+        self.assertEqual(
+            set(FeedEntry.objects.filter(user=newcomer).values_list("post_id", flat=True)),
+            {open_post.id},
+        )
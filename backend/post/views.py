@@ -3,7 +3,8 @@ from rest_framework.response import Response
 from rest_framework import generics, status, permissions
 from rest_framework.exceptions import PermissionDenied
 
-from django.db.models import Count, Case, When, IntegerField, FloatField, Value, F, Q, ExpressionWrapper
+from django.db import transaction
+from django.db.models import Case, When, IntegerField, FloatField, Value, F, Sum, ExpressionWrapper
 from django.db.models.functions import Coalesce, Random, Now, Extract
 from django.utils import timezone
 
@@ -11,13 +12,13 @@ from datetime import timedelta
 import random as _random
 import math
 import hashlib
-from django.utils.dateparse import parse_datetime
 
 from core.pagination import (
-    PostFeedPagination,
     CommentPagination,
 )
 
+from .counters import record_comment_count, record_comment_reaction, record_post_reaction
+from .feed import SessionFeedPagination, parse_feed_session, split_feed
 from .serializers import (
     PostSerializer,
     PostFeedSerializer,
@@ -30,26 +31,23 @@ from .models import (
     CommentReaction,
     PostView,
     PostNotInterested,
+    FeedEntry,
     Notification,
     FCMDevice,
 )
-from asgiref.sync import async_to_sync
 from core.utils import send_push_notification
 
 def emit_notification_to_socket(notif_instance):
     try:
-        from messaging.socket import sio, user_sid_map
-        user_id = str(notif_instance.user.id)
-        recipient_sid = user_sid_map.get(user_id)
-        if recipient_sid:
-            payload = {
-                "id": notif_instance.id,
-                "title": notif_instance.title,
-                "description": notif_instance.description,
-                "date_time": notif_instance.created_at.isoformat(),
-                "isRead": notif_instance.is_read,
-            }
-            async_to_sync(sio.emit)("new_notification", payload, to=recipient_sid)
+        from messaging.socket import emit_to_user
+        payload = {
+            "id": notif_instance.id,
+            "title": notif_instance.title,
+            "description": notif_instance.description,
+            "date_time": notif_instance.created_at.isoformat(),
+            "isRead": notif_instance.is_read,
+        }
+        emit_to_user(notif_instance.user_id, "new_notification", payload)
     except Exception as e:
         print("Failed to emit notification:", e)
 
@@ -71,7 +69,7 @@ class PostDetailView(generics.RetrieveAPIView):
         blocking_users = BlockUser.objects.filter(blocked_user=user).values_list('blocker_id', flat=True)
         return PostModel.objects.exclude(user_id__in=blocked_users).exclude(user_id__in=blocking_users).filter(
             Q(classroom__isnull=False) | Q(post_level_id__in=user_levels) | Q(user=user)
-        )
+        ).exclude(Q(is_hidden=True) & ~Q(user=user)).select_related("user", "post_level")
 
 class PostUpdateView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -129,25 +127,6 @@ class CommentDeleteView(generics.DestroyAPIView):
 
 
 
-class SessionFeedPagination(PostFeedPagination):
-    """
-    Overrides get_next_link to append the session_start and seed to the next URL,
-    ensuring that the frozen session state is maintained across pagination requests.
-    """
-    def __init__(self, session_start_str, seed_str):
-        super().__init__()
-        self.session_start_str = session_start_str
-        self.seed_str = seed_str
-
-    def get_next_link(self):
-        url = super().get_next_link()
-        if url:
-            from rest_framework.utils.urls import replace_query_param
-            url = replace_query_param(url, "session_start", self.session_start_str)
-            url = replace_query_param(url, "seed", self.seed_str)
-        return url
-
-
 class PostFeedView(APIView):
     """
     Feed algorithm — freshness-biased weighted random order with stable pagination.
@@ -160,11 +139,13 @@ class PostFeedView(APIView):
       5. No duplicate posts appear across pages during a single scroll session.
 
     To achieve this:
-      - `session_start` freezes the `seen_post_ids` pool to the start of the session,
-        preventing offset-shifting when delivered posts are marked as seen.
-      - A random `seed` is used to generate a deterministic `jitter` per post. This
-        guarantees the random reshuffle is completely stable while scrolling.
-      - Both parameters are passed via the `next` URL to maintain the session.
+      - `session_start` freezes the seen/unseen split to the start of the session,
+        so marking delivered posts as seen does not reshuffle later pages.
+      - A random `seed` is used to generate a deterministic `jitter` per post in
+        SQL. This guarantees the random reshuffle is completely stable while scrolling.
+      - Pages are served through a keyset `cursor` (see post.feed), so every page
+        only touches O(page_size) rows.
+      - All three parameters are passed via the `next` URL to maintain the session.
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -173,101 +154,40 @@ class PostFeedView(APIView):
 
     def get(self, request):
         user        = request.user
-        user_levels = list(user.math_levels.values_list("id", flat=True))
 
         # ------------------------------------------------------------------
         # Parse or initialize session parameters for pagination stability
         # ------------------------------------------------------------------
-        session_start_str = request.query_params.get("session_start")
-        if session_start_str:
-            session_start = parse_datetime(session_start_str)
-            if not session_start:
-                session_start = timezone.now()
-                session_start_str = session_start.isoformat()
-        else:
-            session_start = timezone.now()
-            session_start_str = session_start.isoformat()
-
-        seed_str = request.query_params.get("seed")
-        if seed_str:
-            try:
-                seed = float(seed_str)
-            except ValueError:
-                seed = _random.random()
-                seed_str = str(seed)
-        else:
-            seed = _random.random()
-            seed_str = str(seed)
-
-        # Freeze 'seen' tracking to before the session started
-        seen_post_ids = set(
-            PostView.objects.filter(
-                user=user,
-                viewed_at__lt=session_start
-            ).values_list("post_id", flat=True)
-        )
-
-        from messaging.models import BlockUser
-        blocked_users  = BlockUser.objects.filter(blocker=user).values_list("blocked_user_id", flat=True)
-        blocking_users = BlockUser.objects.filter(blocked_user=user).values_list("blocker_id", flat=True)
-        not_interested = PostNotInterested.objects.filter(user=user).values_list("post_id", flat=True)
+        session_start, session_start_str, seed_str = parse_feed_session(request)
 
         # ------------------------------------------------------------------
-        # Base queryset — annotate engagement & relevance
+        # Base queryset — the user's precomputed feed candidates
+        # (level, block and not-interested rules live in post.feed_store)
         # ------------------------------------------------------------------
         base_qs = (
             PostModel.objects
-            .filter(classroom__isnull=True)
-            .filter(
-                Q(post_level_id__in=user_levels)
-                | Q(post_level__name__iexact="Other")
-                | Q(post_level__isnull=True)
-            )
-            .exclude(user__isnull=True)
-            .exclude(user=user)
-            .exclude(user_id__in=blocked_users)
-            .exclude(user_id__in=blocking_users)
-            .exclude(id__in=not_interested)
+            .filter(id__in=FeedEntry.objects.filter(user=user).values("post_id"))
             .select_related("user", "post_level")
-            .annotate(
-                like_count    = Count("reactions", filter=Q(reactions__reaction="like")),
-                comment_count = Count("comments"),
-            )
         )
 
-        from django.db.models import Subquery, OuterRef, F
-        # Unseen posts ALWAYS appear before already-seen ones
-        unseen_qs = base_qs.exclude(id__in=seen_post_ids).order_by('-created_at')
-        
-        seen_qs   = base_qs.filter(id__in=seen_post_ids).annotate(
-            user_view_count=Subquery(
-                PostView.objects.filter(user=user, post=OuterRef('pk')).values('view_count')[:1]
-            )
-        ).order_by('user_view_count', '-created_at')
-
-        # Add stability-preserving randomness using the session seed
-        seen_posts = list(seen_qs)
-        _random.seed(seed)
-        _random.shuffle(seen_posts)
-        # Stable sort by view count: posts with lower view counts stay at the top,
-        # but posts with the SAME view count are randomized because of the prior shuffle.
-        seen_posts.sort(key=lambda p: getattr(p, 'user_view_count', 0) or 1)
-
-        ordered_posts = list(unseen_qs) + seen_posts
+        # Unseen posts ALWAYS appear before already-seen ones; the ordering
+        # and the seeded reshuffle of seen posts both happen in SQL.
+        unseen_qs, seen_qs = split_feed(base_qs, user, session_start, seed_str)
 
         # ------------------------------------------------------------------
         # Paginate (maintaining the session parameters in the next URL)
         # ------------------------------------------------------------------
         paginator = SessionFeedPagination(session_start_str, seed_str)
-        page = paginator.paginate_queryset(ordered_posts, request)
+        page = paginator.paginate_feed(unseen_qs, seen_qs, request)
 
         # Record which posts were seen for the first time (race condition safe)
-        all_time_seen = set(
-            PostView.objects.filter(user=user).values_list("post_id", flat=True)
+        page_ids = [p.id for p in page]
+        already_seen = set(
+            PostView.objects.filter(user=user, post_id__in=page_ids).values_list("post_id", flat=True)
         )
-        
-        new_views = [p for p in page if p.id not in all_time_seen]
-        seen_views = [p for p in page if p.id in all_time_seen]
+
+        new_views = [p for p in page if p.id not in already_seen]
+        seen_views = [p for p in page if p.id in already_seen]
 
         if new_views:
             PostView.objects.bulk_create(
@@ -276,9 +196,11 @@ class PostFeedView(APIView):
             )
             
         if seen_views:
+            # Once per session: going back re-delivers pages (see post.feed)
             PostView.objects.filter(
                 user=user, 
-                post_id__in=[p.id for p in seen_views]
+                post_id__in=[p.id for p in seen_views],
+                viewed_at__lt=session_start,
             ).update(
                 view_count=F('view_count') + 1,
                 viewed_at=timezone.now()
@@ -304,7 +226,7 @@ class PostFeedView(APIView):
             ).values_list("challenge_id", flat=True)
 
             active_challenges = list(
-                DailyChallenge.objects.filter(subject_id__in=user_levels)
+                DailyChallenge.objects.filter(subject__in=user.math_levels.all())
                 .exclude(id__in=completed_challenge_ids)
                 .select_related("subject")
                 .order_by("-publishing_date")[:5]
@@ -357,11 +279,14 @@ class PostLikeDislikeView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        reaction, created = PostReaction.objects.get_or_create(
-            user=request.user,
-            post=post,
-            defaults={'reaction': reaction_type}
-        )
+        with transaction.atomic():
+            reaction, created = PostReaction.objects.get_or_create(
+                user=request.user,
+                post=post,
+                defaults={'reaction': reaction_type}
+            )
+            if created:
+                record_post_reaction(post.id, None, reaction_type)
 
         from administration.models import PointAdjustment
         point_adj = PointAdjustment.objects.first()
@@ -372,18 +297,24 @@ class PostLikeDislikeView(APIView):
             if hasattr(target_user, 'account') and hasattr(target_user.account, 'student'):
                 student = target_user.account.student
                 if hasattr(student, 'progress'):
-                    student.progress.add_points(amount)
+                    from student.utils import add_points
+                    # Earned through someone else's reaction, not the author's activity
+                    add_points(student, amount, active=False)
 
         if not created:
             if reaction.reaction == reaction_type:
-                reaction.delete()
+                with transaction.atomic():
+                    reaction.delete()
+                    record_post_reaction(post.id, reaction_type, None)
                 message = f"{reaction_type} removed"
                 if reaction_type == 'like' and post.user and post.user.id != request.user.id:
                     adjust_points(post.user, -upvote_points)
             else:
                 old_reaction = reaction.reaction
-                reaction.reaction = reaction_type
-                reaction.save()
+                with transaction.atomic():
+                    reaction.reaction = reaction_type
+                    reaction.save()
+                    record_post_reaction(post.id, old_reaction, reaction_type)
                 message = f"Changed reaction to {reaction_type}"
                 if post.user and post.user.id != request.user.id:
                     if old_reaction == 'dislike' and reaction_type == 'like':
@@ -414,10 +345,9 @@ class PostLikeDislikeView(APIView):
             post_author = post.user
             if hasattr(post_author, 'account') and hasattr(post_author.account, 'student'):
                 author_student = post_author.account.student
-                total_likes = PostReaction.objects.filter(
-                    post__user=post_author,
-                    reaction='like'
-                ).count()
+                total_likes = PostModel.objects.filter(
+                    user=post_author
+                ).aggregate(total=Sum('like_count'))['total'] or 0
                 from student.utils import award_badge_by_code
                 if total_likes >= 10:
                     award_badge_by_code(author_student, 'likes_10')
@@ -467,12 +397,14 @@ class CommentView(APIView):
             except CommentModel.DoesNotExist:
                 pass  # If parent not found, save as top-level comment
 
-        comment = serializer.save(
-            user=request.user,
-            post=post,
-            language=request.user.language or 'en',
-            parent=parent_comment,
-        )
+        with transaction.atomic():
+            comment = serializer.save(
+                user=request.user,
+                post=post,
+                language=request.user.language or 'en',
+                parent=parent_comment,
+            )
+            record_comment_count(post.id, 1)
 
         from .tasks import translate_comment_task
         translate_comment_task.delay(str(comment.id))
@@ -569,18 +501,24 @@ class CommentReactionView(APIView):
             if hasattr(target_user, 'account') and hasattr(target_user.account, 'student'):
                 student = target_user.account.student
                 if hasattr(student, 'progress'):
-                    student.progress.add_points(amount)
+                    from student.utils import add_points
+                    # Earned through someone else's reaction, not the author's activity
+                    add_points(student, amount, active=False)
 
         if existing_reaction:
             if existing_reaction.reaction == reaction_type:
-                existing_reaction.delete()
+                with transaction.atomic():
+                    existing_reaction.delete()
+                    record_comment_reaction(comment.id, reaction_type, None)
                 message = f"{reaction_type} removed"
                 if reaction_type == 'like' and comment.user and comment.user.id != request.user.id:
                     adjust_points(comment.user, -upvote_points)
             else:
                 old_reaction = existing_reaction.reaction
-                existing_reaction.reaction = reaction_type
-                existing_reaction.save()
+                with transaction.atomic():
+                    existing_reaction.reaction = reaction_type
+                    existing_reaction.save()
+                    record_comment_reaction(comment.id, old_reaction, reaction_type)
                 message = f"Changed to {reaction_type}"
                 if comment.user and comment.user.id != request.user.id:
                     if old_reaction == 'dislike' and reaction_type == 'like':
@@ -588,13 +526,16 @@ class CommentReactionView(APIView):
                     elif old_reaction == 'like' and reaction_type == 'dislike':
                         adjust_points(comment.user, -upvote_points)
         else:
-            CommentReaction.objects.create(comment=comment, user=user, reaction=reaction_type)
+            with transaction.atomic():
+                CommentReaction.objects.create(comment=comment, user=user, reaction=reaction_type)
+                record_comment_reaction(comment.id, None, reaction_type)
             message = f"{reaction_type} added"
             if reaction_type == 'like' and comment.user and comment.user.id != request.user.id:
                 adjust_points(comment.user, upvote_points)
 
-        like_count = comment.reactions.filter(reaction="like").count()
-        dislike_count = comment.reactions.filter(reaction="dislike").count()
+        comment.refresh_from_db(fields=["like_count", "dislike_count"])
+        like_count = comment.like_count
+        dislike_count = comment.dislike_count
 
         return Response(
             {
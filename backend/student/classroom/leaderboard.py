@@ -0,0 +1,134 @@
+"""
+Classroom leaderboards backed by the ClassroomScore snapshot table.
+
+SubmitAnswerView adds the points of a completed challenge to the student's
+row, so reading a leaderboard never aggregates attempts: a page is an
+index range scan on (classroom, -points, student) and a student's rank is
+a count over the same index. Ties are broken by student id so ranks are
+stable between requests.
+
+After every change the new standings are pushed to the
+`classroom_leaderboard:<classroom_id>` socket.io room (see
+messaging.socket.subscribe_classroom_leaderboard), so clients can stop
+polling.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+
+from .models import ChallengeProgress, ClassroomScore
+
+logger = logging.getLogger(__name__)
+
+PUSH_EVENT = "classroom_leaderboard_updated"
+PUSH_TOP = 10
+
+
+def room_name(classroom_id):
+    return f"classroom_leaderboard:{classroom_id}"
+
+
+def record_points(classroom_id, student_id, points):
+    """Add `points` to the student's score and push the new standings on commit."""
+    score, _ = ClassroomScore.objects.get_or_create(
+        classroom_id=classroom_id,
+        student_id=student_id,
+    )
+    if points:
+        ClassroomScore.objects.filter(pk=score.pk).update(points=F("points") + points)
+
+    transaction.on_commit(lambda: broadcast(classroom_id, student_id))
+
+
+def rebuild(classroom_id=None):
+    """Recompute snapshots from completed ChallengeProgress rows. Returns the row count."""
+    progress = ChallengeProgress.objects.filter(attend__is_complete=True)
+    scores = ClassroomScore.objects.all()
+    if classroom_id is not None:
+        progress = progress.filter(attend__classroom_id=classroom_id)
+        scores = scores.filter(classroom_id=classroom_id)
+
+    rows = (
+        progress
+        .values("attend__classroom_id", "attend__student_id")
+        .annotate(total=Sum("points_earned"))
+    )
+    with transaction.atomic():
+        scores.delete()
+        created = ClassroomScore.objects.bulk_create(
+            [
+                ClassroomScore(
+                    classroom_id=row["attend__classroom_id"],
+                    student_id=row["attend__student_id"],
+                    points=row["total"] or 0,
+                )
+                for row in rows.iterator()
+            ],
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def count(classroom_id):
+    return ClassroomScore.objects.filter(classroom_id=classroom_id).count()
+
+
+def page(classroom_id, offset, limit):
+    """Return [(ClassroomScore with student, rank)] for ranks offset+1 .. offset+limit."""
+    scores = (
+        ClassroomScore.objects
+        .filter(classroom_id=classroom_id)
+        .select_related("student")
+        .order_by("-points", "student_id")[offset:offset + limit]
+    )
+    return [(score, offset + i) for i, score in enumerate(scores, start=1)]
+
+
+def rank_of(classroom_id, student_id):
+    """Return (rank, points) of the student, or (None, 0) if they have no score yet."""
+    score = (
+        ClassroomScore.objects
+        .filter(classroom_id=classroom_id, student_id=student_id)
+        .only("points")
+        .first()
+    )
+    if score is None:
+        return None, 0
+
+    ahead = ClassroomScore.objects.filter(classroom_id=classroom_id).filter(
+        Q(points__gt=score.points)
+        | Q(points=score.points, student_id__lt=student_id)
+    ).count()
+    return ahead + 1, score.points
+
+
+def serialize(score, rank):
+    user = score.student
+    full_name = f"{user.first_name} {user.last_name}".strip()
+    return {
+        "rank": rank,
+        "user_id": str(user.id),
+        "name": full_name or user.username,
+        "username": user.username,
+        "points": score.points,
+    }
+
+
+def broadcast(classroom_id, student_id=None):
+    """Push the top of the leaderboard (and the changed student's rank) to subscribers."""
+    try:
+        from messaging.socket import emit_to_room
+
+        payload = {
+            "classroom_id": str(classroom_id),
+            "members": count(classroom_id),
+            "top_users": [serialize(score, rank) for score, rank in page(classroom_id, 0, PUSH_TOP)],
+        }
+        if student_id is not None:
+            rank, points = rank_of(classroom_id, student_id)
+            payload["changed"] = {"user_id": str(student_id), "rank": rank, "points": points}
+
+        emit_to_room(PUSH_EVENT, payload, room=room_name(classroom_id))
+    except Exception as e:
+        logger.warning(f"Failed to push classroom leaderboard {classroom_id}: {e}")
@@ -80,3 +80,35 @@ class StudentAnswer(models.Model):
     def save(self, *args, **kwargs):
         self.is_correct = self.selected_option.is_correct
         super().save(*args, **kwargs)
+
+
+class ClassroomScore(models.Model):
+    """
+    Materialised classroom leaderboard: one row per student and classroom
+    holding the points of their completed challenges. Kept up to date by
+    SubmitAnswerView (see student.classroom.leaderboard).
+    """
+    classroom = models.ForeignKey(
+        Classroom,
+        on_delete=models.CASCADE,
+        related_name="scores"
+    )
+    student = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="classroom_scores"
+    )
+    points = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("classroom", "student")
+        indexes = [
+            models.Index(
+                fields=["classroom", "-points", "student"],
+                name="classroom_score_rank_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student.username} {self.points} pts in {self.classroom}"
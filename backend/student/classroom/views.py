@@ -3,7 +3,6 @@ from rest_framework.response import Response
 from rest_framework import generics, status, permissions
 
 from django.shortcuts import get_object_or_404
-from django.db.models.functions import Coalesce
 from django.db.models import (
     Q,
     Case,
@@ -12,7 +11,6 @@ from django.db.models import (
     Count,
     FloatField,
     ExpressionWrapper,
-    Sum,
 )
 from django.db import transaction
 
@@ -40,6 +38,7 @@ from .models import (
     ChallengeQuestion,
 )
 from .pagination import ClassroomFeedPagination
+from . import leaderboard as classroom_leaderboard
 
 class ClassRoomListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -67,7 +66,13 @@ class ClassRoomFeedView(APIView):
         blocked_users = BlockUser.objects.filter(blocker=user).values_list('blocked_user_id', flat=True)
         blocking_users = BlockUser.objects.filter(blocked_user=user).values_list('blocker_id', flat=True)
 
-        posts = PostModel.objects.filter(classroom=class_id).exclude(user__isnull=True).exclude(user_id__in=blocked_users).exclude(user_id__in=blocking_users)
+        posts = (
+            PostModel.objects.filter(classroom=class_id, is_hidden=False)
+            .exclude(user__isnull=True)
+            .exclude(user_id__in=blocked_users)
+            .exclude(user_id__in=blocking_users)
+            .select_related('user', 'post_level')
+        )
 
         if not posts.exists():
             return Response([], status=status.HTTP_200_OK)
@@ -305,6 +310,10 @@ class SubmitAnswerView(APIView):
 
             progress.save()
 
+            classroom_leaderboard.record_points(
+                challenge.classroom_id, user.id, progress.points_earned
+            )
+
             accuracy = round(
                 (progress.total_correct / total_questions) * 100
             )
@@ -534,65 +543,47 @@ class JoinClassroomWithCode(APIView):
 
 
 class ClassroomLeaderboardView(APIView):
+    """
+    Classroom standings read from the ClassroomScore snapshot.
+
+    `offset`/`limit` select the page of `top_users` (default the top 10).
+    Live updates are pushed on the `classroom_leaderboard_updated` socket
+    event after subscribing with `subscribe_classroom_leaderboard`.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    default_limit = 10
+    max_limit = 100
 
     def get(self, request, classroom_id):
         user = request.user
 
-        leaderboard_qs = (
-            ChallengeProgress.objects
-            .filter(
-                attend__classroom_id=classroom_id,
-                attend__is_complete=True
-            )
-            .values(
-                "attend__student_id",
-                "attend__student__first_name",
-                "attend__student__last_name",
-                "attend__student__username",
-            )
-            .annotate(
-                total_points=Coalesce(Sum("points_earned"), 0)
+        try:
+            offset = max(int(request.query_params.get("offset", 0)), 0)
+            limit = min(max(int(request.query_params.get("limit", self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            return Response(
+                {"error": "offset and limit must be integers"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            .order_by("-total_points")
-        )
 
-        if not leaderboard_qs.exists():
+        members = classroom_leaderboard.count(classroom_id)
+        if not members:
             return Response(
                 {"detail": "No leaderboard data yet."},
                 status=status.HTTP_200_OK
             )
 
-        leaderboard = []
-        user_rank = None
-        user_points = 0
-
-        for index, row in enumerate(leaderboard_qs, start=1):
-            full_name = (
-                f"{row['attend__student__first_name']} "
-                f"{row['attend__student__last_name']}"
-            ).strip()
-
-            display_name = full_name or row["attend__student__username"]
-
-            leaderboard.append({
-                "rank": index,
-                "user_id": row["attend__student_id"],
-                "name": display_name,
-                "username": row["attend__student__username"],
-                "points": row["total_points"],
-            })
-
-            if row["attend__student_id"] == user.id:
-                user_rank = index
-                user_points = row["total_points"]
+        user_rank, user_points = classroom_leaderboard.rank_of(classroom_id, user.id)
 
         return Response(
             {
-                "members": len(leaderboard),
+                "members": members,
                 "your_rank": user_rank,
                 "your_points": user_points,
-                "top_users": leaderboard[:10]
+                "top_users": [
+                    classroom_leaderboard.serialize(score, rank)
+                    for score, rank in classroom_leaderboard.page(classroom_id, offset, limit)
+                ]
             },
             status=status.HTTP_200_OK
         )
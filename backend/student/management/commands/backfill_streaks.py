@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from student import streaks
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored login/challenge streaks from DailyActivity and completed challenge attempts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=streaks.KINDS, help='Only rebuild this kind of streak')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else streaks.KINDS
+        for kind in kinds:
+            total = streaks.backfill(kind, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'{kind} streaks rebuilt for {total} students'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from student import streaks
+
+
+class Command(BaseCommand):
+    help = 'Compare the stored login/challenge streaks with the activity history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=streaks.KINDS, help='Only check this kind of streak')
+        parser.add_argument('--fix', action='store_true', help='Rebuild the rows that disagree')
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else streaks.KINDS
+        for kind in kinds:
+            mismatches = list(streaks.inconsistencies(kind))
+            for student_id, stored, expected in mismatches:
+                self.stdout.write(f'{kind} {student_id}: stored {stored}, history {expected}')
+                if options['fix']:
+                    streaks.rebuild(student_id, kind)
+
+            if not mismatches:
+                self.stdout.write(self.style.SUCCESS(f'{kind} streaks are consistent'))
+            elif options['fix']:
+                self.stdout.write(self.style.SUCCESS(f'{kind}: {len(mismatches)} streaks rebuilt'))
+            else:
+                self.stdout.write(self.style.WARNING(f'{kind}: {len(mismatches)} streaks disagree with history'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from student.classroom import leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Rebuild classroom leaderboard snapshots from completed challenge progress'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classroom', help='Only rebuild this classroom (id)')
+
+    def handle(self, *args, **options):
+        total = leaderboard.rebuild(options['classroom'])
+        self.stdout.write(self.style.SUCCESS(f'Classroom leaderboards rebuilt with {total} rows'))
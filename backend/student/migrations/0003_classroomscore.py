@@ -0,0 +1,54 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_scores(apps, schema_editor):
+    ChallengeProgress = apps.get_model('student', 'ChallengeProgress')
+    ClassroomScore = apps.get_model('student', 'ClassroomScore')
+
+    rows = (
+        ChallengeProgress.objects
+        .filter(attend__is_complete=True)
+        .values('attend__classroom_id', 'attend__student_id')
+        .annotate(points=Sum('points_earned'))
+    )
+    ClassroomScore.objects.bulk_create(
+        [
+            ClassroomScore(
+                classroom_id=row['attend__classroom_id'],
+                student_id=row['attend__student_id'],
+                points=row['points'] or 0,
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0009_classroomchallenge_created_at_challengequestion_and_more'),
+        ('student', '0002_challengeattend_classroom'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassroomScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='classroom.classroom')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='classroom_scores', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('classroom', 'student')},
+                'indexes': [models.Index(fields=['classroom', '-points', 'student'], name='classroom_score_rank_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+    ]
@@ -92,7 +92,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from datetime import timedelta
-from student.utils import calculate_streaks
+from student import streaks
 
 User = get_user_model()
 
@@ -178,11 +178,7 @@ class ProfileTopSerializer(serializers.ModelSerializer):
         if not student:
             return 0
 
-        dates = list(student.daily_activities.values_list("date", flat=True))
-        if not dates:
-            return 0
-
-        current_streak, _ = calculate_streaks(dates)
+        current_streak, _ = streaks.get(student.id, streaks.LOGIN)
         return current_streak
 
     def get_accuracy(self, obj):
@@ -208,9 +204,6 @@ class ProfileTopSerializer(serializers.ModelSerializer):
         return obj.posts.filter(classroom__isnull=True).count()
 
     def get_likes_received(self, obj):
-        from post.models import PostReaction
-        return PostReaction.objects.filter(
-            post__user=obj,
-            reaction='like'
-        ).count()
+        from django.db.models import Sum
+        return obj.posts.aggregate(total=Sum('like_count'))['total'] or 0
 
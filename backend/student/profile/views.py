@@ -29,7 +29,7 @@ class ProfileFeedView(APIView):
         posts = PostModel.objects.filter(
             user=request.user, 
             classroom__isnull=True
-        ).order_by('-created_at')
+        ).select_related('user', 'post_level').order_by('-created_at')
 
         paginator = ProfileFeedPagination()
         paginated_posts = paginator.paginate_queryset(posts, request)
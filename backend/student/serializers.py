@@ -4,6 +4,7 @@ from django.contrib.auth.hashers import check_password
 
 from post.models import PostModel
 from administration.models import MathLevels, SupportMessage
+from administration.translations import prefetch as prefetch_translations
 from core.utils import get_translated_level_name
 from account.models import (
     EarnedBadge,
@@ -43,8 +44,9 @@ class ProfileInformationSerializer(serializers.ModelSerializer):
 
     def get_math_levels_info(self, obj):
         user_lang = self.context.get('request').user.language if self.context.get('request') and hasattr(self.context.get('request').user, 'language') else 'en'
+        levels = prefetch_translations(list(obj.math_levels.all()), user_lang)
         return [{'id': level.id, 'name': level.get_translated_name(user_lang), 'level_type': level.level_type} 
-                for level in obj.math_levels.all() if level.name.lower() != 'other']
+                for level in levels if level.name.lower() != 'other']
 
     def get_level(self, obj):
         try:
@@ -156,10 +158,10 @@ class LatestPostSerializer(serializers.ModelSerializer):
         )
 
     def get_likes(self, obj):
-        return obj.reactions.filter(reaction='like').count()
+        return obj.like_count
 
     def get_comment_count(self, obj):
-        return obj.comments.count()
+        return obj.comment_count
 
     def get_user_reaction(self, obj):
         request = self.context.get('request')
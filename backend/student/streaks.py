@@ -0,0 +1,196 @@
+"""
+Login and challenge streaks, maintained incrementally.
+
+account.StudentStreak keeps per student and kind the run of consecutive
+active days ending at `last_active_date` and the longest run so far. A
+new active day extends the run when it follows `last_active_date`,
+restarts it at 1 after a gap and changes nothing when it is already part
+of the run, so recording activity is one locked row update instead of
+feeding the full history to calculate_streaks.
+
+  - login      every day with a DailyActivity row (the first request of the
+               day via student.tasks.record_daily_activity, and points
+               earned via student.utils.add_points)
+  - challenge  the local creation date of every completed ChallengeAttempt
+               (challenge.signals)
+
+A day before the current run (an attempt started days ago and completed
+now) may join or bridge earlier runs; that rare case recomputes the row
+from history, as does the first activity of a student without a row.
+`manage.py backfill_streaks` rebuilds every row and `manage.py
+check_streaks` compares them with the history.
+"""
+from datetime import timedelta
+from itertools import groupby
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from account.models import DailyActivity, StudentStreak
+
+LOGIN = StudentStreak.LOGIN
+CHALLENGE = StudentStreak.CHALLENGE
+KINDS = (LOGIN, CHALLENGE)
+
+STREAK_BADGES = (
+    (7, "streak_7"),
+    (10, "streak_10"),
+    (30, "streak_30"),
+    (100, "streak_100"),
+)
+
+
+# -----------------------------
+# History
+# -----------------------------
+def _history(kind, student_id=None):
+    """(student_id, active date) pairs ordered by student, then date."""
+    if kind == LOGIN:
+        rows = DailyActivity.objects.order_by("student_id", "date").values_list("student_id", "date")
+        if student_id is not None:
+            rows = rows.filter(student_id=student_id)
+        return rows.iterator()
+
+    from challenge.models import ChallengeAttempt
+
+    rows = (
+        ChallengeAttempt.objects.filter(completed=True)
+        .order_by("student_id", "created_at")
+        .values_list("student_id", "created_at")
+    )
+    if student_id is not None:
+        rows = rows.filter(student_id=student_id)
+    return ((sid, timezone.localtime(created_at).date()) for sid, created_at in rows.iterator())
+
+
+def from_history(dates):
+    """(current, longest, last_active_date) of sorted active dates; `current` ends at the last date."""
+    current = longest = 0
+    last = None
+    for day in dates:
+        if day == last:
+            continue
+        current = current + 1 if last is not None and day == last + timedelta(days=1) else 1
+        longest = max(longest, current)
+        last = day
+    return current, longest, last
+
+
+def expected_states(kind):
+    """Yields (student_id, (current, longest, last_active_date)) for every student with history."""
+    for student_id, rows in groupby(_history(kind), key=lambda row: row[0]):
+        yield student_id, from_history(day for _, day in rows)
+
+
+def rebuild(student_id, kind):
+    """Recompute the row of a student from history, under its row lock."""
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                streak, _ = StudentStreak.objects.select_for_update().get_or_create(student_id=student_id, kind=kind)
+                # History is read once the row is locked, so it includes the
+                # day of a concurrent record() that got the lock first
+                streak.current, streak.longest, streak.last_active_date = from_history(
+                    day for _, day in _history(kind, student_id)
+                )
+                streak.save(update_fields=["current", "longest", "last_active_date", "updated_at"])
+            return streak
+        except IntegrityError:
+            # A request and the login task both found no row and raced on
+            # the unique (student, kind) insert; the row exists now
+            if attempt:
+                raise
+
+
+def _upsert(kind, states):
+    StudentStreak.objects.bulk_create(
+        [
+            StudentStreak(student_id=student_id, kind=kind, current=c, longest=longest, last_active_date=last)
+            for student_id, (c, longest, last) in states
+        ],
+        update_conflicts=True,
+        unique_fields=["student", "kind"],
+        update_fields=["current", "longest", "last_active_date", "updated_at"],
+    )
+
+
+def backfill(kind, batch_size=1000):
+    """Rewrite every `kind` row from history; returns the number of students."""
+    seen = set()
+    batch = []
+    with transaction.atomic():
+        for student_id, state in expected_states(kind):
+            seen.add(student_id)
+            batch.append((student_id, state))
+            if len(batch) >= batch_size:
+                _upsert(kind, batch)
+                batch = []
+        if batch:
+            _upsert(kind, batch)
+        # Rows whose history is gone
+        StudentStreak.objects.filter(kind=kind).exclude(student_id__in=seen).delete()
+    return len(seen)
+
+
+def inconsistencies(kind):
+    """Yields (student_id, stored, expected) for every row that disagrees with history."""
+    stored = {
+        student_id: (c, longest, last)
+        for student_id, c, longest, last in StudentStreak.objects.filter(kind=kind)
+        .values_list("student_id", "current", "longest", "last_active_date")
+    }
+    for student_id, expected in expected_states(kind):
+        actual = stored.pop(student_id, None)
+        if actual != expected:
+            yield student_id, actual, expected
+    for student_id, actual in stored.items():
+        if actual[2] is not None:
+            yield student_id, actual, None
+
+
+# -----------------------------
+# Incremental updates
+# -----------------------------
+def record(student_id, kind, day):
+    """Count `day` as active for `kind`; returns the updated StudentStreak."""
+    with transaction.atomic():
+        streak = StudentStreak.objects.select_for_update().filter(student_id=student_id, kind=kind).first()
+        if streak is None:
+            # First activity since streaks were tracked; the history includes `day`
+            return rebuild(student_id, kind)
+
+        last = streak.last_active_date
+        if last is not None and day <= last:
+            if day > last - timedelta(days=streak.current):
+                return streak
+            return rebuild(student_id, kind)
+
+        streak.current = streak.current + 1 if last is not None and day == last + timedelta(days=1) else 1
+        streak.longest = max(streak.longest, streak.current)
+        streak.last_active_date = day
+        streak.save(update_fields=["current", "longest", "last_active_date", "updated_at"])
+    return streak
+
+
+def ongoing(streak, today=None):
+    """The ongoing streak: the stored run while it ends today or yesterday, else 0."""
+    if streak is None or streak.last_active_date is None:
+        return 0
+    today = today or timezone.localdate()
+    return streak.current if streak.last_active_date >= today - timedelta(days=1) else 0
+
+
+def get(student_id, kind):
+    """(current, longest) of a student, without reading history."""
+    streak = StudentStreak.objects.filter(student_id=student_id, kind=kind).first()
+    if streak is None:
+        return 0, 0
+    return ongoing(streak), streak.longest
+
+
+def award_streak_badges(student, current_streak):
+    from student.utils import award_badge_by_code
+
+    for length, code in STREAK_BADGES:
+        if current_streak >= length:
+            award_badge_by_code(student, code)
@@ -0,0 +1,55 @@
+from celery import shared_task
+from datetime import date
+from django.db import transaction
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def record_daily_activity(user_id, day):
+    """
+    First request of `day` (ISO date, in the user's timezone) by `user_id`,
+    queued by core.middleware.DailyActivityMiddleware: awards the daily
+    login point and evaluates the login streak badges.
+    """
+    from account import leaderboard
+    from account.models import DailyActivity, StudentProfile, StudentProgress
+
+    from . import streaks
+
+    day = date.fromisoformat(day)
+    student = StudentProfile.objects.filter(account__user_id=user_id).first()
+    if student is None:
+        # Teachers and admins have no activity
+        return {"status": "not_student"}
+
+    with transaction.atomic():
+        # This awards 1 point for login (the first action of the day). The
+        # row may already exist from points earned earlier in the day, e.g.
+        # a challenge submitted in the request that queued this task
+        activity, created = DailyActivity.objects.select_for_update().get_or_create(
+            student=student,
+            date=day,
+            defaults={"points_earned": 1, "login_awarded": True}
+        )
+        awarded = created
+        if not activity.login_awarded:
+            activity.points_earned += 1
+            activity.login_awarded = True
+            activity.save(update_fields=["points_earned", "login_awarded"])
+            awarded = True
+
+        if awarded:
+            progress, _ = StudentProgress.objects.get_or_create(student=student)
+            progress.add_points(1)
+
+            student_id = student.id
+            transaction.on_commit(lambda: leaderboard.record_activity(student_id, 1))
+
+    # The day may already have a row from points earned earlier today; it
+    # still counts for the streak
+    streak = streaks.record(student.id, streaks.LOGIN, day)
+    current_streak = streaks.ongoing(streak, day)
+    streaks.award_streak_badges(student, current_streak)
+    return {"status": "recorded" if awarded else "seen", "streak": current_streak}
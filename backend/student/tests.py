@@ -1,3 +1,172 @@
-from django.test import TestCase
+"""
+Tests for the daily activity middleware and the incremental streaks it feeds.
+"""
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import Badge, DailyActivity, EarnedBadge, StudentProfile, StudentProgress, StudentStreak, UserAccount
+from core.middleware import DailyActivityMiddleware
+
+from . import streaks
+from .tasks import record_daily_activity
+
+User = get_user_model()
+
+
+def _make_student(username):
+    user = User.objects.create_user(username=username, password="test1234", email=f"{username}@test.com")
+    student = StudentProfile.objects.create(account=UserAccount.objects.get(user=user))
+    return user, student
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class DailyActivityMiddlewareTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user, _ = _make_student("student")
+        self.middleware = DailyActivityMiddleware(lambda request: HttpResponse())
+
+    def test_first_request_of_the_day_is_queued_without_queries(self):
+        token = str(AccessToken.for_user(self.user))
+        request = lambda: RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        with mock.patch("core.middleware.record_daily_activity") as task, self.assertNumQueries(0):
+            self.middleware(request())
+            self.middleware(request())
+            self.middleware(RequestFactory().get("/", HTTP_AUTHORIZATION="Bearer not-a-token"))
+        task.delay.assert_called_once()
+        self.assertEqual(task.delay.call_args.args[0], str(self.user.pk))
+
+
+class LoginStreakTests(TestCase):
+    def setUp(self):
+        self.user, self.student = _make_student("student")
+        Badge.objects.create(code="streak_7", name="7 days", description="", icon="fire", category="Streak")
+        self.today = date(2026, 3, 10)
+
+    def test_task_awards_point_and_seeds_streak_from_history(self):
+        for offset in range(1, 7):
+            DailyActivity.objects.create(student=self.student, date=self.today - timedelta(days=offset))
+
+        result = record_daily_activity(str(self.user.pk), self.today.isoformat())
+        self.assertEqual(record_daily_activity(str(self.user.pk), self.today.isoformat())["status"], "seen")
+
+        self.assertEqual(result, {"status": "recorded", "streak": 7})
+        self.assertEqual(StudentProgress.objects.get(student=self.student).total_points, 1)
+        self.assertTrue(EarnedBadge.objects.filter(student=self.student, badge__code="streak_7").exists())
+
+    def test_points_before_the_first_request_keep_the_login_point(self):
+        from django.utils import timezone
+
+        from .utils import add_points
+
+        StudentProgress.objects.create(student=self.student)
+        today = timezone.localdate()
+
+        # A like on the student's post, then a challenge answer submitted in
+        # the request that queued the login task, both before the task runs
+        with mock.patch("account.leaderboard.record_activity"):
+            add_points(self.student, 5, active=False)
+            add_points(self.student, 3)
+
+            result = record_daily_activity(str(self.user.pk), today.isoformat())
+            self.assertEqual(result["status"], "recorded")
+            self.assertEqual(record_daily_activity(str(self.user.pk), today.isoformat())["status"], "seen")
+
+        activity = DailyActivity.objects.get(student=self.student, date=today)
+        self.assertEqual((activity.points_earned, activity.login_awarded), (4, True))
+        self.assertEqual(StudentProgress.objects.get(student=self.student).total_points, 9)
+
+    def test_record_is_incremental(self):
+        login = streaks.LOGIN
+        DailyActivity.objects.create(student=self.student, date=self.today)
+        self.assertEqual(streaks.record(self.student.id, login, self.today).current, 1)
+
+        # Extending, repeating and restarting only touch the streak row
+        with self.assertNumQueries(4):
+            streak = streaks.record(self.student.id, login, self.today + timedelta(days=1))
+        self.assertEqual((streak.current, streak.longest), (2, 2))
+        self.assertEqual(streaks.record(self.student.id, login, self.today + timedelta(days=1)).current, 2)
+        streak = streaks.record(self.student.id, login, self.today + timedelta(days=5))
+        self.assertEqual((streak.current, streak.longest), (1, 2))
+
+        self.assertEqual(streaks.ongoing(streak, self.today + timedelta(days=6)), 1)
+        self.assertEqual(streaks.ongoing(streak, self.today + timedelta(days=7)), 0)
+
+    def test_rebuild_retries_after_a_concurrent_insert(self):
+        from django.db import IntegrityError
+        from django.db.models import QuerySet
+
+        DailyActivity.objects.create(student=self.student, date=self.today)
+        get_or_create = QuerySet.get_or_create
+        raced = []
+
+        def racing(queryset, **kwargs):
+            if not raced:
+                raced.append(True)
+                raise IntegrityError("duplicate key value violates unique constraint")
+            return get_or_create(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "get_or_create", racing):
+            streak = streaks.record(self.student.id, streaks.LOGIN, self.today)
+        self.assertEqual((streak.current, streak.last_active_date), (1, self.today))
+        self.assertEqual(StudentStreak.objects.filter(student=self.student).count(), 1)
+
+    def test_backfill_and_consistency_check(self):
+        for offset in (0, 1, 2, 5):
+            DailyActivity.objects.create(student=self.student, date=self.today - timedelta(days=offset))
+
+        self.assertEqual(streaks.backfill(streaks.LOGIN), 1)
+        streak = StudentStreak.objects.get(student=self.student, kind=streaks.LOGIN)
+        self.assertEqual((streak.current, streak.longest, streak.last_active_date), (3, 3, self.today))
+        self.assertEqual(list(streaks.inconsistencies(streaks.LOGIN)), [])
+
+        StudentStreak.objects.filter(pk=streak.pk).update(current=1)
+        self.assertEqual(
+            list(streaks.inconsistencies(streaks.LOGIN)),
+            [(self.student.id, (1, 3, self.today), (3, 3, self.today))],
+        )
+
+
+class AddPointsTests(TestCase):
+    def setUp(self):
+        _, self.student = _make_student("student")
+        StudentProgress.objects.create(student=self.student)
+
+    def test_taking_back_points_is_floored_like_the_daily_row(self):
+        from .utils import add_points
+
+        with mock.patch("account.leaderboard.record_activity") as record, \
+                self.captureOnCommitCallbacks(execute=True):
+            add_points(self.student, 2)
+            add_points(self.student, -5)
+
+        self.assertEqual(DailyActivity.objects.get(student=self.student).points_earned, 0)
+        # The buckets lose the 2 points today's row had, not 5
+        self.assertEqual([c.args[1] for c in record.call_args_list], [2, -2])
+
+    def test_points_from_others_are_not_activity(self):
+        from .utils import add_points
+
+        with mock.patch("account.leaderboard.record_activity") as record, \
+                self.captureOnCommitCallbacks(execute=True):
+            add_points(self.student, 5, active=False)
+
+        # A like on the student's post is neither a login day nor a bucket entry
+        self.assertFalse(DailyActivity.objects.filter(student=self.student).exists())
+        self.assertFalse(StudentStreak.objects.filter(student=self.student).exists())
+        record.assert_not_called()
+        self.assertEqual(StudentProgress.objects.get(student=self.student).total_points, 5)
+
+        with mock.patch("account.leaderboard.record_activity") as record, \
+                self.captureOnCommitCallbacks(execute=True):
+            add_points(self.student, 2)
+            add_points(self.student, 5, active=False)
+        self.assertEqual(DailyActivity.objects.get(student=self.student).points_earned, 7)
+        self.assertEqual([c.args[1] for c in record.call_args_list], [2, 5])
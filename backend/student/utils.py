@@ -2,6 +2,8 @@ from django.db import IntegrityError, transaction
 from django.utils import timezone
 from datetime import timedelta
 
+from account import leaderboard
+
 from account.models import (
     StudentProfile,
     DailyActivity,
@@ -9,17 +11,47 @@ from account.models import (
     EarnedBadge,
 )
 
-def add_points(student: StudentProfile, points: int):
+def add_points(student: StudentProfile, points: int, active=True):
+    """
+    Award (or, with a negative value, take back) points for today.
+
+    Updates the all-time total, today's DailyActivity row and the
+    daily/weekly/monthly leaderboard buckets. Like the DailyActivity row,
+    the buckets only lose what today's row actually had.
+
+    `active` is False for points earned through someone else's action (a
+    reaction to the student's post or comment). Those are not activity:
+    they never create today's row or count for the login streak, and only
+    go to the buckets when the student already has a row today.
+    """
     today = timezone.localdate()
 
-    activity, _ = DailyActivity.objects.get_or_create(
-        student=student,
-        date=today
-    )
-    activity.points_earned += points
-    activity.save(update_fields=["points_earned"])
+    applied = 0
+    with transaction.atomic():
+        if active:
+            activity, created = DailyActivity.objects.select_for_update().get_or_create(
+                student=student,
+                date=today
+            )
+            if created:
+                # Every DailyActivity day counts for the login streak
+                from student import streaks
+                streaks.record(student.id, streaks.LOGIN, today)
+        else:
+            activity = DailyActivity.objects.select_for_update().filter(student=student, date=today).first()
+
+        if activity is not None:
+            earned = max(activity.points_earned + points, 0)
+            applied = earned - activity.points_earned
+            if applied:
+                activity.points_earned = earned
+                activity.save(update_fields=["points_earned"])
+
+        student.progress.add_points(points)
 
-    student.progress.add_points(points)
+    if applied:
+        student_id = student.id
+        transaction.on_commit(lambda: leaderboard.record_activity(student_id, applied))
 
 
 
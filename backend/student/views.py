@@ -5,8 +5,7 @@ from rest_framework import views, status, permissions, generics
 
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
-from django.db.models.functions import TruncDate
-from django.db.models import Sum, Q
+from django.db.models import Q
 from django.utils import timezone
 
 from datetime import timedelta
@@ -17,7 +16,6 @@ from administration.models import (
 )
 
 from account.models import UserAccount, StudentProfile, StudentProgress
-from challenge.models import ChallengeAttempt
 
 from .serializers import (
     ProfileInformationSerializer,
@@ -33,8 +31,8 @@ from .pagination import (
 )
 from .utils import (
     add_points,
-    calculate_streaks,
 )
+from . import streaks
 
 from student.classroom.models import ChallengeAttend
 
@@ -315,27 +313,19 @@ class StudentDashboardView(APIView):
         today = timezone.localdate()
 
         # -----------------------------
-        # Activity from ChallengeAttempt
+        # Activity (all points earned per day, incl. challenges)
         # -----------------------------
-        challenge_activity = (
-            ChallengeAttempt.objects
-            .filter(student=student)
-            .annotate(day=TruncDate("created_at"))
-            .values("day")
-            .annotate(points=Sum("score"))
-        )
+        from account.models import DailyActivity
+        daily_activity = DailyActivity.objects.filter(
+            student=student,
+            date__gt=today - timedelta(days=30),
+        ).values("date", "points_earned")
 
         activity_map = {
-            a["day"]: a["points"] or 0
-            for a in challenge_activity
+            a["date"]: a["points_earned"] or 0
+            for a in daily_activity
         }
 
-        from account.models import DailyActivity
-        login_activity = DailyActivity.objects.filter(student=student).values("date", "points_earned")
-        for la in login_activity:
-            day = la["date"]
-            activity_map[day] = activity_map.get(day, 0) + (la["points_earned"] or 0)
-
 
         # -----------------------------
         # Calendar (last 30 days)
@@ -354,10 +344,7 @@ class StudentDashboardView(APIView):
         # -----------------------------
         # Streaks (App Usage)
         # -----------------------------
-        from account.models import DailyActivity
-        login_dates = list(DailyActivity.objects.filter(student=student).values_list("date", flat=True))
-        
-        current_streak, longest_streak = calculate_streaks(login_dates)
+        current_streak, longest_streak = streaks.get(student.id, streaks.LOGIN)
 
         # -----------------------------
         # Level progression
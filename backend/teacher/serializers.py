@@ -5,6 +5,7 @@ from django.db import models
 from django.db import transaction
 
 from administration.models import MathLevels
+from administration.translations import prefetch as prefetch_translations
 from classroom.models import (
     ClassroomMemberList, 
     ClassRoomChallenge,
@@ -44,8 +45,9 @@ class ProfileSerializer(serializers.ModelSerializer):
 
     def get_math_levels_info(self, obj):
         user_lang = self.context.get('request').user.language if self.context.get('request') and hasattr(self.context.get('request').user, 'language') else 'en'
+        levels = prefetch_translations(list(obj.math_levels.all()), user_lang)
         return [{'id': level.id, 'name': level.get_translated_name(user_lang), 'level_type': level.level_type} 
-                for level in obj.math_levels.all() if level.name.lower() != 'other']
+                for level in levels if level.name.lower() != 'other']
 
     def update(self, instance, validated_data):
         math_levels = validated_data.pop('math_levels', None)
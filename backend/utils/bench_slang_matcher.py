@@ -0,0 +1,61 @@
+"""
+Micro-benchmark of the slang keyword stage: the compiled matcher against the
+per-pattern loop detect_slang used before.
+
+    python -m utils.bench_slang_matcher [iterations]
+
+`legacy_is_offensive` is the old loop, kept as the reference for the parity
+test in post.tests.
+"""
+import re
+import sys
+import time
+
+from utils.slang_matcher import MATCHER, MATH_WHITELIST, OFFENSIVE_KEYWORDS
+
+SAMPLES = {
+    "short comment": "Nice explanation, thanks!",
+    "math post": (
+        "Let f(x) = x^2 + 3x. Assume the derivative exists and solve f'(x) = 0; "
+        "the tangent at x = 1 has slope 5."
+    ),
+    "long post": (
+        "I have been stuck on this problem for a while. The teacher said the "
+        "function is continuous on the closed interval, but I do not see why "
+        "the maximum has to exist. Could someone explain the idea behind it? "
+    ) * 4,
+    "offensive": "this homework is bullshit and the teacher is an idiot",
+    "cjk": "这道题太难了，我不会做。",
+}
+
+
+def legacy_is_offensive(text_lower):
+    for pattern in OFFENSIVE_KEYWORDS:
+        if not pattern.startswith(r'\b'):
+            if pattern in text_lower:
+                return True
+        else:
+            match = re.search(pattern, text_lower, re.IGNORECASE)
+            if match and match.group(0).strip(r'\b') not in MATH_WHITELIST:
+                return True
+    return False
+
+
+def _time(func, text, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(text)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main(iterations=2000):
+    print(f"{'sample':<15}{'legacy (us)':>14}{'compiled (us)':>16}{'speedup':>10}")
+    for name, text in SAMPLES.items():
+        text_lower = text.lower()
+        legacy = _time(legacy_is_offensive, text_lower, iterations)
+        compiled = _time(MATCHER.is_offensive, text_lower, iterations)
+        print(f"{name:<15}{legacy:>14.1f}{compiled:>16.1f}{legacy / compiled:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
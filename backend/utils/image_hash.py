@@ -0,0 +1,179 @@
+"""
+Perceptual-hash index of images NudeDetector has already judged.
+
+Each moderated image is reduced to a 64-bit pHash (DCT of a 32x32
+greyscale thumbnail) and a 64-bit dHash (horizontal gradient of a 9x8
+thumbnail). An image whose hashes are both within a few bits of a known one
+is treated as the same picture, so reposts, re-encodes and resized copies
+reuse the earlier verdict instead of running inference again, and known-bad
+images can be turned away at upload (`known_unsafe`).
+
+The index lives in memory as two numpy uint64 arrays (16 bytes per image)
+and is backed by post.ModeratedImageHash; every process loads the table
+once and picks up rows added by other workers every REFRESH_INTERVAL
+seconds.
+
+    phash, dhash = hashes(image)            # image: BGR ndarray
+    INDEX.lookup(phash, dhash)              # "safe", "unsafe" or None
+    remember([(phash, dhash, "unsafe")])
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Maximum differing bits for two images to count as the same picture
+PHASH_MAX_DISTANCE = 6
+DHASH_MAX_DISTANCE = 8
+
+REFRESH_INTERVAL = 60
+
+SAFE = "safe"
+UNSAFE = "unsafe"
+
+
+def _to_int(bits):
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), "big")
+
+
+def _grey(image):
+    import cv2
+
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def dhash(image):
+    import cv2
+
+    small = cv2.resize(_grey(image), (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    return _to_int(small[:, 1:] > small[:, :-1])
+
+
+def phash(image):
+    import cv2
+
+    small = cv2.resize(_grey(image), (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8]
+    # The DC term only reflects overall brightness
+    median = np.median(low.flatten()[1:])
+    return _to_int(low > median)
+
+
+def hashes(image):
+    """(phash, dhash) of a decoded BGR or greyscale image, as unsigned ints."""
+    return phash(image), dhash(image)
+
+
+def to_signed(value):
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def _popcount(values):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    # SWAR popcount for numpy < 2.0
+    values = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) + ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    values = (values + (values >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (values * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+class ImageHashIndex:
+    def __init__(self):
+        self.phashes = np.empty(0, dtype=np.uint64)
+        self.dhashes = np.empty(0, dtype=np.uint64)
+        self.unsafe = np.empty(0, dtype=bool)
+        self.last_id = 0
+        self.refreshed_at = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.phashes)
+
+    def _append(self, rows):
+        """rows: [(phash, dhash, verdict)] with unsigned hashes."""
+        if not rows:
+            return
+        self.phashes = np.concatenate([self.phashes, np.array([r[0] for r in rows], dtype=np.uint64)])
+        self.dhashes = np.concatenate([self.dhashes, np.array([r[1] for r in rows], dtype=np.uint64)])
+        self.unsafe = np.concatenate([self.unsafe, np.array([r[2] == UNSAFE for r in rows], dtype=bool)])
+
+    def refresh(self, force=False):
+        """Load rows added to the table since the last refresh."""
+        from post.models import ModeratedImageHash
+
+        now = time.monotonic()
+        if not force and self.refreshed_at is not None and now - self.refreshed_at < REFRESH_INTERVAL:
+            return
+        with self._lock:
+            self.refreshed_at = now
+            try:
+                rows = list(
+                    ModeratedImageHash.objects.filter(id__gt=self.last_id)
+                    .order_by("id")
+                    .values_list("id", "phash", "dhash", "verdict")
+                )
+            except Exception as e:
+                logger.warning(f"Could not load moderated image hashes: {e}")
+                return
+            if rows:
+                self.last_id = rows[-1][0]
+                self._append([(to_unsigned(p), to_unsigned(d), v) for _, p, d, v in rows])
+
+    def lookup(self, phash, dhash):
+        """Verdict of the closest known copy of the image, or None. Unsafe wins ties."""
+        self.refresh()
+        with self._lock:
+            phashes, dhashes, unsafe = self.phashes, self.dhashes, self.unsafe
+        if not len(phashes):
+            return None
+        close = (
+            (_popcount(phashes ^ np.uint64(phash)) <= PHASH_MAX_DISTANCE)
+            & (_popcount(dhashes ^ np.uint64(dhash)) <= DHASH_MAX_DISTANCE)
+        )
+        if not close.any():
+            return None
+        return UNSAFE if unsafe[close].any() else SAFE
+
+    def clear(self):
+        with self._lock:
+            self.phashes = np.empty(0, dtype=np.uint64)
+            self.dhashes = np.empty(0, dtype=np.uint64)
+            self.unsafe = np.empty(0, dtype=bool)
+            self.last_id = 0
+            self.refreshed_at = None
+
+
+INDEX = ImageHashIndex()
+
+
+def remember(rows):
+    """Persist fresh verdicts ([(phash, dhash, verdict)]) and load them into this process's index."""
+    from post.models import ModeratedImageHash
+
+    if not rows:
+        return
+    ModeratedImageHash.objects.bulk_create(
+        [ModeratedImageHash(phash=to_signed(p), dhash=to_signed(d), verdict=v) for p, d, v in rows],
+        ignore_conflicts=True,
+    )
+    INDEX.refresh(force=True)
+
+
+def known_unsafe(data):
+    """True if the encoded image `data` is a near-duplicate of an image already judged unsafe."""
+    from utils.nudity_detector import decode
+
+    image = decode(data)
+    if image is None:
+        return False
+    return INDEX.lookup(*hashes(image)) == UNSAFE
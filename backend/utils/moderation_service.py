@@ -0,0 +1,140 @@
+"""
+Detoxify inference off the request path.
+
+One moderation worker process (`python manage.py run_moderation_worker`)
+loads the multilingual model once. Web and Celery processes send texts to
+it through a Redis list instead of loading their own copy. The worker
+collects whatever arrives within BATCH_WINDOW seconds (up to
+MAX_BATCH_TEXTS texts) and scores it with a single vectorised predict()
+call.
+
+    scores = score_texts(["some text"], timeout=1.5)   # [{label: score}]
+
+The worker also writes every score to `model_cache`, so a caller that
+timed out finds it there when it asks again.
+
+Callers get ModerationUnavailable when the worker does not answer in time;
+detect_slang then reports the text as pending and the post is re-checked
+asynchronously (post.tasks.moderate_post_text_task).
+"""
+import json
+import logging
+import time
+import uuid
+
+from utils.verdict_cache import VerdictCache
+
+logger = logging.getLogger(__name__)
+
+REQUEST_QUEUE = "moderation:detoxify:requests"
+REPLY_KEY = "moderation:detoxify:reply:{}"
+REPLY_TTL = 60
+
+BATCH_WINDOW = 0.02
+MAX_BATCH_TEXTS = 32
+
+# Detoxify scores, shared by all workers through Redis. Scores rather than
+# verdicts are stored so thresholds can change without invalidating them.
+model_cache = VerdictCache("slang-detoxify:v1", max_size=5000, ttl=3600, redis_ttl=7 * 86400)
+
+
+class ModerationUnavailable(Exception):
+    """The moderation worker did not answer within the timeout."""
+
+
+def score_texts(texts, timeout):
+    """Detoxify scores for each of `texts`, in order."""
+    scores = [model_cache.get(text) for text in texts]
+    missing = [text for text, score in zip(texts, scores) if score is None]
+    if not missing:
+        return scores
+
+    from core.redis_client import get_blocking_redis, get_redis
+
+    request_id = uuid.uuid4().hex
+    request = {"id": request_id, "texts": missing, "deadline": time.time() + timeout}
+    try:
+        get_redis().rpush(REQUEST_QUEUE, json.dumps(request))
+        # Fractional BLPOP timeouts need Redis 6+; the worker also drops
+        # requests past their deadline
+        reply = get_blocking_redis().blpop(REPLY_KEY.format(request_id), timeout=timeout)
+    except Exception as e:
+        raise ModerationUnavailable(str(e)) from e
+    if reply is None:
+        raise ModerationUnavailable(f"No moderation verdict within {timeout}s")
+
+    fresh = iter(json.loads(reply[1]))
+    for i, score in enumerate(scores):
+        if score is None:
+            scores[i] = next(fresh)
+            model_cache.set(texts[i], scores[i])
+    return scores
+
+
+def _collect_batch(client, first):
+    requests = [first]
+    total = len(first["texts"])
+    window_ends = time.monotonic() + BATCH_WINDOW
+    while total < MAX_BATCH_TEXTS and time.monotonic() < window_ends:
+        raw = client.lpop(REQUEST_QUEUE)
+        if raw is None:
+            time.sleep(0.002)
+            continue
+        request = json.loads(raw)
+        requests.append(request)
+        total += len(request["texts"])
+    return requests
+
+
+def serve(model):
+    """Worker loop: answer scoring requests in micro-batches, forever."""
+    from core.redis_client import get_blocking_redis, get_redis
+
+    client = get_redis()
+    blocking_client = get_blocking_redis()
+    while True:
+        try:
+            item = blocking_client.blpop(REQUEST_QUEUE, timeout=5)
+        except Exception as e:
+            logger.warning(f"Moderation worker cannot reach Redis: {e}")
+            time.sleep(1)
+            continue
+        if item is None:
+            continue
+
+        now = time.time()
+        requests = [r for r in _collect_batch(client, json.loads(item[1])) if r["deadline"] > now]
+        texts = [text for r in requests for text in r["texts"]]
+        if not texts:
+            continue
+
+        started = time.monotonic()
+        try:
+            results = model.predict(texts)
+        except Exception as e:
+            # No reply: the callers time out and fall back to the async path
+            logger.exception(f"Detoxify batch of {len(texts)} failed: {e}")
+            continue
+        labels = list(results)
+        scores = [
+            {label: float(results[label][i]) for label in labels}
+            for i in range(len(texts))
+        ]
+        logger.info(f"Scored {len(texts)} texts from {len(requests)} requests in {time.monotonic() - started:.3f}s")
+
+        # Callers that gave up in the meantime (and their retries) find the
+        # scores in the shared cache instead of queueing the text again
+        for text, score in zip(texts, scores):
+            model_cache.set(text, score)
+
+        offset = 0
+        pipe = client.pipeline()
+        for r in requests:
+            key = REPLY_KEY.format(r["id"])
+            pipe.rpush(key, json.dumps(scores[offset:offset + len(r["texts"])]))
+            pipe.expire(key, REPLY_TTL)
+            offset += len(r["texts"])
+        try:
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Moderation worker could not publish verdicts: {e}")
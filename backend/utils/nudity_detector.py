@@ -0,0 +1,309 @@
+"""
+NudeDetector image moderation, batched.
+
+Image checks run on the dedicated "moderation" Celery queue
+(CELERY_TASK_ROUTES), so only those workers ever load the ONNX model, and
+they load it once per process (`get_detector`, warmed on worker start when
+NUDITY_WARM_DETECTOR is set).
+
+Posts to check are queued in a Redis list (`schedule`); each
+post.tasks.run_nudity_check_batch run drains up to BATCH_SIZE of them, so a
+burst of uploads is checked a few images at a time instead of one task per
+image. Draining moves the ids to a processing list (LMOVE); they are
+removed from it (`ack`) once the verdicts are written, put back in the
+queue (`requeue`) when the batch fails, and `recover` returns the ids of a
+worker killed mid-batch when a moderation worker starts. For a batch:
+
+  1. images are downloaded concurrently into memory (DOWNLOAD_WORKERS)
+  2. decoded with cv2.imdecode, no temp files
+  3. looked up in the perceptual-hash index (utils.image_hash); copies of
+     an image that was already judged reuse its verdict
+  4. the rest are scored with one detect_batch() call
+  5. safe posts are marked verified with one UPDATE, NSFW posts removed with
+     one DELETE
+
+The time spent in each stage is added to a Redis histogram shared by all
+workers (`stage_timings()`), which is what the pool is sized from.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.outbound import LATENCY_BUCKETS
+from utils import image_hash
+
+logger = logging.getLogger(__name__)
+
+PENDING_QUEUE = "moderation:nudity:pending"
+PROCESSING_QUEUE = "moderation:nudity:processing"
+TIMINGS_KEY = "moderation:nudity:timings"
+STAGES = ("download", "decode", "dedupe", "infer")
+
+BATCH_SIZE = 8
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_TIMEOUT = 10
+# Images larger than this are not decoded
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+# Labels considered unsafe
+UNSAFE_LABELS = [
+    "FEMALE_BREAST_EXPOSED",
+    "MALE_BREAST_EXPOSED",
+    "FEMALE_GENITALIA_EXPOSED",
+    "MALE_GENITALIA_EXPOSED",
+    "ANUS_EXPOSED",
+    "BUTTOCKS_EXPOSED",
+]
+
+# Threshold above which a detection counts as NSFW
+NSFW_THRESHOLD = 0.3
+
+_detector = None
+
+
+def get_detector():
+    """The NudeDetector of this process; the ONNX session is created on first use."""
+    global _detector
+    if _detector is None:
+        from nudenet import NudeDetector
+        _detector = NudeDetector()
+    return _detector
+
+
+def is_nsfw(detections):
+    return any(
+        d["class"] in UNSAFE_LABELS and d["score"] >= NSFW_THRESHOLD
+        for d in detections
+    )
+
+
+def schedule(post_id):
+    """Queue `post_id` for the next batch. False if Redis is unavailable."""
+    from core.redis_client import get_redis
+
+    try:
+        get_redis().rpush(PENDING_QUEUE, str(post_id))
+    except Exception as e:
+        logger.warning(f"Could not queue post {post_id} for image moderation: {e}")
+        return False
+    return True
+
+
+def drain(limit=BATCH_SIZE):
+    """Up to `limit` queued post ids, moved to the processing list until `ack` or `requeue`."""
+    from core.redis_client import get_redis
+
+    try:
+        pipe = get_redis().pipeline()
+        for _ in range(limit):
+            pipe.lmove(PENDING_QUEUE, PROCESSING_QUEUE, "LEFT", "RIGHT")
+        return [post_id for post_id in pipe.execute() if post_id is not None]
+    except Exception as e:
+        logger.warning(f"Could not read the image moderation queue: {e}")
+        return []
+
+
+def ack(post_ids):
+    """The verdicts of drained `post_ids` are written; forget them."""
+    from core.redis_client import get_redis
+
+    try:
+        pipe = get_redis().pipeline()
+        for post_id in post_ids:
+            pipe.lrem(PROCESSING_QUEUE, 1, str(post_id))
+        pipe.execute()
+    except Exception as e:
+        # They are checked again after the next recover(); verdicts are idempotent
+        logger.warning(f"Could not acknowledge image moderation of {post_ids}: {e}")
+
+
+def requeue(post_ids):
+    """Put drained `post_ids` whose batch failed back in the queue for the next batch."""
+    from core.redis_client import get_redis
+
+    try:
+        pipe = get_redis().pipeline()
+        for post_id in post_ids:
+            pipe.lrem(PROCESSING_QUEUE, 1, str(post_id))
+            pipe.rpush(PENDING_QUEUE, str(post_id))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not requeue posts {post_ids} for image moderation: {e}")
+
+
+def recover():
+    """Requeue every id left in the processing list; returns how many."""
+    from core.redis_client import get_redis
+
+    moved = 0
+    try:
+        client = get_redis()
+        while client.lmove(PROCESSING_QUEUE, PENDING_QUEUE, "LEFT", "RIGHT") is not None:
+            moved += 1
+    except Exception as e:
+        logger.warning(f"Could not recover the image moderation queue: {e}")
+    return moved
+
+
+def record_timings(timings, images):
+    """Add one batch's stage durations (seconds) to the shared histogram."""
+    from core.redis_client import get_redis
+
+    try:
+        pipe = get_redis().pipeline()
+        for stage, seconds in timings.items():
+            bucket = next((f"le_{b}" for b in LATENCY_BUCKETS if seconds <= b), "le_inf")
+            pipe.hincrby(TIMINGS_KEY, f"{stage}:batches", 1)
+            pipe.hincrby(TIMINGS_KEY, f"{stage}:images", images)
+            pipe.hincrbyfloat(TIMINGS_KEY, f"{stage}:seconds", seconds)
+            pipe.hincrby(TIMINGS_KEY, f"{stage}:{bucket}", 1)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not record image moderation timings: {e}")
+
+
+def stage_timings():
+    """Per-stage batch counts, image counts, total seconds and batch latency buckets."""
+    from core.redis_client import get_redis
+
+    try:
+        raw = get_redis().hgetall(TIMINGS_KEY)
+    except Exception as e:
+        logger.warning(f"Could not read image moderation timings: {e}")
+        return {}
+
+    data = {}
+    for stage in STAGES:
+        images = int(raw.get(f"{stage}:images", 0))
+        seconds = float(raw.get(f"{stage}:seconds", 0))
+        labels = [f"le_{b}" for b in LATENCY_BUCKETS] + ["le_inf"]
+        data[stage] = {
+            "batches": int(raw.get(f"{stage}:batches", 0)),
+            "images": images,
+            "seconds": round(seconds, 3),
+            "per_image": round(seconds / images, 4) if images else 0.0,
+            "buckets": {label: int(raw.get(f"{stage}:{label}", 0)) for label in labels},
+        }
+    return data
+
+
+def _download(url):
+    from core import outbound
+
+    response = outbound.request("media", "GET", url, timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+
+def download_all(urls):
+    """{url: bytes or the exception raised while fetching it}."""
+    def fetch(url):
+        try:
+            return url, _download(url)
+        except Exception as e:
+            return url, e
+
+    with ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(urls) or 1)) as pool:
+        return dict(pool.map(fetch, urls))
+
+
+def decode(data):
+    """BGR ndarray (what NudeDetector reads from disk), or None if undecodable."""
+    import cv2
+    import numpy as np
+
+    if not data or len(data) > MAX_IMAGE_BYTES:
+        return None
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def detect_many(images):
+    """NudeDetector detections for each decoded image, in order."""
+    detector = get_detector()
+    if hasattr(detector, "detect_batch"):
+        return detector.detect_batch(images, batch_size=len(images))
+    return [detector.detect(image) for image in images]
+
+
+def check_posts(post_ids):
+    """
+    Moderate the images of `post_ids` in one batch.
+    Returns {"verified": [...], "deleted": [...], "failed": [...], "deduplicated": [...],
+    "timings": {...}}; "deduplicated" lists the posts whose verdict came from the hash index.
+    """
+    from post.models import PostModel
+
+    posts = list(PostModel.objects.filter(id__in=post_ids).only("id", "image"))
+    result = {"verified": [], "deleted": [], "failed": [], "deduplicated": [], "timings": {}}
+
+    # No image, mark as verified
+    urls = {}
+    for post in posts:
+        if post.image:
+            urls[post.id] = post.image.url
+        else:
+            result["verified"].append(post.id)
+
+    if urls:
+        started = time.monotonic()
+        downloaded = download_all(list(set(urls.values())))
+        result["timings"]["download"] = time.monotonic() - started
+
+        started = time.monotonic()
+        images = {}
+        for post_id, url in urls.items():
+            data = downloaded[url]
+            if isinstance(data, Exception):
+                logger.error(f"Failed to download image for post {post_id}: {data}")
+                result["failed"].append(post_id)
+                continue
+            image = decode(data)
+            if image is None:
+                logger.error(f"Could not decode image for post {post_id}")
+                result["failed"].append(post_id)
+                continue
+            images[post_id] = image
+        result["timings"]["decode"] = time.monotonic() - started
+
+        # Reposts and near-duplicates reuse the verdict of the known copy
+        started = time.monotonic()
+        fingerprints = {post_id: image_hash.hashes(image) for post_id, image in images.items()}
+        unseen = {}
+        for post_id, image in images.items():
+            verdict = image_hash.INDEX.lookup(*fingerprints[post_id])
+            if verdict is None:
+                unseen[post_id] = image
+            else:
+                result["deduplicated"].append(post_id)
+                result["deleted" if verdict == image_hash.UNSAFE else "verified"].append(post_id)
+        result["timings"]["dedupe"] = time.monotonic() - started
+
+        if unseen:
+            started = time.monotonic()
+            detections = detect_many(list(unseen.values()))
+            result["timings"]["infer"] = time.monotonic() - started
+
+            fresh = {}
+            for post_id, found in zip(unseen, detections):
+                nsfw = is_nsfw(found)
+                result["deleted" if nsfw else "verified"].append(post_id)
+                fresh[fingerprints[post_id]] = image_hash.UNSAFE if nsfw else image_hash.SAFE
+            image_hash.remember([(p, d, verdict) for (p, d), verdict in fresh.items()])
+
+        record_timings(result["timings"], len(urls))
+
+    if result["verified"]:
+        PostModel.objects.filter(id__in=result["verified"]).update(is_verified=True)
+    if result["deleted"]:
+        PostModel.objects.filter(id__in=result["deleted"]).delete()
+
+    missing = set(map(str, post_ids)) - {str(post.id) for post in posts}
+    for post_id in missing:
+        logger.warning(f"Post {post_id} does not exist.")
+
+    logger.info(
+        f"Image moderation: {len(result['verified'])} verified, {len(result['deleted'])} deleted, "
+        f"{len(result['failed'])} failed, {len(result['deduplicated'])} by hash; "
+        + ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in result["timings"].items())
+    )
+    return result
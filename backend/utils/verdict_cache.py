@@ -0,0 +1,146 @@
+"""
+Two-tier cache for moderation verdicts.
+
+Entries are keyed by a sha256 digest of the text (plus a namespace and
+version), so keys are the same in every worker and survive restarts,
+unlike Python's salted hash().
+
+  1. an in-process LRU bounded by size and TTL; the least recently used
+     entry is evicted one at a time instead of clearing the whole cache
+  2. an optional shared Redis tier (JSON values with their own TTL); when
+     Redis fails it is skipped for REDIS_RETRY_AFTER seconds so moderation
+     never waits on it
+
+Hits per tier, misses, evictions and expirations are counted per cache
+(`stats()`).
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+REDIS_RETRY_AFTER = 30
+
+
+class VerdictCache:
+    def __init__(self, namespace, max_size=5000, ttl=3600, redis_ttl=86400, use_redis=True):
+        self.namespace = namespace
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+        self.use_redis = use_redis
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis_down_until = 0.0
+        self._stats = {
+            "lru_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def digest(self, text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _redis_key(self, digest):
+        return f"verdict:{self.namespace}:{digest}"
+
+    def _redis(self):
+        if not self.use_redis or time.monotonic() < self._redis_down_until:
+            return None
+        from core.redis_client import get_redis
+        return get_redis()
+
+    def _redis_failed(self, e):
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+        logger.warning(f"Verdict cache {self.namespace}: Redis unavailable, using local tier only: {e}")
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _get_local(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[digest]
+                self._stats["expirations"] += 1
+                return None
+            self._entries.move_to_end(digest)
+            self._stats["lru_hits"] += 1
+            return value
+
+    def _set_local(self, digest, value):
+        with self._lock:
+            self._entries[digest] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get(self, text):
+        """Cached value for `text`, or None."""
+        digest = self.digest(text)
+        value = self._get_local(digest)
+        if value is not None:
+            return value
+
+        client = self._redis()
+        if client is not None:
+            try:
+                raw = client.get(self._redis_key(digest))
+            except Exception as e:
+                self._redis_failed(e)
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self._set_local(digest, value)
+                self._count("redis_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, text, value):
+        digest = self.digest(text)
+        self._set_local(digest, value)
+
+        client = self._redis()
+        if client is not None:
+            try:
+                client.set(self._redis_key(digest), json.dumps(value), ex=self.redis_ttl)
+            except Exception as e:
+                self._redis_failed(e)
+
+    def delete(self, text):
+        """Drop `text` from the local tier and Redis."""
+        digest = self.digest(text)
+        with self._lock:
+            self._entries.pop(digest, None)
+
+        client = self._redis()
+        if client is not None:
+            try:
+                client.delete(self._redis_key(digest))
+            except Exception as e:
+                self._redis_failed(e)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            data["size"] = len(self._entries)
+        lookups = data["lru_hits"] + data["redis_hits"] + data["misses"]
+        data["hit_rate"] = (data["lru_hits"] + data["redis_hits"]) / lookups if lookups else 0.0
+        return data